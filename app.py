@@ -1,6 +1,14 @@
+import os
+
 import dash 
 from dash import html,dcc 
 
+# Tareas y transmisiones viven en la memoria del proceso (ver utils/tareas.py): un solo
+# proceso web, con hilos si hace falta. utils.tareas.reservar_proceso lo vuelve a exigir
+# la primera vez que se crea estado.
+if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1:
+    raise RuntimeError("La aplicacion debe correr en un solo proceso (WEB_CONCURRENCY=1, gunicorn -w 1 --threads N).")
+
 app=dash.Dash(__name__, use_pages=True)
 
 app.layout = html.Div([
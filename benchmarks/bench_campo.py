@@ -0,0 +1,58 @@
+"""Compara la construccion del campo vectorial de Clase_5: una traza por flecha vs. trazas agrupadas.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_campo
+"""
+import time
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.campo import trazas_quiver
+
+
+def campo_por_flecha(X, Y, fx, fy):
+    """Version anterior de graficar_campo: una go.Scatter por cada nodo de la malla."""
+    fig = go.Figure()
+    n, m = X.shape
+    for i in range(n):
+        for j in range(m):
+            x0, y0 = X[i, j], Y[i, j]
+            x1, y1 = x0 + fx[i, j], y0 + fy[i, j]
+            fig.add_trace(go.Scatter(
+                x=[x0, x1],
+                y=[y0, y1],
+                mode="lines+markers",
+                line=dict(color="blue", width=2),
+                marker=dict(size=[3, 5], color=["blue", "red"]),
+                showlegend=False,
+                hovertemplate=f"punto: ({x0:.1f},{y0:.1f}) <br> Vector: ({fx[i,j]:.2f},{fy[i,j]:.2f})"
+            ))
+    return fig
+
+
+def campo_agrupado(X, Y, fx, fy):
+    fig = go.Figure()
+    fig.add_traces(list(trazas_quiver(X, Y, fx, fy)))
+    return fig
+
+
+def medir(constructor, X, Y, fx, fy):
+    inicio = time.perf_counter()
+    fig = constructor(X, Y, fx, fy)
+    carga = fig.to_json()
+    return time.perf_counter() - inicio, len(carga), len(fig.data)
+
+
+def main():
+    print(f"{'n':>5} {'modo':>9} {'trazas':>7} {'tiempo (s)':>11} {'JSON (KB)':>10}")
+    for n in (15, 50, 150):
+        x = np.linspace(-5, 5, n)
+        X, Y = np.meshgrid(x, x)
+        fx, fy = np.sin(X), np.cos(X)
+        for nombre, constructor in (("antes", campo_por_flecha), ("despues", campo_agrupado)):
+            segundos, bytes_json, trazas = medir(constructor, X, Y, fx, fy)
+            print(f"{n:>5} {nombre:>9} {trazas:>7} {segundos:>11.3f} {bytes_json / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
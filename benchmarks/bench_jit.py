@@ -0,0 +1,67 @@
+"""Aceleracion por modelo de los nucleos compilados con numba frente a NumPy.
+
+Compara RK45 (bucle completo compilado) y LSODA (rhs y jacobiano compilados) con las
+mismas tolerancias, y un horizonte largo de SIP con tolerancias estrictas. La primera
+ejecucion incluye la compilacion; numba la guarda en __pycache__ para las siguientes.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_jit
+"""
+import time
+
+import numpy as np
+
+from utils.modelos import sir, seir, sip, integrar, jit_disponible
+
+
+PARAMS_SIP = {
+    'r': 0.10, 'K': 60.0, 'alpha': 0.30, 'g': 0.07, 'a1': 0.20, 'm': 0.60, 'mu': 0.01,
+    'rho': 0.10, 'a2': 0.30, 'n': 0.40, 'w1': 0.45, 'w2': 0.40, 'c': 0.035, 'd': 0.01,
+}
+
+CASOS = [
+    ("SIR", lambda jit: sir(1000, 0.3, 0.1, jit=jit), [999, 1, 0], 100, {}),
+    ("SEIR", lambda jit: seir(1000, 0.3, 0.2, 0.1, jit=jit), [999, 0, 1, 0], 100, {}),
+    ("SIP", lambda jit: sip(**PARAMS_SIP, jit=jit), [12.0, 3.0, 7.0], 1000, {}),
+    ("SIP", lambda jit: sip(**PARAMS_SIP, jit=jit), [12.0, 3.0, 7.0], 1000, {'rtol': 1e-10, 'atol': 1e-12}),
+    ("SIP", lambda jit: sip(**PARAMS_SIP, jit=jit), [12.0, 3.0, 7.0], 100_000, {'rtol': 1e-10, 'atol': 1e-12}),
+]
+
+
+def medir(funcion, repeticiones=5):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        solucion = funcion()
+    return solucion, (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    if not jit_disponible():
+        print("numba no esta instalado: no hay nada que comparar.")
+        return
+
+    # Compilacion (o carga desde la cache de numba) fuera de la medicion
+    inicio = time.perf_counter()
+    for _, modelo, y0, tiempo, _ in CASOS[:3]:
+        integrar(modelo(True), y0, (0, 1), t_eval=np.linspace(0, 1, 3))
+    print(f"compilacion / carga de numba: {time.perf_counter() - inicio:.2f} s\n")
+
+    print(f"{'modelo':>6} {'tiempo':>7} {'rtol':>6} {'metodo':>7} {'nfev':>8} "
+          f"{'ms numpy':>10} {'ms numba':>10} {'aceleracion':>12} {'dif. max':>9}")
+    for nombre, modelo, y0, tiempo, tolerancias in CASOS:
+        t_eval = np.linspace(0, tiempo, 2000)
+        repeticiones = 1 if tiempo > 10_000 else 5
+        for metodo in ('RK45', 'LSODA'):
+            with np.errstate(all='ignore'):
+                numpy_, t_numpy = medir(lambda: integrar(modelo(False), y0, (0, tiempo), t_eval=t_eval,
+                                                         metodo=metodo, **tolerancias), repeticiones)
+                numba_, t_numba = medir(lambda: integrar(modelo(True), y0, (0, tiempo), t_eval=t_eval,
+                                                         metodo=metodo, **tolerancias), repeticiones)
+            diferencia = np.abs(numpy_.y - numba_.y).max() if numpy_.y.shape == numba_.y.shape else np.nan
+            rtol = tolerancias.get('rtol', 1e-3)
+            print(f"{nombre:>6} {tiempo:>7} {rtol:>6.0e} {metodo:>7} {numba_.nfev:>8} "
+                  f"{t_numpy * 1e3:>10.1f} {t_numba * 1e3:>10.1f} {t_numpy / t_numba:>11.1f}x "
+                  f"{diferencia:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
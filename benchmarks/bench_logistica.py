@@ -0,0 +1,41 @@
+"""Evalua la logistica para muchas combinaciones (P0, K, r): una por una vs. el lote de
+utils.funciones.logistica, sin construir figuras.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_logistica
+"""
+import time
+
+import numpy as np
+
+from utils.funciones import logistica, muestrear_parametros, percentiles_logistica
+
+
+def logistica_por_combinacion(P0, K, r, t):
+    """Version anterior: la formula de fucion_graficas_ecu_log en un bucle de Python."""
+    return np.array([(p * k * np.exp(tasa * t)) / ((k - p) + p * np.exp(tasa * t)) for p, k, tasa in zip(P0, K, r)])
+
+
+def main():
+    t = np.linspace(0, 100, 200)
+    print(f"{'combinaciones':>13} {'bucle (s)':>10} {'lote (s)':>9} {'percentiles (s)':>16} {'dif. max':>9}")
+    for muestras in (1_000, 10_000, 100_000):
+        p = muestrear_parametros({'P0': 200, 'K': 750, 'r': 0.04}, 0.2, muestras)
+
+        inicio = time.perf_counter()
+        bucle = logistica_por_combinacion(p['P0'], p['K'], p['r'], t)
+        t_bucle = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        lote = logistica(p['P0'], p['K'], p['r'], t)
+        t_lote = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        percentiles_logistica(p['P0'], p['K'], p['r'], t)
+        t_percentiles = time.perf_counter() - inicio
+
+        diferencia = np.abs(bucle - lote).max()
+        print(f"{muestras:>13} {t_bucle:>10.3f} {t_lote:>9.3f} {t_percentiles:>16.3f} {diferencia:>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Evaluaciones del RHS y tiempo por metodo: modelos anteriores (listas, sin jacobiano)
+vs. utils.modelos (NumPy, parametros fijados, jacobiano analitico).
+
+Se fuerza jit=False: los nucleos de numba se comparan aparte en bench_jit.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_modelos
+"""
+import time
+
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from utils.modelos import sir, seir, sip, integrar
+
+
+PARAMS_SIP = {
+    'r': 0.10, 'K': 60.0, 'alpha': 0.30, 'g': 0.07, 'a1': 0.20, 'm': 0.60, 'mu': 0.01,
+    'rho': 0.10, 'a2': 0.30, 'n': 0.40, 'w1': 0.45, 'w2': 0.40, 'c': 0.035, 'd': 0.01,
+}
+
+
+def modelo_sir(t, y, N, beta, gamma):
+    S, I, R = y
+    return [-beta * S * I / N, beta * S * I / N - gamma * I, gamma * I]
+
+
+def modelo_seir(t, y, N, beta, sigma, gamma):
+    S, E, I, R = y
+    return [-beta * S * I / N, beta * S * I / N - sigma * E, sigma * E - gamma * I, gamma * I]
+
+
+def sistema_sip(t, y, params):
+    xS, xI, y_pred = y
+    r, K, alpha, g = params['r'], params['K'], params['alpha'], params['g']
+    a1, m, mu, rho = params['a1'], params['m'], params['mu'], params['rho']
+    a2, n, w1, w2 = params['a2'], params['n'], params['w1'], params['w2']
+    c, d = params['c'], params['d']
+    dxS_dt = r * xS * (1 - (xS + xI) / K) - alpha * xS * xI + g * xI - a1 * (1 - m) * xS * y_pred - mu * xS
+    dxI_dt = alpha * xS * xI - (mu + g + rho) * xI - a2 * (1 - n) * xI * y_pred
+    dy_dt = a1 * w1 * (1 - m) * xS * y_pred + a2 * w2 * (1 - n) * xI * y_pred - c * y_pred - d * y_pred**2
+    return [dxS_dt, dxI_dt, dy_dt]
+
+
+CASOS = [
+    ("SIR", modelo_sir, (1000, 0.3, 0.1), sir(1000, 0.3, 0.1, jit=False), [999, 1, 0], 100),
+    ("SEIR", modelo_seir, (1000, 0.3, 0.2, 0.1), seir(1000, 0.3, 0.2, 0.1, jit=False), [999, 0, 1, 0], 100),
+    ("SIP", sistema_sip, (PARAMS_SIP,), sip(**PARAMS_SIP, jit=False), [12.0, 3.0, 7.0], 1000),
+]
+
+
+class Contador:
+    """Cuenta todas las llamadas al RHS, incluidas las del jacobiano por diferencias finitas."""
+
+    def __init__(self, funcion):
+        self.funcion = funcion
+        self.llamadas = 0
+
+    def __call__(self, *args):
+        self.llamadas += 1
+        return self.funcion(*args)
+
+
+def medir(funcion, repeticiones=20):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        solucion = funcion()
+    return solucion, (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    print(f"{'modelo':>6} {'metodo':>7} {'llamadas antes':>15} {'llamadas ahora':>15} {'njev':>5} "
+          f"{'ms antes':>9} {'ms ahora':>9} {'aceleracion':>12} {'exito':>6}")
+    for nombre, anterior, args, modelo, y0, tiempo in CASOS:
+        t_eval = np.linspace(0, tiempo, 2000)
+        for metodo in ('RK45', 'LSODA', 'BDF', 'Radau'):
+            with np.errstate(all='ignore'):
+                antes, t_antes = medir(lambda: solve_ivp(anterior, (0, tiempo), y0, t_eval=t_eval,
+                                                         method=metodo, args=args))
+                ahora, t_ahora = medir(lambda: integrar(modelo, y0, (0, tiempo), t_eval=t_eval, metodo=metodo))
+
+                contador_antes = Contador(anterior)
+                solve_ivp(contador_antes, (0, tiempo), y0, t_eval=t_eval, method=metodo, args=args)
+                contador_ahora = Contador(modelo[0])
+                integrar((contador_ahora, modelo[1]), y0, (0, tiempo), t_eval=t_eval, metodo=metodo)
+
+            exito = "si" if antes.success and ahora.success else "no"
+            print(f"{nombre:>6} {metodo:>7} {contador_antes.llamadas:>15} {contador_ahora.llamadas:>15} "
+                  f"{ahora.njev:>5} {t_antes * 1e3:>9.1f} {t_ahora * 1e3:>9.1f} "
+                  f"{t_antes / t_ahora:>11.2f}x {exito:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Tiempo del analisis de nulclinas y equilibrios de Clase_5 sobre una malla de 500 x 500.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_nulclinas
+"""
+import time
+
+from utils.nulclinas import analizar_campo
+
+
+CAMPOS = [
+    ("np.sin(X)", "np.cos(Y)"),
+    ("Y", "-np.sin(X)-0.3*Y"),
+    ("X*(3-X-2*Y)", "Y*(2-X-Y)"),
+]
+
+
+def main():
+    limites = (-5.0, 5.0, -5.0, 5.0)
+    print(f"{'campo':>28} {'equilibrios':>12} {'primera (s)':>12} {'cache (s)':>10}")
+    for fx_str, fy_str in CAMPOS:
+        inicio = time.perf_counter()
+        _, _, equilibrios = analizar_campo(fx_str, fy_str, limites, 500)
+        primera = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        analizar_campo(fx_str, fy_str, limites, 500)
+        repetida = time.perf_counter() - inicio
+
+        nombre = f"{fx_str}, {fy_str}"
+        print(f"{nombre:>28} {len(equilibrios):>12} {primera:>12.3f} {repetida:>10.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Tiempo de integracion y armado de la figura para el modo trayectorias de Clase_5.
+
+Ejecutar desde la raiz del repositorio:  python -m benchmarks.bench_trayectorias
+"""
+import time
+
+import plotly.graph_objects as go
+
+from utils.expresiones import funcion_campo
+from utils.trayectorias import sembrar, integrar_trayectorias, traza_trayectorias
+
+
+CAMPOS = [
+    ("np.sin(X)", "np.cos(X)"),
+    ("-Y", "X"),
+    ("X+Y", "np.cos(Y)"),
+]
+
+
+def main():
+    limites = (-5, 5, -5, 5)
+    print(f"{'campo':>24} {'semillas':>9} {'integrar (s)':>13} {'figura (s)':>11} {'JSON (KB)':>10}")
+    for fx_str, fy_str in CAMPOS:
+        campo = funcion_campo(fx_str, fy_str)
+        for cantidad in (100, 1000, 5000):
+            x0, y0 = sembrar(limites, cantidad)
+
+            inicio = time.perf_counter()
+            xs, ys = integrar_trayectorias(campo, x0, y0, limites)
+            integrar = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            carga = go.Figure(traza_trayectorias(xs, ys)).to_json()
+            figura = time.perf_counter() - inicio
+
+            nombre = f"{fx_str}, {fy_str}"
+            print(f"{nombre:>24} {cantidad:>9} {integrar:>13.3f} {figura:>11.3f} {len(carga) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,65 +2,17 @@ import dash
 from dash import html, dcc, Output, Input, State, callback
 import numpy as np 
 import plotly.graph_objects as go
+from utils.cache import memoizar
+from utils.funciones import logistica, abanico_logistico, trazas_abanico, parche_logistico
 
 dash.register_page(__name__, path='/Clase_3', name='Clase_3')
 
-layout= html.Div( children=[
-
-    html.Div( children=[
-        
-        html.H2("Parametros del modelo", className="title"),
-
-        html.Div([
-            html.Label("Poblacion inicial P(0):"),
-            dcc.Input(id="input-p0", type="number", value=200, className="input-field")
-        ], className="input-group"),
-
-        html.Div([
-        html.Label("Tasa de Crecimiento (r):"),
-        dcc.Input(id="input-r", type="number", value=0.04, className="input-field")
-
-        ], className="input-group"),
-
-        html.Div([
-        html.Label("Capacidad de Carga (K):"),
-        dcc.Input(id="input-k", type="number", value=750, className="input-field")
-        ], className="input-group"),
-
-        html.Div([
-        html.Label("Tiempo Máximo (t):"),
-        dcc.Input(id="input-t", type="number", value=100, className="input-field")
-        ], className="input-group"),
-
-        html.Button("Generar Gráfica", id="btn-generar", className="btn-generar")
-    ], className="content left"),
-
-    html.Div(children=[
-              
-        html.H2("Gráfica", className="title"),
-
-        dcc.Graph(
-        id='grafica-poblacion',
-         style={'height': '350px', 'width': '100%'},
-        )
-    ], className="content right")
-], className="page-container")
-
-@callback(
-    Output('grafica-poblacion','figure'),
-    Input('btn-generar','n_clicks'),
-    State('input-p0', 'value'),
-    State('input-r', 'value'),
-    State('input-k', 'value'),
-    State('input-t', 'value'),
-    prevent_initial_call=False
-)
-
-def actualizar_grafica(n_clicks, P0, r, K, t_max):
+def figura_logistica(P0, r, K, t_max):
+    """Figura base con el estilo de la pagina; los clics solo envian datos y rangos."""
 
     t=np.linspace(0, t_max, 20)
 
-    P=(P0*K*np.exp(r*t))/((K-P0)+P0*np.exp(r*t))
+    P=logistica(P0, K, r, t)
 
     trace_poblacion=go.Scatter(
         x=t,
@@ -92,6 +44,9 @@ def actualizar_grafica(n_clicks, P0, r, K, t_max):
     )
 
     fig=go.Figure(data=[trace_poblacion, trace_capacidad])
+
+    # Las trazas del abanico van vacias; el callback las llena con parche_logistico
+    fig.add_traces(trazas_abanico([], None, '30, 144, 255'))
     
     fig.update_layout(
     title=dict(
@@ -131,4 +86,75 @@ def actualizar_grafica(n_clicks, P0, r, K, t_max):
     )
     
     
-    return fig
\ No newline at end of file
+    return fig
+
+
+layout= html.Div( children=[
+
+    html.Div( children=[
+        
+        html.H2("Parametros del modelo", className="title"),
+
+        html.Div([
+            html.Label("Poblacion inicial P(0):"),
+            dcc.Input(id="input-p0", type="number", value=200, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Tasa de Crecimiento (r):"),
+        dcc.Input(id="input-r", type="number", value=0.04, className="input-field")
+
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Capacidad de Carga (K):"),
+        dcc.Input(id="input-k", type="number", value=750, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Tiempo Máximo (t):"),
+        dcc.Input(id="input-t", type="number", value=100, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Incertidumbre en P(0), r y K (±%):"),
+        dcc.Input(id="input-incertidumbre-log", type="number", value=0, min=0, max=100, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Combinaciones para el abanico:"),
+        dcc.Input(id="input-muestras-log", type="number", value=5000, min=10, step=1, className="input-field")
+        ], className="input-group"),
+
+        html.Button("Generar Gráfica", id="btn-generar", className="btn-generar")
+    ], className="content left"),
+
+    html.Div(children=[
+              
+        html.H2("Gráfica", className="title"),
+
+        dcc.Graph(
+        id='grafica-poblacion',
+        figure=figura_logistica(200, 0.04, 750, 100),
+         style={'height': '350px', 'width': '100%'},
+        )
+    ], className="content right")
+], className="page-container")
+
+@callback(
+    Output('grafica-poblacion','figure'),
+    Input('btn-generar','n_clicks'),
+    State('input-p0', 'value'),
+    State('input-r', 'value'),
+    State('input-k', 'value'),
+    State('input-t', 'value'),
+    State('input-incertidumbre-log', 'value'),
+    State('input-muestras-log', 'value'),
+    prevent_initial_call=False
+)
+
+@memoizar("logistico_clase3", ignorar=1)
+def actualizar_grafica(n_clicks, P0, r, K, t_max, incertidumbre=0, muestras=5000):
+
+    abanico = abanico_logistico(P0, K, r, t_max, (incertidumbre or 0) / 100, muestras)
+    return parche_logistico(P0, K, t_max, r, abanico=abanico)
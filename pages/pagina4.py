@@ -2,7 +2,8 @@ import dash
 from dash import html, dcc, Output, Input, State, callback
 import numpy as np 
 import plotly.graph_objects as go
-from utils.funciones import fucion_graficas_ecu_log
+from utils.funciones import fucion_graficas_ecu_log, abanico_logistico, parche_logistico
+from utils.cache import memoizar
 
 dash.register_page(__name__, path='/Clase_4', name='Clase_4')
 
@@ -14,6 +15,7 @@ layout= html.Div( children=[
 
         dcc.Graph(
         id='grafica',
+        figure=fucion_graficas_ecu_log(P0=200, K=750, t_max=100, r=0.04),
          style={'height': '350px', 'width': '100%'},
         )
         
@@ -44,6 +46,16 @@ layout= html.Div( children=[
         dcc.Input(id="input-t", type="number", value=100, className="input-field")
         ], className="input-group"),
 
+        html.Div([
+        html.Label("Incertidumbre en P(0), r y K (±%):"),
+        dcc.Input(id="input-incertidumbre-log", type="number", value=0, min=0, max=100, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+        html.Label("Combinaciones para el abanico:"),
+        dcc.Input(id="input-muestras-log", type="number", value=5000, min=10, step=1, className="input-field")
+        ], className="input-group"),
+
         html.Button("Generar Gráfica", id="btn-generar", className="btn-generar")
      
     ], className="content right")
@@ -57,10 +69,12 @@ layout= html.Div( children=[
     State('input-r', 'value'),
     State('input-k', 'value'),
     State('input-t', 'value'),
+    State('input-incertidumbre-log', 'value'),
+    State('input-muestras-log', 'value'),
     prevent_initial_call=True  
 )
-def update_graph(n_clicks, p0, r, k, t_max):
-    
-    fig = fucion_graficas_ecu_log(P0=p0, K=k, t_max=t_max, r=r)
+@memoizar("logistico_clase4", ignorar=1)
+def update_graph(n_clicks, p0, r, k, t_max, incertidumbre=0, muestras=5000):
     
-    return fig
+    abanico = abanico_logistico(p0, k, r, t_max, (incertidumbre or 0) / 100, muestras)
+    return parche_logistico(P0=p0, K=k, t_max=t_max, r=r, abanico=abanico)
@@ -1,11 +1,70 @@
 from pydoc import text
 import dash
-from dash import html, dcc, Output, Input, State, callback
+from dash import html, dcc, Output, Input, State, callback, ctx
+from dash.exceptions import PreventUpdate
 import numpy as np 
 import plotly.graph_objects as go
+from utils.campo import (
+    trazas_quiver, muestrear_ventana, capas_escalares, traza_capa, CAPAS_ESCALARES,
+    resolucion_3d, campo_3d, traza_conos,
+)
+from utils.expresiones import funcion_campo
+from utils.figuras import reemplazar_trazas, rangos
+from utils.nulclinas import analizar_campo, trazas_nulclinas
+from utils.trayectorias import (
+    sembrar, integrar_trayectorias, traza_trayectorias,
+    advectar_particulas, traza_particulas, cuadros_animacion, controles_animacion,
+)
 
 dash.register_page(__name__, path='/Clase_5', name='Clase_5')
 
+MARGEN_3D = dict(l=0, r=0, t=50, b=0)
+
+
+def figura_base_campo():
+    """Estilo de la grafica del campo (2D y escena 3D); los callbacks solo envian trazas y rangos."""
+    fig = go.Figure()
+    fig.update_layout(
+        title=dict(
+            text="<b>Campo Vectorial</b>",
+            x=0.5, 
+            font=dict(size=16, color="green")
+        ),
+        xaxis_title="x",
+        yaxis_title="y",
+        paper_bgcolor= "white",
+        font=dict(
+        family='Outfit', 
+        size=11, 
+        color='black'),
+        legend=dict(
+        orientation='h',
+        yanchor='bottom',
+        y=1.02,
+        ),
+        scene=dict(
+            xaxis=dict(title="x"),
+            yaxis=dict(title="y"),
+            zaxis=dict(title="z"),
+        ),
+    )
+    
+    fig.update_xaxes(
+    showgrid=True, gridwidth=1, gridcolor='black',
+    zeroline=True, zerolinewidth=2, zerolinecolor='red',
+    range=[-5.5, 5.5]
+    
+    )
+
+    fig.update_yaxes(
+    showgrid=True, gridwidth=1, gridcolor='black',
+    zeroline=True, zerolinewidth=2, zerolinecolor='red',
+    showline=True, linecolor='black', linewidth=2, mirror=True,
+    range=[-5.5, 5.5]
+    )
+    return fig
+
+
 layout= html.Div([
 
     html.Div([
@@ -24,6 +83,11 @@ layout= html.Div([
      ], className="input-group"),
 
      
+     html.Div([
+         html.Label("Ecuacion dz/dt (vacío = campo 2D) = "),
+         dcc.Input(id="input-fz", type='text', value="", className="input-field")
+     ], className="input-group"),
+
      html.Div([
          html.Label("Rango del Eje X : "),
          dcc.Input(id="input-xmax", type='number', value=5, className="input-field")
@@ -34,11 +98,70 @@ layout= html.Div([
          dcc.Input(id="input-ymax", type='number', value=5, className="input-field")
      ], className="input-group"),
 
+     html.Div([
+         html.Label("Rango del Eje Z (campo 3D) : "),
+         dcc.Input(id="input-zmax", type='number', value=5, className="input-field")
+     ], className="input-group"),
+
      html.Div([
          html.Label("Mallado "),
          dcc.Input(id="input-n", type='number', value=15, className="input-field")
      ], className="input-group"),
 
+     html.Div([
+         html.Label("Modo de visualización "),
+         dcc.Dropdown(
+             id="dropdown-modo-campo",
+             options=[
+                 {"label": "Flechas", "value": "flechas"},
+                 {"label": "Trayectorias", "value": "trayectorias"},
+                 {"label": "Animación de flujo", "value": "animacion"},
+             ],
+             value="flechas",
+             clearable=False,
+             className="input-field",
+             style={"width": "100%"},
+         )
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Semillas / partículas (trayectorias y animación) "),
+         dcc.Input(id="input-semillas", type='number', value=400, min=1, max=10000, className="input-field")
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Cuadros (modo animación) "),
+         dcc.Input(id="input-cuadros", type='number', value=60, min=2, max=200, className="input-field")
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Capa de fondo "),
+         dcc.Dropdown(
+             id="dropdown-capa-campo",
+             options=[
+                 {"label": "Ninguna", "value": "ninguna"},
+                 {"label": "Magnitud", "value": "magnitud"},
+                 {"label": "Divergencia", "value": "divergencia"},
+                 {"label": "Rotacional", "value": "rotacional"},
+             ],
+             value="ninguna",
+             clearable=False,
+             className="input-field",
+             style={"width": "100%"},
+         )
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Superposiciones "),
+         dcc.Checklist(
+             id="checklist-capas-campo",
+             options=[
+                 {"label": " Nulclinas y equilibrios", "value": "nulclinas"},
+             ],
+             value=[],
+         )
+     ], className="input-group"),
+
      html.Button("Generar campo", id="btn-generar", className="btn-generar"),
 
       # Ejemplos
@@ -47,107 +170,165 @@ layout= html.Div([
             html.P("• dx/dt = X, dy/dt = Y"),
             html.P("• dx/dt = -Y, dy/dt = X"),
             html.P("• dx/dt = X+Y, dy/dt = np.cos(Y)"),
+            html.P("• 3D (Lorenz): dx/dt = 10*(Y-X), dy/dt = X*(28-Z)-Y, dz/dt = X*Y-8/3*Z, rangos 20, 25, 50"),
         ])
     ], className="content left"),
 
     html.Div([
         html.H2("Visualización del Campo Vectorial", className="title"),
-        dcc.Graph(id="grafica-campo", style={"height":"450", "width":"100%"}),
+        dcc.Graph(id="grafica-campo", figure=figura_base_campo(), style={"height":"450", "width":"100%"}),
+        dcc.Store(id="store-ventana-campo"),
 
         html.Div(id='info-campo')
     ], className="content right")
 ], className="page-container")
 
+def ventana_desde_relayout(relayout, ventana):
+    """Actualiza la ventana (x0, x1, y0, y1) con los rangos que informa el zoom o paneo de Plotly."""
+    x0, x1, y0, y1 = ventana
+    if "xaxis.range" in relayout:
+        x0, x1 = relayout["xaxis.range"]
+    x0 = relayout.get("xaxis.range[0]", x0)
+    x1 = relayout.get("xaxis.range[1]", x1)
+    if "yaxis.range" in relayout:
+        y0, y1 = relayout["yaxis.range"]
+    y0 = relayout.get("yaxis.range[0]", y0)
+    y1 = relayout.get("yaxis.range[1]", y1)
+    return [min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1)]
+
+
+def graficar_campo_3d(fx_str, fy_str, fz_str, xmax, ymax, zmax, n):
+    """Campo 3D como una sola traza de conos; n se limita por el presupuesto de la malla n^3."""
+    n_usado = resolucion_3d(n)
+    limites = (-xmax, xmax, -ymax, ymax, -zmax, zmax)
+    try:
+        X, Y, Z, U, V, W = campo_3d(fx_str, fy_str, fz_str, limites, n_usado)
+        magnitud = np.sqrt(U**2 + V**2 + W**2)
+        info_mensaje = (f"Magnitud: min={np.nanmin(magnitud):.2f}, max={np.nanmax(magnitud):.2f} | "
+                        f"Malla 3D: {n_usado}³ = {n_usado**3} conos")
+        if n_usado < n:
+            info_mensaje += f" (mallado limitado de {n} a {n_usado} por tamaño)"
+        trazas = [traza_conos(X, Y, Z, U, V, W)]
+    except Exception as error:
+        info_mensaje = f"Error en las expresiones: {str(error)}"
+        trazas = []
+
+    parche = reemplazar_trazas(go.Figure(data=trazas))
+    parche["layout"]["title"]["text"] = f"<b>Campo Vectorial 3D: dx/dt ={fx_str}, dy/dt={fy_str}, dz/dt={fz_str}</b>"
+    for eje, maximo in (("xaxis", xmax), ("yaxis", ymax), ("zaxis", zmax)):
+        parche["layout"]["scene"][eje]["range"] = [-maximo*1.1, maximo*1.1]
+    parche["layout"]["margin"] = MARGEN_3D
+    return parche, info_mensaje, None
+
+
 @callback(
     Output("grafica-campo", "figure"),
     Output("info-campo", "children"),
+    Output("store-ventana-campo", "data"),
     Input("btn-generar", "n_clicks"),
+    Input("grafica-campo", "relayoutData"),
     State("input-fx", "value"),
     State("input-fy", "value"),
+    State("input-fz", "value"),
     State("input-xmax", "value"),
     State("input-ymax", "value"),
+    State("input-zmax", "value"),
     State("input-n", "value"),
+    State("dropdown-modo-campo", "value"),
+    State("input-semillas", "value"),
+    State("input-cuadros", "value"),
+    State("dropdown-capa-campo", "value"),
+    State("checklist-capas-campo", "value"),
+    State("store-ventana-campo", "data"),
     prevent_initial_call=False
 )
-def graficar_campo(n_clicks, fx_str, fy_str, xmax, ymax, n):
-    x= np.linspace(-xmax, xmax, n)
-    y= np.linspace(-ymax, ymax, n)
-    X, Y= np.meshgrid(x,y)
+def graficar_campo(n_clicks, relayout, fx_str, fy_str, fz_str, xmax, ymax, zmax, n, modo, semillas, cuadros, capa, capas, ventana):
+    if fz_str and fz_str.strip():
+        if ctx.triggered_id == "grafica-campo":
+            raise PreventUpdate
+        return graficar_campo_3d(fx_str, fy_str, fz_str, xmax, ymax, zmax, n)
+
+    vista_completa = [-xmax*1.1, xmax*1.1, -ymax*1.1, ymax*1.1]
+
+    # Zoom y paneo: se vuelve a muestrear solo la ventana visible
+    if ctx.triggered_id == "grafica-campo":
+        relayout = relayout or {}
+        if relayout.get("xaxis.autorange") or relayout.get("yaxis.autorange"):
+            ventana = None
+        elif any(clave.startswith(("xaxis.range", "yaxis.range")) for clave in relayout):
+            ventana = ventana_desde_relayout(relayout, ventana or vista_completa)
+        else:
+            raise PreventUpdate
+    else:
+        ventana = None
+
+    if ventana is None:
+        x= np.linspace(-xmax, xmax, n)
+        y= np.linspace(-ymax, ymax, n)
+        X, Y= np.meshgrid(x,y)
     info_mensaje= ""
+    escala = 1.0
     try:
-        diccionario={
-            'X': X,
-            'Y': Y,
-            'np':np,
-            'sin': np.sin,
-            'cos': np.cos,
-            'tan': np.tan,
-            'exp': np.exp,
-            'sqrt': np.sqrt,
-            'pi': np.pi,
-            'e': np.e
-        }
-
-        fx=eval(fx_str, locals=diccionario)
-        fy=eval(fy_str, locals=diccionario)
+        campo = funcion_campo(fx_str, fy_str)
+        if ventana is None:
+            fx, fy = campo(X, Y)
+        else:
+            X, Y, fx, fy, escala = muestrear_ventana(fx_str, fy_str, tuple(ventana), n, 2*xmax, 2*ymax)
         mag_max= np.max(np.sqrt(fx**2 + fy**2))
         mag_min= np.min(np.sqrt(fx**2 + fy**2))
         info_mensaje= f"Magnitud: min={mag_min:.2f}, max={mag_max:.2f}"
 
 
     except Exception as error:
+        campo = None
+        if ventana is not None:
+            X, Y = np.meshgrid(np.linspace(*ventana[:2], n), np.linspace(*ventana[2:], n))
         fx=np.zeros_like(X)
         fy=np.zeros_like(Y)
         info_mensaje= f"Error en las expresiones: {str(error)}"
     
     fig = go.Figure()
+    limites = tuple(float(v) for v in (ventana or (-xmax, xmax, -ymax, ymax)))
 
-    for i in range (n):
-        for j in range (n):
-            x0, y0= X[i,j], Y[i,j]
-            x1, y1=x0+fx[i,j], y0 + fy[i,j]
-
-            fig.add_trace(go.Scatter(
-                x=[x0,x1],
-                y=[y0,y1],
-                mode="lines+markers",
-                line=dict(color="blue", width=2),
-                marker=dict(size=[3,5], color=["blue", "red"]),
-                showlegend=False,
-                hovertemplate=f"punto: ({x0:.1f},{y0:.1f}) <br> Vector: ({fx[i,j]:.2f},{fy[i,j]:.2f})"
-            ))
+    # La capa escalar va primero para quedar debajo de las flechas
+    if capa in CAPAS_ESCALARES and campo is not None:
+        xc, yc, escalares = capas_escalares(fx_str, fy_str, limites)
+        fig.add_trace(traza_capa(xc, yc, escalares[capa], capa))
+        info_mensaje = (f"{info_mensaje} | {CAPAS_ESCALARES[capa]['nombre']} (malla fina): "
+                        f"min={np.nanmin(escalares[capa]):.2f}, max={np.nanmax(escalares[capa]):.2f}")
 
-    fig.update_layout(
-        title=dict(
-            text=f"<b>Campo Vectorial: dx/dt ={fx_str}, dy/dt={fy_str}</b>",
-            x=0.5, 
-            font=dict(size=16, color="green")
-        ),
-        xaxis_title="x",
-        yaxis_title="y",
-        paper_bgcolor= "white",
-        font=dict(
-        family='Outfit', 
-        size=11, 
-        color='black'),
-        legend=dict(
-        orientation='h',
-        yanchor='bottom',
-        y=1.02,
-        ) 
-    )
-    
-    fig.update_xaxes(
-    showgrid=True, gridwidth=1, gridcolor='black',
-    zeroline=True, zerolinewidth=2, zerolinecolor='red',
-    range=[-xmax*1.1, xmax*1.1]
-    
-    )
+    if modo == "trayectorias" and campo is not None:
+        # Cada semilla se integra hacia adelante y hacia atras en el tiempo
+        x0, y0 = sembrar(limites, semillas or 400)
+        adelante = integrar_trayectorias(campo, x0, y0, limites, sentido=1.0)
+        atras = integrar_trayectorias(campo, x0, y0, limites, sentido=-1.0)
+        fig.add_trace(traza_trayectorias(adelante[0], adelante[1]))
+        fig.add_trace(traza_trayectorias(atras[0], atras[1]))
+    else:
+        segmentos, puntas = trazas_quiver(X, Y, fx, fy, escala=escala)
+        fig.add_trace(segmentos)
+        fig.add_trace(puntas)
 
-    fig.update_yaxes(
-    showgrid=True, gridwidth=1, gridcolor='black',
-    zeroline=True, zerolinewidth=2, zerolinecolor='red',
-    showline=True, linecolor='black', linewidth=2, mirror=True,
-    range=[-ymax*1.1, ymax*1.1]
-    )
-    return fig, info_mensaje 
\ No newline at end of file
+    if modo == "animacion" and campo is not None:
+        # Todas las posiciones se calculan de una vez; cada cuadro solo reemplaza las particulas
+        xs, ys = advectar_particulas(campo, limites, semillas or 400, cuadros or 60)
+        fig.update_traces(opacity=0.3, selector=dict(type="scatter"))
+        fig.add_trace(traza_particulas(xs[0], ys[0]))
+        fig.frames = cuadros_animacion(xs, ys, len(fig.data) - 1)
+        fig.update_layout(updatemenus=controles_animacion())
+
+    if "nulclinas" in (capas or []) and campo is not None:
+        nulclina_x, nulclina_y, equilibrios = analizar_campo(fx_str, fy_str, limites)
+        fig.add_traces(trazas_nulclinas(nulclina_x, nulclina_y, equilibrios))
+        info_mensaje = [html.P(info_mensaje), html.P(f"Equilibrios encontrados: {len(equilibrios)}")] + [
+            html.P(f"• ({eq['x']:.3f}, {eq['y']:.3f}): {eq['tipo']}") for eq in equilibrios
+        ]
+
+    rango = ventana or vista_completa
+
+    # Solo viajan las trazas, el titulo y los rangos; el estilo ya esta en figura_base_campo
+    parche = reemplazar_trazas(fig)
+    parche["layout"]["title"]["text"] = f"<b>Campo Vectorial: dx/dt ={fx_str}, dy/dt={fy_str}</b>"
+    parche["layout"]["margin"] = {}
+    rangos(parche, x=rango[:2], y=rango[2:])
+    return parche, info_mensaje, ventana
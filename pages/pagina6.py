@@ -1,13 +1,141 @@
 import dash
 from dash import html, dcc, Output, Input, State, callback
+from dash.exceptions import PreventUpdate
 import numpy as np 
 import plotly.graph_objects as go
 from scipy.integrate import odeint
+from utils.modelos import sir, barrido_sir
+from utils.cache import memoizar, NoGuardar
+from utils.reduccion import reducir, resolucion_temporal
+from utils.estocastico import sir_estocastico, resumen_replicas
+from utils.analitico import indicadores_sir
+from utils.figuras import parche_trazas
 
 dash.register_page(__name__, path='/Clase_6', name='Clase_6')
 
+ESTILO_TARJETA = {
+    "background-color": "#F0F8FF",
+    "padding": "10px",
+    "border-radius": "10px",
+    "text-align": "center",
+    "margin": "5px",
+    "flex": "1",
+}
+
+# La figura base lleva las trazas de los dos modos; cada clic muestra las de su modo
+TRAZAS_DETERMINISTAS = range(0, 3)
+TRAZAS_ESTOCASTICAS = range(3, 9)
+
+
+def figura_base_sir():
+    """Estilo y trazas vacias de la grafica del SIR; los callbacks solo envian datos."""
+    fig=go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Susceptibles (S)', 
+        line=dict(color='blue', width=2),
+        hovertemplate='Dia: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'
+        )) 
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Infectados (I)', 
+        line=dict(color='red', width=2),
+        hovertemplate='Dia: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'
+        )) 
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Recuperados (R)', 
+        line=dict(color='green', width=2),
+        hovertemplate='Dia: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'
+        ))
+    
+    for nombre, opacidad in (("Infectados 5-95 %", 0.15), ("Infectados 25-75 %", 0.3)):
+        fig.add_trace(go.Scatter(
+            x=[], y=[],
+            mode='lines',
+            visible=False,
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+            ))
+        fig.add_trace(go.Scatter(
+            x=[], y=[],
+            mode='lines',
+            visible=False,
+            fill='tonexty',
+            fillcolor=f"rgba(255, 0, 0, {opacidad})",
+            line=dict(width=0),
+            name=nombre,
+            hoverinfo='skip'
+            ))
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines',
+        visible=False,
+        name='Mediana de infectados',
+        line=dict(color='red', width=2),
+        hovertemplate='Dia: %{x:.0f}<br>Mediana: %{y:.0f}<extra></extra>'
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[],
+        mode='lines',
+        visible=False,
+        name='Infectados (determinista)',
+        line=dict(color='black', width=2, dash='dash'),
+        hovertemplate='Dia: %{x:.0f}<br>Determinista: %{y:.0f}<extra></extra>'
+        ))
+
+    fig.update_layout(
+        title=dict(
+            text="<b>Evolución del modelo SIR</b>",
+            font=dict(
+                size=20, 
+                color='black'
+            ),
+            x=0.5,
+            y=0.98
+        ),
+        xaxis_title="Tiempo (días)",
+        yaxis_title="Número de Personas",
+        paper_bgcolor='white',
+        plot_bgcolor='lightyellow',
+        font=dict(
+            family="outfit", 
+            size=12,
+            color="black"
+            ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+        ),  
+        margin=dict(l=40, r=40, t=70, b=40)
+    )
+
+    fig.update_xaxes(
+        showgrid=True, gridwidth=1, gridcolor='black',
+        zeroline=True, zerolinecolor='black', zerolinewidth=2,
+    )
+
+    fig.update_yaxes(
+        showgrid=True, gridwidth=1, gridcolor='black',
+        zeroline=True, zerolinecolor='black', zerolinewidth=2,
+    )
+    return fig
+
+
 layout= html.Div([
 
+  html.Div([
+
     html.Div([
 
      html.H2("Modelo SIR - Epidemiologia", className="title"),
@@ -39,23 +167,131 @@ layout= html.Div([
          dcc.Input(id="input-tiempo", type='number', value=100, className="input-field")
      ], className="input-group"),
 
+     html.Div([
+         dcc.RadioItems(
+             id="radio-modo-sir",
+             options=[
+                 {"label": " Determinista", "value": "determinista"},
+                 {"label": " Estocástico", "value": "estocastico"},
+             ],
+             value="determinista",
+             inline=True,
+         )
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Réplicas (modo estocástico):"),
+         dcc.Input(id="input-replicas-sir", type='number', value=1000, min=1, max=20000, className="input-field")
+     ], className="input-group"),
+
      html.Button("Simular Epidemia", id="btn-simular", className="btn-generar"),
     ], className="content left"),
 
 
     html.Div([
         html.H2("Gráfica de la Epidemia", className="title"),
-        dcc.Graph(id="grafica-sir", style={"height":"450", "width":"100%"}),
+
+        html.Div([
+            html.Div([
+                html.H4("R0 = β/ɣ", style={'color': "#C27DD3"}),
+                html.H3(id="kpi-r0-sir", style={'color': "#90609C"}),
+            ], style=ESTILO_TARJETA),
+
+            html.Div([
+                html.H4("Tamaño final", style={'color': "#55B5EC"}),
+                html.H3(id="kpi-final-sir", style={'color': "#4A9AC9"}),
+            ], style=ESTILO_TARJETA),
+
+            html.Div([
+                html.H4("Pico de infectados", style={'color': "#DA76DA"}),
+                html.H3(id="kpi-pico-sir", style={'color': "#90609C"}),
+            ], style=ESTILO_TARJETA),
+
+            html.Div([
+                html.H4("Inmunidad de rebaño", style={'color': "#4BD6B8"}),
+                html.H3(id="kpi-umbral-sir", style={'color': "#34A18A"}),
+            ], style=ESTILO_TARJETA),
+        ], style={"display": "flex"}),
+
+        dcc.Graph(id="grafica-sir", figure=figura_base_sir(), style={"height":"450", "width":"100%"}),
     ], className="content right"),
 
-], className="page-container")
+  ], className="page-container"),
+
+  html.Div([
+
+    html.Div([
+
+     html.H2("Barrido de parámetros β × ɣ", className="title"),
+
+     html.Div([
+         html.Label("β mínimo y máximo: "),
+         dcc.Input(id="input-barrido-beta-min", type='number', value=0.05, step=0.01, className="input-field"),
+         dcc.Input(id="input-barrido-beta-max", type='number', value=1.0, step=0.01, className="input-field"),
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("ɣ mínimo y máximo: "),
+         dcc.Input(id="input-barrido-gamma-min", type='number', value=0.02, step=0.01, className="input-field"),
+         dcc.Input(id="input-barrido-gamma-max", type='number', value=0.5, step=0.01, className="input-field"),
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Puntos por eje: "),
+         dcc.Input(id="input-barrido-puntos", type='number', value=200, min=2, max=400, className="input-field")
+     ], className="input-group"),
+
+     html.Div([
+         html.Label("Resultado: "),
+         dcc.Dropdown(
+             id="dropdown-barrido-metrica",
+             options=[
+                 {"label": "Pico de infectados", "value": "pico"},
+                 {"label": "Día del pico", "value": "dia"},
+                 {"label": "Tamaño final de la epidemia", "value": "final"},
+             ],
+             value="pico",
+             clearable=False,
+             className="input-field",
+             style={"width": "100%"},
+         )
+     ], className="input-group"),
+
+     html.P("Usa N, infectados iniciales y tiempo de simulación de arriba."),
+
+     html.Button("Calcular barrido", id="btn-barrido-sir", className="btn-generar"),
+    ], className="content left"),
+
+    html.Div([
+        html.H2("Mapa de calor del barrido", className="title"),
+        dcc.Graph(id="grafica-barrido-sir", style={"height":"450", "width":"100%"}),
+    ], className="content right"),
+
+  ], className="page-container"),
+
+])
+
+@callback(
+    Output("kpi-r0-sir", "children"),
+    Output("kpi-final-sir", "children"),
+    Output("kpi-pico-sir", "children"),
+    Output("kpi-umbral-sir", "children"),
+    Input("input-N", "value"),
+    Input("input-beta", "value"),
+    Input("input-gamma", "value"),
+    Input("input-I0", "value"),
+)
+
+def indicadores(N, beta, gamma, I0):
+    """Resultados exactos del SIR: se recalculan al escribir, sin integrar."""
+    if None in (N, beta, gamma, I0) or N <= 0 or gamma <= 0 or not 0 <= I0 <= N:
+        return "N/A", "N/A", "N/A", "N/A"
+    k = indicadores_sir(N, beta, gamma, I0)
+    return (f"{k['R0']:.2f}",
+            f"{k['final']:,.0f} ({100 * k['final'] / N:.1f} %)",
+            f"{k['pico']:,.0f} ({100 * k['pico'] / N:.1f} %)",
+            f"{100 * k['umbral']:.1f} %")
 
-def modelo_sir(y, t, N, beta, gamma):
-    S, I, R = y
-    dS_dt= -beta * S * I / N
-    dI_dt= beta * S * I / N - gamma * I
-    dR_dt= gamma * I
-    return [dS_dt, dI_dt, dR_dt]
 
 @callback(
     Output("grafica-sir", "figure"),
@@ -65,53 +301,104 @@ def modelo_sir(y, t, N, beta, gamma):
     State("input-gamma", "value"),
     State("input-I0", "value"),
     State("input-tiempo", "value"),
+    State("radio-modo-sir", "value"),
+    State("input-replicas-sir", "value"),
     prevent_initial_call=False
 )
 
-def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max):
+@memoizar("sir", ignorar=1)
+def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max, modo="determinista", replicas=1000):
+    if modo == "estocastico":
+        return simular_sir_estocastico(N, beta, gamma, I0, tiempo_max, replicas)
+
     S0= N - I0
     R0_inicial= 0
     y0= [S0, I0, R0_inicial]
 
-    t= np.linspace(0, tiempo_max, 200)
+    t= np.linspace(0, tiempo_max, resolucion_temporal(tiempo_max))
 
+    fallo = False
     try:
-        solucion= odeint(modelo_sir, y0, t, args=(N, beta, gamma))
+        rhs, jac = sir(N, beta, gamma)
+        solucion= odeint(rhs, y0, t, Dfun=jac, tfirst=True)
         S, I, R= solucion.T
     except Exception as e:
+        fallo = True
         S=np.full_like(t, S0)
         I=np.full_like(t, I0)
         R=np.full_like(t, R0_inicial)
 
-    fig=go.Figure()
+    # Control cruzado: el pico de odeint contra el del invariante S-I
+    control = ""
+    if 0 < np.argmax(I) < I.size - 1:
+        pico = indicadores_sir(N, beta, gamma, I0)["pico"]
+        control = (f"<br><sup>Pico: odeint {I.max():,.0f}, analítico {pico:,.0f} "
+                   f"(diferencia {100 * abs(I.max() - pico) / pico:.2f} %)</sup>")
 
-    fig.add_trace(go.Scatter(
-        x=t, y=S, 
-        mode='lines', 
-        name='Susceptibles (S)', 
-        line=dict(color='blue', width=2),
-        hovertemplate='Dia: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'
-        )) 
+    parche = parche_trazas(reducir(t, S, I, R), ocultar=TRAZAS_ESTOCASTICAS)
+    parche["layout"]["title"]["text"] = f"<b>Evolución del modelo SIR</b>{control}"
+    parche["layout"]["yaxis"]["title"]["text"] = "Número de Personas"
+    parche["layout"]["margin"]["t"] = 70
+    # La curva constante de respaldo no se guarda en la cache
+    return NoGuardar(parche) if fallo else parche
 
-    fig.add_trace(go.Scatter(
-        x=t, y=I, 
-        mode='lines', 
-        name='Infectados (I)', 
-        line=dict(color='red', width=2),
-        hovertemplate='Dia: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'
-        )) 
 
+METRICAS_BARRIDO = {
+    "pico": ("Pico de infectados", "Reds", "%{z:.0f} personas"),
+    "dia": ("Día del pico", "Viridis", "día %{z:.1f}"),
+    "final": ("Tamaño final (N - S)", "Purples", "%{z:.0f} personas"),
+}
+
+@callback(
+    Output("grafica-barrido-sir", "figure"),
+    Input("btn-barrido-sir", "n_clicks"),
+    Input("dropdown-barrido-metrica", "value"),
+    State("input-N", "value"),
+    State("input-I0", "value"),
+    State("input-tiempo", "value"),
+    State("input-barrido-beta-min", "value"),
+    State("input-barrido-beta-max", "value"),
+    State("input-barrido-gamma-min", "value"),
+    State("input-barrido-gamma-max", "value"),
+    State("input-barrido-puntos", "value"),
+    prevent_initial_call=True
+)
+
+def barrer_sir(n_clicks, metrica, N, I0, tiempo_max, beta_min, beta_max, gamma_min, gamma_max, puntos):
+    # Campo vacio (o a medio escribir): se deja la grafica como estaba
+    if None in (metrica, N, I0, tiempo_max, beta_min, beta_max, gamma_min, gamma_max, puntos):
+        raise PreventUpdate
+    error = error_barrido(N, I0, tiempo_max, beta_min, beta_max, gamma_min, gamma_max, puntos)
+    if error:
+        return figura_aviso(error)
+
+    betas, gammas, pico, dia_pico, final = barrido_sir(
+        N, I0, tiempo_max, (beta_min, beta_max), (gamma_min, gamma_max), int(puntos)
+    )
+    valores = {"pico": pico, "dia": dia_pico, "final": final}[metrica]
+    titulo, colores, formato = METRICAS_BARRIDO[metrica]
+
+    fig=go.Figure(go.Heatmap(
+        x=betas.astype(np.float32),
+        y=gammas.astype(np.float32),
+        z=valores.astype(np.float32),
+        colorscale=colores,
+        colorbar=dict(title=titulo, thickness=12),
+        hovertemplate=f"β: %{{x:.3f}}<br>ɣ: %{{y:.3f}}<br>{titulo}: {formato}<extra></extra>"
+    ))
+
+    # R0 = β/ɣ = 1 separa las zonas con y sin brote
     fig.add_trace(go.Scatter(
-        x=t, y=R, 
-        mode='lines', 
-        name='Recuperados (R)', 
-        line=dict(color='green', width=2),
-        hovertemplate='Dia: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'
+        x=[beta_min, beta_max], y=[beta_min, beta_max],
+        mode='lines',
+        name='R0 = 1',
+        line=dict(color='black', width=2, dash='dot'),
+        hoverinfo='skip'
         ))
-    
+
     fig.update_layout(
         title=dict(
-            text="<b>Evolución del modelo SIR</b>",
+            text=f"<b>{titulo} según β y ɣ</b>",
             font=dict(
                 size=20, 
                 color='black'
@@ -119,10 +406,9 @@ def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max):
             x=0.5,
             y=0.98
         ),
-        xaxis_title="Tiempo (días)",
-        yaxis_title="Número de Personas",
+        xaxis_title="Tasa de transmisión (β)",
+        yaxis_title="Tasa de recuperación (ɣ)",
         paper_bgcolor='white',
-        plot_bgcolor='lightyellow',
         font=dict(
             family="outfit", 
             size=12,
@@ -136,13 +422,53 @@ def simular_sir(n_clicks, N, beta, gamma, I0, tiempo_max):
         margin=dict(l=40, r=40, t=70, b=40)
     )
 
-    fig.update_xaxes(
-        showgrid=True, gridwidth=1, gridcolor='black',
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-    )
+    fig.update_xaxes(range=[beta_min, beta_max])
+    fig.update_yaxes(range=[gamma_min, gamma_max])
+    return fig
 
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor='black',
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-    )
-    return fig
\ No newline at end of file
+
+def error_barrido(N, I0, tiempo_max, beta_min, beta_max, gamma_min, gamma_max, puntos):
+    """Mensaje para el usuario si los parametros del barrido no sirven, o None."""
+    if N <= 0 or not 0 <= I0 <= N:
+        return "N debe ser positivo y 0 ≤ I0 ≤ N."
+    if tiempo_max <= 0:
+        return "El tiempo de simulación debe ser positivo."
+    if beta_min < 0 or gamma_min < 0:
+        return "Las tasas β y ɣ no pueden ser negativas."
+    if beta_min >= beta_max:
+        return "β mínimo debe ser menor que β máximo."
+    if gamma_min >= gamma_max:
+        return "ɣ mínimo debe ser menor que ɣ máximo."
+    if not 2 <= puntos <= 400:
+        return "Los puntos por eje deben estar entre 2 y 400."
+    return None
+
+
+def figura_aviso(texto):
+    """Figura vacia con el mensaje en el centro."""
+    fig = go.Figure()
+    fig.add_annotation(text=texto, xref="paper", yref="paper", x=0.5, y=0.5,
+                       showarrow=False, font=dict(size=15, color="red"))
+    fig.update_layout(paper_bgcolor='white', plot_bgcolor='white',
+                      xaxis=dict(visible=False), yaxis=dict(visible=False))
+    return fig
+
+
+def simular_sir_estocastico(N, beta, gamma, I0, tiempo_max, replicas):
+    """Mediana y bandas de percentiles de los infectados sobre todas las replicas."""
+    t, S, I, R = sir_estocastico(N, beta, gamma, I0, tiempo_max, replicas)
+    extinguidas, teorica = resumen_replicas(N, beta, gamma, I0, S, I)
+    p5, p25, p50, p75, p95 = np.percentile(I, [5, 25, 50, 75, 95], axis=0)
+
+    rhs, jac = sir(N, beta, gamma)
+    determinista = odeint(rhs, [N - I0, I0, 0], t, Dfun=jac, tfirst=True)[:, 1]
+
+    series = [(t, p5), (t, p95), (t, p25), (t, p75), (t, p50), (t, determinista)]
+    parche = parche_trazas(series, inicio=TRAZAS_ESTOCASTICAS.start, ocultar=TRAZAS_DETERMINISTAS)
+    parche["layout"]["title"]["text"] = (
+        f"<b>SIR estocástico: {int(replicas)} réplicas</b><br>"
+        f"<sup>Se extinguieron sin brote el {100 * extinguidas:.1f} % "
+        f"(teoría: {100 * teorica:.1f} %)</sup>")
+    parche["layout"]["yaxis"]["title"]["text"] = "Número de Infectados"
+    parche["layout"]["margin"]["t"] = 90
+    return parche
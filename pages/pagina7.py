@@ -1,11 +1,100 @@
 import dash
-from dash import html, dcc, Output, Input, State, callback
+from dash import html, dcc, Output, Input, State, callback, ctx, no_update, Patch
 import numpy as np 
 import plotly.graph_objects as go
 from scipy.integrate import odeint
+from utils.modelos import seir, IntegradorPorTramos
+from utils.cache import memoizar, NoGuardar
+from utils.metapoblacion import (
+    CONJUNTO_POR_DEFECTO, conjuntos_parches, cargar_parches, firma_parches, simular_metapoblacion,
+)
+from utils.transmision import (iniciar_transmision, obtener_transmision, siguiente_tramo, descartar_transmision,
+                                estado_transmision)
+from utils.reduccion import reducir, resolucion_temporal, presupuesto_tramo, PUNTOS_PANTALLA
+from utils.figuras import parche_trazas
 
 dash.register_page(__name__, path='/Clase_7', name='Clase_7')
 
+TITULO_SEIR = "<b>Evolución del modelo SEIR</b>"
+
+# Tolerancias por defecto de odeint: la curva transmitida coincide con la de calcular_seir
+TOLERANCIA_ODEINT = 1.49012e-8
+
+
+def figura_base_seir():
+    """Estilo y trazas vacias de la grafica del SEIR; los callbacks solo envian datos."""
+
+    fig = go.Figure()
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Susceptibles (S)', 
+        line=dict(
+            color='blue', width=2),
+        hovertemplate='Dia: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Expuestos (E)', 
+        line=dict(color='orange'),
+        hovertemplate='Dia: %{x:.0f}<br>Expuestos: %{y:.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Infectados (I)', 
+        line=dict(
+            color='red'),
+        hovertemplate='Dia: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], 
+        mode='lines', 
+        name='Recuperados (R)', 
+        line=dict(
+            color='green'),
+        hovertemplate='Dia: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text=TITULO_SEIR,
+            font=dict(
+                size=20, 
+                color='black'
+            ),
+            x=0.5, 
+            y=0.98
+        ),
+        xaxis_title="Tiempo (días)",
+        yaxis_title="Número de Personas",
+        paper_bgcolor='white',
+        plot_bgcolor='lightyellow',
+        font=dict(
+            family="outfit", 
+            size=12, 
+            color="black"),
+        legend=dict(
+            orientation="h", 
+            yanchor="bottom", 
+            y=1.02),
+        margin=dict(l=40, r=40, t=70, b=40)
+    )
+
+    fig.update_xaxes(
+        showgrid=True, gridwidth=1, gridcolor='black', 
+        zeroline=True, zerolinecolor='black', zerolinewidth=2,
+        )
+    fig.update_yaxes(
+        showgrid=True, gridwidth=1, gridcolor='black', 
+        zeroline=True, zerolinecolor='black', zerolinewidth=2
+    )
+
+    return fig
+
+
 layout = html.Div([
 
     html.Div([
@@ -47,27 +136,60 @@ layout = html.Div([
             dcc.Input(id="input-tiempo", type='number', value=100, className="input-field")
         ], className="input-group"),
 
+        html.Div([
+            html.Label("Modo:"),
+            dcc.RadioItems(
+                id="radio-modo-seir",
+                options=[
+                    {"label": " Una población", "value": "una"},
+                    {"label": " Metapoblación (parches desde CSV)", "value": "metapoblacion"},
+                ],
+                value="una",
+            )
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Conjunto de parches (datos/metapoblacion):"),
+            dcc.Dropdown(
+                id="dropdown-parches-seir",
+                options=[{"label": nombre, "value": nombre} for nombre in conjuntos_parches()],
+                value=CONJUNTO_POR_DEFECTO,
+                clearable=False,
+                className="input-field",
+                style={"width": "100%"},
+            )
+        ], className="input-group"),
+
+        html.Div([
+            dcc.Checklist(
+                id="checklist-transmitir-seir",
+                options=[{"label": " Dibujar la curva mientras se integra", "value": "transmitir"}],
+                value=[],
+            )
+        ], className="input-group"),
+
         html.Button("Simular Epidemia", id="btn-simular", className="btn-generar"),
+        dcc.Store(id="store-transmision-seir"),
+        dcc.Interval(id="intervalo-seir", interval=100, disabled=True),
     ], className="content left"),
 
     html.Div([
         html.H2("Gráfica de la Epidemia", className="title"),
-        dcc.Graph(id="grafica-seir", style={"height": "450", "width": "100%"}),
+        dcc.Graph(id="grafica-seir", figure=figura_base_seir(), style={"height": "450", "width": "100%"}),
+        dcc.Graph(id="grafica-mapa-seir", style={"display": "none"}),
     ], className="content right"),
 
 ], className="page-container")
 
-def modelo_seir(y, t, N, beta, sigma, gamma):
-    S, E, I, R = y
-    dS_dt = -beta * S * I / N
-    dE_dt = beta * S * I / N - sigma * E
-    dI_dt = sigma * E - gamma * I
-    dR_dt = gamma * I
-    return [dS_dt, dE_dt, dI_dt, dR_dt]
-
 @callback(
     Output("grafica-seir", "figure"),
+    Output("grafica-seir", "extendData"),
+    Output("store-transmision-seir", "data"),
+    Output("intervalo-seir", "disabled"),
+    Output("grafica-mapa-seir", "figure"),
+    Output("grafica-mapa-seir", "style"),
     Input("btn-simular", "n_clicks"),
+    Input("intervalo-seir", "n_intervals"),
     State("input-N", "value"),
     State("input-beta", "value"),
     State("input-sigma", "value"),
@@ -75,89 +197,157 @@ def modelo_seir(y, t, N, beta, sigma, gamma):
     State("input-I0", "value"),
     State("input-E0", "value"),
     State("input-tiempo", "value"),
+    State("checklist-transmitir-seir", "value"),
+    State("store-transmision-seir", "data"),
+    State("radio-modo-seir", "value"),
+    State("dropdown-parches-seir", "value"),
     prevent_initial_call=False
 )
-def simular_seir(n_clicks, N, beta, sigma, gamma, I0, E0, tiempo_max):
+def simular_seir(n_clicks, n_intervals, N, beta, sigma, gamma, I0, E0, tiempo_max, transmitir, transmision,
+                 modo="una", conjunto=CONJUNTO_POR_DEFECTO):
+    if ctx.triggered_id == "intervalo-seir":
+        return *continuar_transmision(transmision), no_update, no_update
+
+    if transmision:
+        descartar_transmision(transmision)
+    if modo == "metapoblacion":
+        try:
+            figura, mapa = calcular_metapoblacion(conjunto, firma_parches(conjunto), beta, sigma, gamma, I0, E0, tiempo_max)
+        except (OSError, KeyError, ValueError) as error:
+            print(f"Error al cargar los parches del conjunto {conjunto!r}: {error}")
+            return parche_error("No se pudieron leer los parches del conjunto elegido"), no_update, None, True, no_update, MAPA_OCULTO
+        return figura, no_update, None, True, mapa, MAPA_VISIBLE
+    return (*simular_una_poblacion(N, beta, sigma, gamma, I0, E0, tiempo_max, transmitir), no_update, MAPA_OCULTO)
+
+
+def simular_una_poblacion(N, beta, sigma, gamma, I0, E0, tiempo_max, transmitir):
+    if "transmitir" not in (transmitir or []):
+        return calcular_seir(N, beta, sigma, gamma, I0, E0, tiempo_max), no_update, None, True
+
+    # El primer tramo va en la figura; el resto llega con extendData en cada intervalo
+    y0 = [N - I0 - E0, E0, I0, 0]
+    t = np.linspace(0, tiempo_max, resolucion_temporal(tiempo_max))
+    try:
+        integrador = IntegradorPorTramos(seir(N, beta, sigma, gamma), y0, (0, tiempo_max), t, metodo='LSODA',
+                                         rtol=TOLERANCIA_ODEINT, atol=TOLERANCIA_ODEINT)
+    except Exception:
+        return calcular_seir(N, beta, sigma, gamma, I0, E0, tiempo_max), no_update, None, True
+    transmision = iniciar_transmision(integrador)
+    t_tramo, y, terminado = siguiente_tramo(transmision)
+    if terminado:
+        descartar_transmision(transmision)
+    puntos = presupuesto_tramo(t_tramo.size, t.size)
+    return parche_seir(t_tramo, *y, puntos=puntos), no_update, None if terminado else transmision, terminado
+
+
+def continuar_transmision(transmision):
+    actual = obtener_transmision(transmision) if transmision else None
+    if actual is None:
+        if transmision and estado_transmision(transmision) == "expirada":
+            return parche_aviso(TEXTO_EXPIRADA), no_update, None, True
+        return no_update, no_update, None, True
+    t, y, terminado = actual.siguiente()
+    if terminado:
+        descartar_transmision(transmision)
+    reducidas = reducir(t, *y, puntos=presupuesto_tramo(t.size, actual.integrador.t_eval.size))
+    nuevos = ({"x": [tr for tr, _ in reducidas], "y": [yr for _, yr in reducidas]}, [0, 1, 2, 3])
+    return no_update, nuevos, None if terminado else no_update, terminado
+
+
+MAPA_VISIBLE = {"height": "500px", "width": "100%"}
+MAPA_OCULTO = {"display": "none"}
+
+
+@memoizar("seir_metapoblacion")
+def calcular_metapoblacion(conjunto, firma, beta, sigma, gamma, I0, E0, tiempo_max):
+    """Curvas agregadas y mapa de picos; firma cambia cuando cambian los CSV."""
+    poblaciones, coordenadas, movilidad = cargar_parches(conjunto)
+    t = np.linspace(0, tiempo_max, resolucion_temporal(tiempo_max, por_unidad=2))
+    t, (S, E, I, R), pico, dia_pico = simular_metapoblacion(poblaciones, movilidad, beta, sigma, gamma, I0, E0, t)
+
+    figura = parche_seir(t, S, E, I, R, titulo=f"<b>SEIR agregado sobre {poblaciones.size} parches</b>")
+    return figura, figura_mapa(poblaciones, coordenadas, pico, dia_pico)
+
+
+def figura_mapa(poblaciones, coordenadas, pico, dia_pico):
+    """Un punto por parche: color el dia del pico, tamaño la fraccion infectada en el pico."""
+    fraccion = pico / poblaciones
+    # Los parches a los que no llego la epidemia no tienen pico
+    alcanzados = fraccion > 1e-6
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=coordenadas[~alcanzados, 0], y=coordenadas[~alcanzados, 1],
+        mode='markers', name='Sin brote',
+        marker=dict(color='lightgray', size=4),
+        hoverinfo='skip',
+    ))
+    fig.add_trace(go.Scattergl(
+        x=coordenadas[alcanzados, 0], y=coordenadas[alcanzados, 1],
+        mode='markers', name='Pico de infectados',
+        marker=dict(
+            color=dia_pico[alcanzados], colorscale='Viridis', showscale=True,
+            colorbar=dict(title="Día del pico"),
+            size=4 + 16 * fraccion[alcanzados] / max(fraccion.max(), 1e-12),
+        ),
+        customdata=np.column_stack([np.flatnonzero(alcanzados), pico[alcanzados], poblaciones[alcanzados]]),
+        hovertemplate=('Parche %{customdata[0]:.0f}<br>Día del pico: %{marker.color:.0f}<br>'
+                       'Infectados en el pico: %{customdata[1]:,.0f} de %{customdata[2]:,.0f}<extra></extra>'),
+    ))
+    fig.update_layout(
+        title=dict(text="<b>Pico de infectados por parche</b>", x=0.5),
+        paper_bgcolor='white',
+        plot_bgcolor='lightyellow',
+        font=dict(family="outfit", size=12, color="black"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02),
+        margin=dict(l=40, r=40, t=70, b=40),
+    )
+    fig.update_yaxes(scaleanchor="x", scaleratio=1)
+    return fig
+
+
+TEXTO_EXPIRADA = "La transmisión expiró: había demasiadas simulaciones abiertas. Vuelva a simular."
+
+
+def parche_aviso(texto, parche=None):
+    """Deja el mensaje en el centro de la grafica sin tocar las curvas."""
+    parche = Patch() if parche is None else parche
+    parche["layout"]["annotations"] = [dict(text=texto, xref="paper", yref="paper", x=0.5, y=0.5,
+                                            showarrow=False, font=dict(size=15, color="red"))]
+    return parche
+
+
+def parche_error(texto):
+    """Oculta las curvas y deja el mensaje en el centro de la grafica."""
+    return parche_aviso(texto, parche_trazas([], ocultar=range(4)))
+
+
+@memoizar("seir")
+def calcular_seir(N, beta, sigma, gamma, I0, E0, tiempo_max):
     S0 = N - I0 - E0
     R0 = 0
     y0 = [S0, E0, I0, R0]
-    t = np.linspace(0, tiempo_max, 200)
+    t = np.linspace(0, tiempo_max, resolucion_temporal(tiempo_max))
 
+    fallo = False
     try:
-        solucion = odeint(modelo_seir, y0, t, args=(N, beta, sigma, gamma))
+        rhs, jac = seir(N, beta, sigma, gamma)
+        solucion = odeint(rhs, y0, t, Dfun=jac, tfirst=True)
         S, E, I, R = solucion.T
     except Exception:
+        fallo = True
         S = np.full_like(t, S0)
         E = np.full_like(t, E0)
         I = np.full_like(t, I0)
         R = np.full_like(t, R0)
 
-    fig = go.Figure()
-
-    fig.add_trace(go.Scatter(
-        x=t, y=S, 
-        mode='lines', 
-        name='Susceptibles (S)', 
-        line=dict(
-            color='blue', width=2),
-        hovertemplate='Dia: %{x:.0f}<br>Susceptibles: %{y:.0f}<extra></extra>'
-    ))
-    fig.add_trace(go.Scatter(
-        x=t, y=E, 
-        mode='lines', 
-        name='Expuestos (E)', 
-        line=dict(color='orange'),
-        hovertemplate='Dia: %{x:.0f}<br>Expuestos: %{y:.0f}<extra></extra>'
-    ))
-    fig.add_trace(go.Scatter(
-        x=t, y=I, 
-        mode='lines', 
-        name='Infectados (I)', 
-        line=dict(
-            color='red'),
-        hovertemplate='Dia: %{x:.0f}<br>Infectados: %{y:.0f}<extra></extra>'
-    ))
-    fig.add_trace(go.Scatter(
-        x=t, y=R, 
-        mode='lines', 
-        name='Recuperados (R)', 
-        line=dict(
-            color='green'),
-        hovertemplate='Dia: %{x:.0f}<br>Recuperados: %{y:.0f}<extra></extra>'
-    ))
-
-    fig.update_layout(
-        title=dict(
-            text="<b>Evolución del modelo SEIR</b>",
-            font=dict(
-                size=20, 
-                color='black'
-            ),
-            x=0.5, 
-            y=0.98
-        ),
-        xaxis_title="Tiempo (días)",
-        yaxis_title="Número de Personas",
-        paper_bgcolor='white',
-        plot_bgcolor='lightyellow',
-        font=dict(
-            family="outfit", 
-            size=12, 
-            color="black"),
-        legend=dict(
-            orientation="h", 
-            yanchor="bottom", 
-            y=1.02),
-        margin=dict(l=40, r=40, t=70, b=40)
-    )
+    # La curva constante de respaldo no se guarda en la cache
+    parche = parche_seir(t, S, E, I, R)
+    return NoGuardar(parche) if fallo else parche
 
-    fig.update_xaxes(
-        showgrid=True, gridwidth=1, gridcolor='black', 
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-        )
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor='black', 
-        zeroline=True, zerolinecolor='black', zerolinewidth=2
-    )
 
-    return fig
\ No newline at end of file
+def parche_seir(t, S, E, I, R, puntos=PUNTOS_PANTALLA, titulo=TITULO_SEIR):
+    """Patch sobre figura_base_seir con las cuatro curvas reducidas y el titulo."""
+    parche = parche_trazas(reducir(t, S, E, I, R, puntos=puntos))
+    parche["layout"]["title"]["text"] = titulo
+    parche["layout"]["annotations"] = []
+    return parche
@@ -1,11 +1,17 @@
 
 import dash
-from dash import html, dcc, Output, Input, State, callback
+from dash import html, dcc, Output, Input, State, callback, ctx
 import numpy as np 
 import plotly.graph_objects as go
 from scipy.integrate import odeint
 import requests
-from datetime import datetime
+from datetime import datetime, timedelta
+from utils.reduccion import reducir
+from utils.ajuste import ajustar, proyectar
+from utils.cache import cache_resultados, clave_canonica
+
+# Dias que se proyecta el modelo ajustado despues del ultimo dato
+DIAS_PROYECCION = 180
 
 dash.register_page(__name__, path='/Clase_8', name='Covid_19')
 
@@ -56,6 +62,28 @@ layout = html.Div([
 
     html.Div(
         id="info-actualizado-covid",
+    ),
+
+        html.Div([
+            html.Label("Modelo a ajustar:"),
+
+            dcc.Dropdown(
+                id="dropdown-modelo-covid",
+                options=[
+                    {"label": "SIR (β, γ)", "value": "sir"},
+                    {"label": "SEIR (β, σ, γ)", "value": "seir"},
+                ],
+                value="sir",
+                clearable=False,
+                className="input-field",
+                style={"width": "100%"},
+            )
+        ], className="input-group"),
+
+    html.Button("Ajustar Modelo", id="btn-ajustar-covid", className="btn-generar"),
+
+    html.Div(
+        id="info-ajuste-covid",
     )
     ], className="content left"),
 
@@ -156,13 +184,16 @@ def formatear_numero(num):
     Output("total-recuperados", "children"),
     Output("grafica-covid", "figure"),
     Output("info-actualizado-covid", "children"),
+    Output("info-ajuste-covid", "children"),
     Input("btn-actualizar-covid", "n_clicks"),
+    Input("btn-ajustar-covid", "n_clicks"),
     State("dropdown-pais", "value"),
     State("dropdown-dias-covid", "value"),
+    State("dropdown-modelo-covid", "value"),
     prevent_initial_call=False
 )
 
-def actualizar_datos_covid(n_clicks, pais, dias):
+def actualizar_datos_covid(n_clicks, n_ajustar, pais, dias, modelo="sir"):
 
     datos_actuales = obtener_datos_covid(pais)
     historico = obtener_historico_covid(pais, dias)
@@ -181,7 +212,7 @@ def actualizar_datos_covid(n_clicks, pais, dias):
             paper_bgcolor="black",
             plot_bgcolor="black",
         )
-        return "N/A", "N/A", "N/A", "N/A" , fig, "No se pudieron actualizar los datos."
+        return "N/A", "N/A", "N/A", "N/A" , fig, "No se pudieron actualizar los datos.", ""
     
     total_casos= datos_actuales.get("cases", 0)
     casos_hoy= datos_actuales.get("todayCases", 0)
@@ -202,11 +233,12 @@ def actualizar_datos_covid(n_clicks, pais, dias):
     valores_muertes= list(muertes_historicas.values())
 
     fechas_dt = [datetime.strptime(fecha, "%m/%d/%y") for fecha in fechas]
+    (fechas_casos, valores_casos), (fechas_muertes, valores_muertes) = reducir(fechas_dt, valores_casos, valores_muertes)
 
     fig= go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=fechas_dt, 
+        x=fechas_casos, 
         y=valores_casos,
         mode='lines',
         fill='tozeroy',
@@ -217,7 +249,7 @@ def actualizar_datos_covid(n_clicks, pais, dias):
     ))
 
     fig.add_trace(go.Scatter(
-        x=fechas_dt,
+        x=fechas_muertes,
         y=valores_muertes,
         mode='lines',
         fill='tozeroy',
@@ -243,4 +275,66 @@ def actualizar_datos_covid(n_clicks, pais, dias):
         margin=dict(l=40, r=40, t=70, b=40)
     )
 
-    return [total_casos_texto, casos_hoy_texto, total_muertes_texto, total_recuperados_texto, fig, f"Datos actualizados para {pais}" ]
\ No newline at end of file
+    info_ajuste = ""
+    if ctx.triggered_id == "btn-ajustar-covid":
+        poblacion = datos_actuales.get("population", 0)
+        info_ajuste = agregar_ajuste(fig, pais, modelo, poblacion, fechas_dt, list(casos_historico.values()))
+
+    return [total_casos_texto, casos_hoy_texto, total_muertes_texto, total_recuperados_texto, fig, f"Datos actualizados para {pais}", info_ajuste]
+
+
+def agregar_ajuste(fig, pais, modelo, poblacion, fechas, casos):
+    """Ajusta el modelo a los casos acumulados y dibuja la curva ajustada, la proyeccion y el pico."""
+    if len(casos) < 10 or not poblacion:
+        return "Se necesitan al menos 10 días de datos y la población del país."
+
+    # El mismo pais y modelo arranca desde su ultimo ajuste; la misma serie sale de la cache
+    clave_inicio = clave_canonica("ajuste_covid_inicio", pais, modelo)
+    clave = clave_canonica("ajuste_covid", modelo, poblacion, casos)
+    encontrado, ajuste = cache_resultados.obtener(clave)
+    if not encontrado:
+        ajuste = ajustar(modelo, poblacion, casos, inicio=cache_resultados.obtener(clave_inicio)[1])
+        cache_resultados.guardar(clave, ajuste)
+        cache_resultados.guardar(clave_inicio, ajuste)
+
+    dias = len(casos) + DIAS_PROYECCION
+    casos_modelo, activos, pico = proyectar(modelo, poblacion, casos[0], ajuste, dias)
+    fechas_modelo = [fechas[0] + timedelta(days=dia) for dia in range(dias)]
+    (fechas_ajuste, valores_ajuste), = reducir(fechas_modelo[:len(casos)], casos_modelo[:len(casos)])
+    (fechas_proyeccion, valores_proyeccion), = reducir(fechas_modelo[len(casos) - 1:], casos_modelo[len(casos) - 1:])
+
+    fig.add_trace(go.Scatter(
+        x=fechas_ajuste,
+        y=valores_ajuste,
+        mode='lines',
+        name=f'Ajuste {modelo.upper()}',
+        line=dict(color='black', width=2),
+        hovertemplate='Fecha: %{x|%Y-%m-%d}<br>Modelo: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=fechas_proyeccion,
+        y=valores_proyeccion,
+        mode='lines',
+        name='Proyección',
+        line=dict(color='black', width=2, dash='dash'),
+        hovertemplate='Fecha: %{x|%Y-%m-%d}<br>Proyección: %{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=[fechas_modelo[pico]],
+        y=[casos_modelo[pico]],
+        mode='markers',
+        name='Pico de activos',
+        marker=dict(color='orange', size=12, symbol='star'),
+        customdata=[activos[pico]],
+        hovertemplate='Pico: %{x|%Y-%m-%d}<br>Activos: %{customdata:,.0f}<extra></extra>'
+    ))
+
+    tasas = ", ".join(f"{nombre} = {ajuste[nombre]:.4f}" for nombre in ("beta", "sigma", "gamma") if nombre in ajuste)
+    if pico == 0:
+        texto_pico = "los infectados activos ya van en descenso"
+    elif pico == dias - 1:
+        texto_pico = "los infectados activos siguen creciendo al final de la proyección"
+    else:
+        texto_pico = f"pico de activos el {fechas_modelo[pico]:%Y-%m-%d} con {activos[pico]:,.0f}"
+    return (f"{modelo.upper()}: {tasas}, R0 = {ajuste['beta'] / ajuste['gamma']:.2f}; {texto_pico}. "
+            f"Error relativo {100 * ajuste['error']:.2f} %.")
\ No newline at end of file
@@ -1,61 +1,93 @@
+import math
+import time
+
 import dash
-from dash import html, dcc, Output, Input, State, callback
+from dash import html, dcc, Output, Input, State, callback, ctx, no_update
 import numpy as np 
 import plotly.graph_objects as go
-from scipy.integrate import solve_ivp  # Importamos solve_ivp
+from plotly.subplots import make_subplots
+from utils.modelos import sip, simular_por_tramos, IntegradorPorTramos, jit_disponible, JIT_POR_DEFECTO
+from utils.cache import CacheResultados, cache_resultados, clave_canonica
+from utils.tareas import gestor_tareas
+from utils.transmision import (iniciar_transmision, obtener_transmision, siguiente_tramo, descartar_transmision,
+                                estado_transmision)
+from utils.reduccion import reducir, resolucion_temporal, presupuesto_tramo, PUNTOS_PANTALLA
+from utils.figuras import parche_trazas, rangos
+from utils.parametros import DEFAULT_PARAMS, INITIAL_CONDITIONS
+from utils.sensibilidad import (SALIDAS, TAMANO_LOTE, limites, diseno_sobol, diseno_morris, evaluar_sip,
+                                indices_sobol, efectos_morris)
 
 dash.register_page(__name__, path='/Proyecto', name='Proyecto')
 
-# Definición del Sistema de Ecuaciones Diferenciales
-def sistema_sip(t, y, params):
-    xS, xI, y_pred = y
-
-    r = params['r']
-    K = params['K']
-    alpha = params['alpha']
-    g = params['g']
-    a1 = params['a1']
-    m = params['m']
-    mu = params['mu']
-    rho = params['rho']
-    a2 = params['a2']
-    n = params['n']
-    w1 = params['w1']
-    w2 = params['w2']
-    c = params['c']
-    d = params['d']
-
-    
-    dxS_dt = r * xS * (1 - (xS + xI) / K) - alpha * xS * xI + g * xI - a1 * (1 - m) * xS * y_pred - mu * xS
-    dxI_dt = alpha * xS * xI - (mu + g + rho) * xI - a2 * (1 - n) * xI * y_pred
-    dy_dt = a1 * w1 * (1 - m) * xS * y_pred + a2 * w2 * (1 - n) * xI * y_pred - c * y_pred - d * y_pred**2
-
-    return [dxS_dt, dxI_dt, dy_dt]
-
-
-DEFAULT_PARAMS = {
-    "r": {"label": "Crecimiento intrínseco (r)", "value": 0.10, "step": 0.01},
-    "K": {"label": "Capacidad de carga (K)", "value": 60.0, "step": 1.0},
-    "alpha": {"label": "Tasa de infección (α)", "value": 0.30, "step": 0.01},
-    "g": {"label": "Tasa de recuperación (g)", "value": 0.07, "step": 0.005},
-    "a1": {"label": "Tasa de encuentro (S) (a₁)", "value": 0.20, "step": 0.01},
-    "m": {"label": "Refugio (S) (m)", "value": 0.60, "step": 0.01},
-    "mu": {"label": "Mortalidad natural (μ)", "value": 0.01, "step": 0.001},
-    "rho": {"label": "Mortalidad extra por enf. (ρ)", "value": 0.10, "step": 0.01},
-    "a2": {"label": "Tasa de encuentro (I) (a₂)", "value": 0.30, "step": 0.01},
-    "n": {"label": "Refugio (I) (n)", "value": 0.40, "step": 0.01},
-    "w1": {"label": "Efic. depredación (S)  (w₁)", "value": 0.45, "step": 0.01},
-    "w2": {"label": "Efic. depredación (I)  (w₂)", "value": 0.40, "step": 0.01},
-    "c": {"label": "Mortalidad Depredador (c)", "value": 0.035, "step": 0.001},
-    "d": {"label": "Competencia Depredador (d)", "value": 0.01, "step": 0.001},
-}
+# Interpolantes de las ultimas corridas, para volver a muestrear la ventana visible al hacer zoom
+soluciones_densas = CacheResultados(None, max_bytes_memoria=256 * 2**20)
 
-INITIAL_CONDITIONS = {
-    "xS0": {"label": "Presas Susceptibles Iniciales (xS₀)", "value": 12.0, "step": 0.1},
-    "xI0": {"label": "Presas Infectadas Iniciales (xI₀)", "value": 3.0, "step": 0.1},
-    "y0": {"label": "Depredadores Iniciales (y₀)", "value": 7.0, "step": 0.1},
-    "tiempo": {"label": "Tiempo de simulación", "value": 1000, "step": 10},
-}
+
+TITULO_SIP = "<b>Simulación del Sistema Depredador-Presa-Enfermedad</b>"
+
+
+def figura_base_sip():
+    """Estilo y trazas vacias de la grafica de la simulacion; los callbacks solo envian datos."""
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='lines', 
+        name='Presas Susceptibles (xS)', 
+        line=dict(color='green', width=2),
+        hovertemplate='Tiempo: %{x:.0f}<br>xS: %{y:.2f}<extra></extra>'
+    )) 
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='lines', 
+        name='Presas Infectadas (xI)', 
+        line=dict(color='red', width=2),
+        hovertemplate='Tiempo: %{x:.0f}<br>xI: %{y:.2f}<extra></extra>'
+    )) 
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='lines', 
+        name='Depredadores (y)', 
+        line=dict(color='blue', width=2),
+        hovertemplate='Tiempo: %{x:.0f}<br>y: %{y:.2f}<extra></extra>'
+    ))
+
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='markers', name='xS Final', 
+        marker=dict(color='green', size=8), showlegend=False,
+        hovertemplate="xS Final: %{y:.2f}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='markers', name='xI Final', 
+        marker=dict(color='red', size=8), showlegend=False,
+        hovertemplate="xI Final: %{y:.2f}<extra></extra>"
+    ))
+    fig.add_trace(go.Scatter(
+        x=[], y=[], mode='markers', name='y Final', 
+        marker=dict(color='blue', size=8), showlegend=False,
+        hovertemplate="y Final: %{y:.2f}<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=TITULO_SIP,
+        xaxis_title="Tiempo",
+        yaxis_title="Densidad de Población",
+        plot_bgcolor='lightyellow',
+        paper_bgcolor='White',
+        font=dict(family="Arial", size=12, color="black"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0), 
+        margin=dict(l=40, r=40, t=100, b=40)  
+    )
+    fig.update_xaxes(
+        showgrid=True, gridwidth=1, gridcolor='black', 
+        zeroline=True, zerolinecolor='black', zerolinewidth=2,
+        )
+    fig.update_yaxes(
+        showgrid=True, gridwidth=1, gridcolor='black', 
+        zeroline=True, zerolinecolor='black', zerolinewidth=2
+    )
+
+
+    return fig
 
 
 def generate_input_group(id_key, config):
@@ -71,7 +103,7 @@ def generate_input_group(id_key, config):
     ], className="input-group")
 
 
-layout = html.Div([
+panel_simulacion = html.Div([
 
     html.Div([
 
@@ -90,19 +122,134 @@ layout = html.Div([
             *[generate_input_group(key, config) for key, config in INITIAL_CONDITIONS.items()]
         ], className="input-grid-init"),
 
+        html.Div([
+            dcc.Checklist(
+                id="checklist-jit-sip",
+                options=[{
+                    "label": " Compilar el modelo con numba" if jit_disponible() else " Compilar el modelo (numba no está instalado)",
+                    "value": "jit",
+                    "disabled": not jit_disponible(),
+                }],
+                value=["jit"] if jit_disponible() and JIT_POR_DEFECTO else [],
+            ),
+            dcc.Checklist(
+                id="checklist-transmitir-sip",
+                options=[{"label": " Dibujar la curva mientras se integra", "value": "transmitir"}],
+                value=[],
+            ),
+        ], className="input-group", style={'marginTop': '20px'}),
+
+        html.Div([
+            html.Label("Método de integración:"),
+            dcc.Dropdown(
+                id="dropdown-metodo-sip",
+                options=[
+                    {"label": "Automático (detecta rigidez)", "value": "auto"},
+                    {"label": "RK45 (explícito)", "value": "RK45"},
+                    {"label": "Radau (implícito)", "value": "Radau"},
+                    {"label": "BDF (implícito)", "value": "BDF"},
+                    {"label": "LSODA", "value": "LSODA"},
+                ],
+                value="auto",
+                clearable=False,
+                className="input-field",
+                style={"width": "100%"},
+            ),
+        ], className="input-group"),
+
+        # Vacios desactivan el corte anticipado
+        html.Div([
+            html.Label("Umbral de extinción:"),
+            dcc.Input(id="input-extincion-sip", type='number', value=1e-6, className="input-field"),
+        ], className="input-group"),
+        html.Div([
+            html.Label("Tolerancia de equilibrio:"),
+            dcc.Input(id="input-equilibrio-sip", type='number', value=1e-6, className="input-field"),
+        ], className="input-group"),
+
         html.Button("Simular Dinámica Poblacional", id="btn-simular", className="btn-generar", style={'marginTop': '30px', 'marginBottom': '20px'}),
 
+        # Progreso de la simulacion que corre en segundo plano
+        html.Div([
+            html.Progress(id="progreso-sip", value="0", max="1", style={"width": "100%"}),
+            html.Div(id="texto-progreso-sip"),
+            html.Button("Cancelar", id="btn-cancelar-sip", className="btn-generar", style={'marginTop': '10px'}),
+        ], className="input-group"),
+        dcc.Store(id="store-tarea-sip"),
+        dcc.Store(id="store-vista-sip"),
+        dcc.Interval(id="intervalo-sip", interval=100, disabled=True),
+
     ], className="content left"),
 
     html.Div([
         html.H2("Gráfica de la Dinámica Poblacional", className="title", style={'marginBottom': '10px'}),  
-        dcc.Graph(id="grafica-sip", style={"height": "650px", "width": "100%"}),
+        dcc.Graph(id="grafica-sip", figure=figura_base_sip(), style={"height": "650px", "width": "100%"}),
     ], className="content right"),
 
 
 ], className="page-container")
 
 
+panel_sensibilidad = html.Div([
+
+    html.Div([
+
+        html.H2("Análisis de Sensibilidad Global", className="title"),
+        html.P("Muestrea los 14 parámetros alrededor de sus valores por defecto, con las condiciones iniciales de arriba."),
+
+        html.Div([
+            html.Label("Método:"),
+            dcc.Dropdown(
+                id="dropdown-sensibilidad-sip",
+                options=[
+                    {"label": "Sobol (índices de primer orden y total)", "value": "sobol"},
+                    {"label": "Morris (efectos elementales)", "value": "morris"},
+                ],
+                value="sobol",
+                clearable=False,
+                className="input-field",
+                style={"width": "100%"},
+            ),
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Muestras base (Sobol) o trayectorias (Morris):"),
+            dcc.Input(id="input-muestras-sens", type='number', value=256, min=2, step=1, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Variación alrededor del valor por defecto (%):"),
+            dcc.Input(id="input-variacion-sens", type='number', value=20, min=0, max=100, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Tiempo de simulación:"),
+            dcc.Input(id="input-tiempo-sens", type='number', value=1000, className="input-field")
+        ], className="input-group"),
+
+        html.Button("Calcular Sensibilidad", id="btn-sensibilidad", className="btn-generar", style={'marginTop': '20px'}),
+
+        html.Div([
+            html.Progress(id="progreso-sens", value="0", max="1", style={"width": "100%"}),
+            html.Div(id="texto-progreso-sens"),
+            html.Button("Cancelar", id="btn-cancelar-sens", className="btn-generar", style={'marginTop': '10px'}),
+        ], className="input-group"),
+        dcc.Store(id="store-sensibilidad"),
+        dcc.Interval(id="intervalo-sens", interval=250, disabled=True),
+
+    ], className="content left"),
+
+    html.Div([
+        html.H2("Índices de Sensibilidad", className="title", style={'marginBottom': '10px'}),
+        dcc.Graph(id="grafica-sensibilidad", style={"height": "650px", "width": "100%"}),
+    ], className="content right"),
+
+], className="page-container")
+
+
+layout = html.Div([panel_simulacion, panel_sensibilidad])
+
+
 all_states = [
     State("input-xS0", "value"),
     State("input-xI0", "value"),
@@ -113,101 +260,366 @@ all_states = [
 for key in DEFAULT_PARAMS.keys():
     all_states.append(State(f"input-{key}", "value"))
 
+all_states.append(State("checklist-jit-sip", "value"))
+all_states.append(State("checklist-transmitir-sip", "value"))
+all_states.append(State("dropdown-metodo-sip", "value"))
+all_states.append(State("input-extincion-sip", "value"))
+all_states.append(State("input-equilibrio-sip", "value"))
+
 @callback(
     Output("grafica-sip", "figure"),
+    Output("grafica-sip", "extendData"),
+    Output("store-tarea-sip", "data"),
+    Output("intervalo-sip", "disabled"),
+    Output("progreso-sip", "value"),
+    Output("texto-progreso-sip", "children"),
+    Output("store-vista-sip", "data"),
     Input("btn-simular", "n_clicks"),
-    all_states,  
+    Input("intervalo-sip", "n_intervals"),
+    Input("btn-cancelar-sip", "n_clicks"),
+    Input("grafica-sip", "relayoutData"),
+    all_states,
+    State("store-tarea-sip", "data"),
+    State("store-vista-sip", "data"),
     prevent_initial_call=False
 )
+def simular_sip(n_clicks, n_intervals, n_cancelar, relayout, xS0, xI0, y0, tiempo_max, r, K, alpha, g, a1, m, mu, rho, a2, n, w1, w2, c, d, opciones_jit, transmitir, metodo, extincion, equilibrio, tarea, vista):
+
+    if ctx.triggered_id == "grafica-sip":
+        return acercar(relayout, vista)
+
+    if ctx.triggered_id == "intervalo-sip":
+        if tarea and tarea.get("transmision"):
+            return continuar_transmision(tarea)
+        return revisar_tarea(tarea)
+
+    if ctx.triggered_id == "btn-cancelar-sip":
+        if not tarea:
+            return no_update, no_update, no_update, True, no_update, no_update, no_update
+        detener(tarea)
+        return no_update, no_update, None, True, no_update, "Simulación cancelada.", no_update
 
-def simular_sip(n_clicks, xS0, xI0, y0, tiempo_max, r, K, alpha, g, a1, m, mu, rho, a2, n, w1, w2, c, d):
-    
     params = {
         'r': r, 'K': K, 'alpha': alpha, 'g': g, 'a1': a1, 'm': m, 'mu': mu, 'rho': rho,
         'a2': a2, 'n': n, 'w1': w1, 'w2': w2, 'c': c, 'd': d,
     }
+    usar_jit = "jit" in (opciones_jit or [])
+    eventos = {'extincion': extincion, 'equilibrio': equilibrio}
+    clave = clave_canonica("sip", xS0, xI0, y0, tiempo_max, params, usar_jit, metodo, eventos)
+
+    # Una corrida con otras entradas reemplaza a la anterior
+    if tarea and (tarea["clave"] != clave or tarea.get("transmision")):
+        detener(tarea)
+
+    encontrado, figura = cache_resultados.obtener(clave)
+    if encontrado:
+        return figura, no_update, None, True, "1", "", clave
 
     # Condiciones iniciales y tiempo
     y0_vec = [xS0, xI0, y0]
     t_span = [0, tiempo_max]
-    t_eval = np.linspace(0, tiempo_max, 2000)
-
-    try:
-       
-        solucion = solve_ivp(
-            sistema_sip, 
-            t_span, 
-            y0_vec, 
-            t_eval=t_eval, 
-            method='RK45', 
-            args=(params,) 
-        )
-        xS, xI, y_pred = solucion.y
-        t = solucion.t
-    except Exception as e:
-        print(f"Error en solve_ivp: {e}")
-        # En caso de error, retornar una gráfica vacía o con valores iniciales
-        t = np.linspace(0, tiempo_max, 2000)
-        xS, xI, y_pred = np.full_like(t, xS0), np.full_like(t, xI0), np.full_like(t, y0)
+    t_eval = np.linspace(0, tiempo_max, resolucion_temporal(tiempo_max, por_unidad=20, minimo=2000))
+    tarea = {"clave": clave, "tiempo": tiempo_max, "inicial": y0_vec}
+
+    if "transmitir" in (transmitir or []):
+        # El primer tramo va en la figura; el resto llega con extendData en cada intervalo
+        try:
+            integrador = IntegradorPorTramos(
+                sip(**params, jit=usar_jit), y0_vec, t_span, t_eval, metodo=metodo, densa=True, **eventos,
+            )
+        except Exception as e:
+            print(f"Error en la integración: {e}")
+            return figura_fallida(tarea), no_update, None, True, "1", "La integración falló.", None
+        tarea.update(id=iniciar_transmision(integrador), transmision=True)
+        t, y, terminado = siguiente_tramo(tarea["id"])
+        puntos = presupuesto_tramo(t.size, t_eval.size)
+        return parche_sip(t, *y, finales=False, puntos=puntos), no_update, tarea, False, "0", "", None
+
+    tarea["id"] = gestor_tareas.enviar(
+        clave, simular_por_tramos, "sip", params, y0_vec, t_span, t_eval, metodo=metodo, jit=usar_jit,
+        densa=True, **eventos,
+    )
+    return no_update, no_update, tarea, False, "0", f"Integrando: t = 0 de {tiempo_max}", no_update
+
+
+def detener(tarea):
+    if tarea.get("transmision"):
+        descartar_transmision(tarea["id"])
+    else:
+        gestor_tareas.cancelar(tarea["id"])
+
+
+def continuar_transmision(tarea):
+    """Integra el siguiente tramo y lo agrega a la grafica con extendData."""
+    transmision = obtener_transmision(tarea["id"])
+    if transmision is None:
+        if estado_transmision(tarea["id"]) == "expirada":
+            texto = "La transmisión expiró: había demasiadas simulaciones abiertas. Vuelva a simular."
+        else:
+            texto = "Simulación cancelada."
+        return no_update, no_update, None, True, no_update, texto, no_update
+
+    t, y, terminado = transmision.siguiente()
+    integrador = transmision.integrador
+    progreso = integrador.progreso
+    reducidas = reducir(t, *y, puntos=presupuesto_tramo(t.size, integrador.t_eval.size))
+    nuevos = ({"x": [tr for tr, _ in reducidas], "y": [yr for _, yr in reducidas]}, [0, 1, 2])
+    texto = f"Integrando: t = {progreso * tarea['tiempo']:.0f} de {tarea['tiempo']}"
+    if not terminado:
+        return no_update, nuevos, no_update, False, str(progreso), texto, no_update
+
+    descartar_transmision(tarea["id"])
+    if not integrador.exito:
+        return no_update, nuevos, None, True, str(progreso), "La integración falló.", no_update
+
+    # Los marcadores del estado final llegan con el ultimo tramo
+    solucion = integrador.resultado()
+    nuevos = (
+        {"x": nuevos[0]["x"] + [solucion.t[-1:]] * 3, "y": nuevos[0]["y"] + [valores[-1:] for valores in solucion.y]},
+        [0, 1, 2, 3, 4, 5],
+    )
+    resumen = resumen_solucion(solucion)
+    cache_resultados.guardar(tarea["clave"], parche_sip(solucion.t, *solucion.y, resumen=resumen).to_plotly_json())
+    soluciones_densas.guardar(tarea["clave"], (solucion.sol, resumen, solucion.t[-1]))
+    return no_update, nuevos, None, True, "1", resumen, tarea["clave"]
+
+
+def revisar_tarea(tarea):
+    """Consulta la tarea en segundo plano y, si termino, arma y guarda la figura."""
+    if not tarea:
+        return no_update, no_update, None, True, no_update, no_update, no_update
+
+    # Otra pestaña pudo haber terminado la misma simulacion
+    encontrado, figura = cache_resultados.obtener(tarea["clave"])
+    if encontrado:
+        gestor_tareas.olvidar(tarea["id"])
+        return figura, no_update, None, True, "1", "", tarea["clave"]
+
+    estado = gestor_tareas.estado(tarea["id"])
+    progreso = estado["progreso"]
+    if estado["estado"] == "ejecutando":
+        texto = f"Integrando: t = {progreso * tarea['tiempo']:.0f} de {tarea['tiempo']}"
+        return no_update, no_update, no_update, False, str(progreso), texto, no_update
+    if estado["estado"] in ("cancelada", "desconocida"):
+        return no_update, no_update, None, True, str(progreso), "Simulación cancelada.", no_update
+
+    gestor_tareas.olvidar(tarea["id"])
+    if estado["estado"] == "error" or not estado["resultado"].success:
+        print(f"Error en la integración: {estado.get('error') or estado['resultado'].message}")
+        return figura_fallida(tarea), no_update, None, True, "1", "La integración falló.", None
+
+    solucion = estado["resultado"]
+    resumen = resumen_solucion(solucion)
+    figura = parche_sip(solucion.t, *solucion.y, resumen=resumen).to_plotly_json()
+    cache_resultados.guardar(tarea["clave"], figura)
+    soluciones_densas.guardar(tarea["clave"], (solucion.sol, resumen, solucion.t[-1]))
+    return figura, no_update, None, True, "1", resumen, tarea["clave"]
+
+
+def acercar(relayout, vista):
+    """Vuelve a muestrear la ventana visible con el interpolante guardado, sin integrar de nuevo."""
+    sin_cambios = (no_update,) * 7
+    if not relayout or not vista:
+        return sin_cambios
+
+    if relayout.get("xaxis.autorange"):
+        encontrado, figura = cache_resultados.obtener(vista)
+        return (figura,) + sin_cambios[1:] if encontrado else sin_cambios
+    if "xaxis.range[0]" not in relayout:
+        return sin_cambios
+
+    encontrado, guardada = soluciones_densas.obtener(vista)
+    if not encontrado or guardada[0] is None:
+        return sin_cambios
+    solucion, resumen, t_fin = guardada
+
+    # El interpolante se evalua mas fino que la pantalla y LTTB deja los picos de la ventana;
+    # el ultimo paso puede pasarse del corte por un evento, asi que se limita a t_fin
+    inicio = max(float(relayout["xaxis.range[0]"]), solucion.t_min)
+    fin = min(float(relayout["xaxis.range[1]"]), solucion.t_max, t_fin)
+    if fin <= inicio:
+        return sin_cambios
+    t = np.linspace(inicio, fin, 10 * PUNTOS_PANTALLA)
+    rango = (relayout["xaxis.range[0]"], relayout["xaxis.range[1]"])
+    figura = parche_sip(t, *solucion(t), finales=fin >= t_fin, resumen=resumen, rango=rango)
+    return (figura,) + sin_cambios[1:]
+
+
+MOTIVOS = {
+    'final': "se alcanzó el tiempo final",
+    'extincion': "todas las poblaciones cayeron bajo el umbral de extinción",
+    'equilibrio': "la solución llegó a un equilibrio",
+}
 
 
-    fig = go.Figure()
+def resumen_solucion(solucion):
+    """Metodo usado, cambios por rigidez y motivo del corte, para mostrar en la pagina."""
+    (_, metodo), *cambios = solucion.cambios
+    texto = f"Método: {metodo}"
+    for t, nuevo in cambios:
+        texto += f", cambió a {nuevo} en t = {t:.1f} por rigidez"
+    return f"{texto}. Terminó en t = {solucion.t[-1]:.1f}: {MOTIVOS.get(solucion.motivo, solucion.message)}."
 
-    fig.add_trace(go.Scatter(
-        x=t, y=xS, mode='lines', 
-        name='Presas Susceptibles (xS)', 
-        line=dict(color='green', width=2),
-        hovertemplate='Tiempo: %{x:.0f}<br>xS: %{y:.2f}<extra></extra>'
-    )) 
 
-    fig.add_trace(go.Scatter(
-        x=t, y=xI, mode='lines', 
-        name='Presas Infectadas (xI)', 
-        line=dict(color='red', width=2),
-        hovertemplate='Tiempo: %{x:.0f}<br>xI: %{y:.2f}<extra></extra>'
-    )) 
+def figura_fallida(tarea):
+    # En caso de error, retornar una gráfica con los valores iniciales
+    t = np.linspace(0, tarea["tiempo"], 2000)
+    xS, xI, y_pred = (np.full_like(t, valor) for valor in tarea["inicial"])
+    return parche_sip(t, xS, xI, y_pred)
 
-    fig.add_trace(go.Scatter(
-        x=t, y=y_pred, mode='lines', 
-        name='Depredadores (y)', 
-        line=dict(color='blue', width=2),
-        hovertemplate='Tiempo: %{x:.0f}<br>y: %{y:.2f}<extra></extra>'
-    ))
 
-    fig.add_trace(go.Scatter(
-        x=[t[-1]], y=[xS[-1]], mode='markers', name='xS Final', 
-        marker=dict(color='green', size=8), showlegend=False,
-        hovertemplate=f"xS Final: {xS[-1]:.2f}<extra></extra>"
-    ))
-    fig.add_trace(go.Scatter(
-        x=[t[-1]], y=[xI[-1]], mode='markers', name='xI Final', 
-        marker=dict(color='red', size=8), showlegend=False,
-        hovertemplate=f"xI Final: {xI[-1]:.2f}<extra></extra>"
-    ))
-    fig.add_trace(go.Scatter(
-        x=[t[-1]], y=[y_pred[-1]], mode='markers', name='y Final', 
-        marker=dict(color='blue', size=8), showlegend=False,
-        hovertemplate=f"y Final: {y_pred[-1]:.2f}<extra></extra>"
-    ))
+def parche_sip(t, xS, xI, y_pred, finales=True, puntos=PUNTOS_PANTALLA, resumen=None, rango=None):
+    """Patch sobre figura_base_sip; con finales=False los marcadores del estado final quedan vacios.
+
+    El resumen del metodo y del corte, si se da, va como subtitulo. Sin `rango` el eje x
+    vuelve a ajustarse a los datos.
+
+    Cada serie se reduce con LTTB a `puntos` para que el envio no crezca con la resolucion.
+    """
+    parche = parche_trazas(reducir(t, xS, xI, y_pred, puntos=puntos))
+    marcadores = [(t[-1:], serie[-1:]) if finales else ([], []) for serie in (xS, xI, y_pred)]
+    parche_trazas(marcadores, inicio=3, parche=parche)
+    parche["layout"]["title"]["text"] = TITULO_SIP + (f"<br><sup>{resumen}</sup>" if resumen else "")
+    return rangos(parche, x=rango)
+
+
+@callback(
+    Output("grafica-sensibilidad", "figure"),
+    Output("store-sensibilidad", "data"),
+    Output("intervalo-sens", "disabled"),
+    Output("progreso-sens", "value"),
+    Output("texto-progreso-sens", "children"),
+    Input("btn-sensibilidad", "n_clicks"),
+    Input("intervalo-sens", "n_intervals"),
+    Input("btn-cancelar-sens", "n_clicks"),
+    State("dropdown-sensibilidad-sip", "value"),
+    State("input-muestras-sens", "value"),
+    State("input-variacion-sens", "value"),
+    State("input-tiempo-sens", "value"),
+    State("input-xS0", "value"),
+    State("input-xI0", "value"),
+    State("input-y0", "value"),
+    State("store-sensibilidad", "data"),
+    prevent_initial_call=True
+)
+def calcular_sensibilidad(n_clicks, n_intervals, n_cancelar, metodo, muestras, variacion, tiempo_max,
+                          xS0, xI0, y0, analisis):
+
+    if ctx.triggered_id == "intervalo-sens":
+        return revisar_sensibilidad(analisis)
+
+    if analisis:
+        for parte in analisis["partes"]:
+            if parte["id"]:
+                gestor_tareas.cancelar(parte["id"])
+    if ctx.triggered_id == "btn-cancelar-sens":
+        return no_update, None, True, no_update, "Análisis cancelado."
+
+    if None in (muestras, variacion, tiempo_max, xS0, xI0, y0) or muestras < 2 or tiempo_max <= 0:
+        return no_update, None, True, "0", "Revise las muestras y el tiempo."
+
+    # Con una potencia de 2 la secuencia de Sobol queda balanceada
+    muestras = int(muestras)
+    if metodo == "sobol":
+        muestras = 2 ** math.ceil(math.log2(muestras))
+    analisis = {"metodo": metodo, "muestras": muestras, "variacion": variacion, "tiempo": tiempo_max,
+                "inicial": [xS0, xI0, y0], "inicio": time.time(), "partes": []}
+    filas = filas_sensibilidad(analisis)
+
+    # Cada parte es un lote de integrar_lote y una tarea del pool; las ya calculadas salen de la cache
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        parte = filas[inicio:inicio + TAMANO_LOTE]
+        clave = clave_canonica("sensibilidad_sip", parte, analisis["inicial"], tiempo_max)
+        id_parte = None
+        if not cache_resultados.obtener(clave)[0]:
+            id_parte = gestor_tareas.enviar(clave, evaluar_sip, parte, list(DEFAULT_PARAMS), analisis["inicial"], tiempo_max)
+        analisis["partes"].append({"clave": clave, "id": id_parte, "filas": len(parte)})
+
+    texto = f"Evaluando el modelo {len(filas)} veces..."
+    return revisar_sensibilidad(analisis, texto)
+
+
+def filas_sensibilidad(analisis):
+    """Juegos de parametros del diseño; es deterministico, asi que se puede rehacer al terminar."""
+    base = {clave: config["value"] for clave, config in DEFAULT_PARAMS.items()}
+    bajo, alto = limites(base, analisis["variacion"] / 100)
+    return bajo + diseno_sensibilidad(analisis) * (alto - bajo)
+
+
+def diseno_sensibilidad(analisis):
+    if analisis["metodo"] == "sobol":
+        return diseno_sobol(len(DEFAULT_PARAMS), analisis["muestras"])
+    return diseno_morris(len(DEFAULT_PARAMS), analisis["muestras"])
+
+
+def revisar_sensibilidad(analisis, texto=None):
+    """Guarda las partes terminadas; cuando estan todas calcula los indices y dibuja."""
+    if not analisis:
+        return no_update, None, True, no_update, no_update
+
+    total = sum(parte["filas"] for parte in analisis["partes"])
+    hechas = 0.0
+    for parte in analisis["partes"]:
+        if parte["id"] is None:
+            hechas += parte["filas"]
+            continue
+        estado = gestor_tareas.estado(parte["id"])
+        if estado["estado"] == "ejecutando":
+            hechas += estado["progreso"] * parte["filas"]
+            continue
+        if estado["estado"] == "terminada":
+            cache_resultados.guardar(parte["clave"], estado["resultado"])
+        else:
+            print(f"Error en una parte del análisis de sensibilidad: {estado.get('error', estado['estado'])}")
+        gestor_tareas.olvidar(parte["id"])
+        parte["id"] = None
+        hechas += parte["filas"]
+
+    if any(parte["id"] for parte in analisis["partes"]):
+        return (no_update, analisis, False, str(hechas / total),
+                texto or f"Evaluado el modelo {hechas:.0f} de {total} veces...")
+
+    # Las partes que fallaron quedan en NaN y los indices las descartan
+    salidas = np.vstack([
+        resultado if encontrado else np.full((parte["filas"], len(SALIDAS)), np.nan)
+        for parte in analisis["partes"]
+        for encontrado, resultado in [cache_resultados.obtener(parte["clave"])]
+    ])
+    figura = figura_sensibilidad(analisis, salidas)
+    duracion = time.time() - analisis["inicio"]
+    return figura, None, True, "1", f"{total} evaluaciones del modelo en {duracion:.1f} s."
+
+
+def figura_sensibilidad(analisis, salidas):
+    """Barras por parametro para cada salida: S1 y ST (Sobol) o mu* y sigma (Morris)."""
+    k = len(DEFAULT_PARAMS)
+    if analisis["metodo"] == "sobol":
+        primera, segunda = indices_sobol(salidas, k, analisis["muestras"])
+        nombres = ("Primer orden (S1)", "Total (ST)")
+        titulo = "Índices de Sobol"
+    else:
+        primera, segunda = efectos_morris(diseno_sensibilidad(analisis), salidas, k)
+        nombres = ("μ* (efecto medio absoluto)", "σ (no linealidad e interacciones)")
+        titulo = "Efectos elementales de Morris"
+
+    fig = make_subplots(rows=2, cols=2, subplot_titles=SALIDAS, vertical_spacing=0.15)
+    for j, salida in enumerate(SALIDAS):
+        fila, columna = divmod(j, 2)
+        for valores, nombre, color in ((primera, nombres[0], "#4A9AC9"), (segunda, nombres[1], "#C27DD3")):
+            fig.add_trace(go.Bar(
+                x=list(DEFAULT_PARAMS), y=valores[:, j],
+                name=nombre, marker_color=color, legendgroup=nombre, showlegend=j == 0,
+                hovertemplate=f"%{{x}}<br>{nombre}: %{{y:.3f}}<extra>{salida}</extra>",
+            ), row=fila + 1, col=columna + 1)
 
     fig.update_layout(
-        title="<b>Simulación del Sistema Depredador-Presa-Enfermedad</b>",  
-        xaxis_title="Tiempo",
-        yaxis_title="Densidad de Población",
+        title=f"<b>{titulo}</b> (±{analisis['variacion']} %, {len(salidas)} evaluaciones)",
+        barmode='group',
         plot_bgcolor='lightyellow',
         paper_bgcolor='White',
         font=dict(family="Arial", size=12, color="black"),
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0), 
-        margin=dict(l=40, r=40, t=100, b=40)  
-    )
-    fig.update_xaxes(
-        showgrid=True, gridwidth=1, gridcolor='black', 
-        zeroline=True, zerolinecolor='black', zerolinewidth=2,
-        )
-    fig.update_yaxes(
-        showgrid=True, gridwidth=1, gridcolor='black', 
-        zeroline=True, zerolinecolor='black', zerolinewidth=2
+        legend=dict(orientation="h", yanchor="bottom", y=1.06, xanchor="left", x=0),
+        margin=dict(l=40, r=40, t=100, b=40),
     )
-
-
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='black')
     return fig
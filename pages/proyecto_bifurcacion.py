@@ -0,0 +1,246 @@
+import math
+import time
+
+import dash
+from dash import html, dcc, Output, Input, State, callback, ctx, no_update
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from utils.bifurcacion import atractores_sip, valores_parametro
+from utils.cache import cache_resultados, clave_canonica
+from utils.parametros import DEFAULT_PARAMS, INITIAL_CONDITIONS
+from utils.tareas import gestor_tareas, TRABAJADORES
+
+dash.register_page(__name__, path='/Proyecto/Bifurcacion', name='Bifurcación')
+
+# Los demas parametros y el estado inicial quedan en sus valores por defecto
+BASE = {clave: config["value"] for clave, config in DEFAULT_PARAMS.items()}
+Y0 = [INITIAL_CONDITIONS[clave]["value"] for clave in ("xS0", "xI0", "y0")]
+
+ESTADOS = [("xS", "Presas Susceptibles (xS)", "green"),
+           ("xI", "Presas Infectadas (xI)", "red"),
+           ("y", "Depredadores (y)", "blue")]
+
+layout = html.Div([
+
+    html.Div([
+
+        html.H2("Diagrama de Bifurcación", className="title"),
+        html.H3("Sistema Depredador-Presa-Enfermedad", className="subtitle"),
+
+        html.Div([
+            html.Label("Parámetro:"),
+            dcc.Dropdown(
+                id="dropdown-parametro-bif",
+                options=[{"label": config["label"], "value": clave} for clave, config in DEFAULT_PARAMS.items()],
+                value="c",
+                clearable=False,
+                className="input-field",
+                style={"width": "100%"},
+            ),
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Desde:"),
+            dcc.Input(id="input-desde-bif", type='number', value=0.0, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Hasta:"),
+            dcc.Input(id="input-hasta-bif", type='number', value=0.2, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Cantidad de valores:"),
+            dcc.Input(id="input-puntos-bif", type='number', value=200, min=2, step=1, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Tiempo transitorio (se descarta):"),
+            dcc.Input(id="input-transitorio-bif", type='number', value=1000, className="input-field")
+        ], className="input-group"),
+
+        html.Div([
+            html.Label("Tiempo de observación:"),
+            dcc.Input(id="input-observacion-bif", type='number', value=500, className="input-field")
+        ], className="input-group"),
+
+        html.Button("Calcular Diagrama", id="btn-bifurcacion", className="btn-generar", style={'marginTop': '20px'}),
+
+        html.Div([
+            html.Progress(id="progreso-bif", value="0", max="1", style={"width": "100%"}),
+            html.Div(id="texto-progreso-bif"),
+            html.Button("Cancelar", id="btn-cancelar-bif", className="btn-generar", style={'marginTop': '10px'}),
+        ], className="input-group"),
+        dcc.Store(id="store-bifurcacion"),
+        dcc.Interval(id="intervalo-bif", interval=250, disabled=True),
+
+    ], className="content left"),
+
+    html.Div([
+        html.H2("Atractor de Largo Plazo", className="title", style={'marginBottom': '10px'}),
+        dcc.Graph(id="grafica-bifurcacion", style={"height": "750px", "width": "100%"}),
+    ], className="content right"),
+
+], className="page-container")
+
+
+@callback(
+    Output("input-desde-bif", "value"),
+    Output("input-hasta-bif", "value"),
+    Input("dropdown-parametro-bif", "value"),
+    prevent_initial_call=True
+)
+def rango_por_defecto(parametro):
+    """Al cambiar de parametro, propone un rango de 0 al doble de su valor por defecto."""
+    valor = DEFAULT_PARAMS[parametro]["value"]
+    return 0.0, 2 * valor
+
+
+def clave_punto(parametro, valor, transitorio, t_final):
+    base = {clave: v for clave, v in BASE.items() if clave != parametro}
+    return clave_canonica("bifurcacion_sip", base, parametro, valor, Y0, transitorio, t_final)
+
+
+@callback(
+    Output("grafica-bifurcacion", "figure"),
+    Output("store-bifurcacion", "data"),
+    Output("intervalo-bif", "disabled"),
+    Output("progreso-bif", "value"),
+    Output("texto-progreso-bif", "children"),
+    Input("btn-bifurcacion", "n_clicks"),
+    Input("intervalo-bif", "n_intervals"),
+    Input("btn-cancelar-bif", "n_clicks"),
+    State("dropdown-parametro-bif", "value"),
+    State("input-desde-bif", "value"),
+    State("input-hasta-bif", "value"),
+    State("input-puntos-bif", "value"),
+    State("input-transitorio-bif", "value"),
+    State("input-observacion-bif", "value"),
+    State("store-bifurcacion", "data"),
+    prevent_initial_call=True
+)
+def calcular_bifurcacion(n_clicks, n_intervals, n_cancelar, parametro, desde, hasta, puntos,
+                         transitorio, observacion, calculo):
+
+    if ctx.triggered_id == "intervalo-bif":
+        return revisar_lotes(calculo)
+
+    if ctx.triggered_id == "btn-cancelar-bif":
+        if calculo:
+            for lote in calculo["lotes"]:
+                gestor_tareas.cancelar(lote["id"])
+        return no_update, None, True, no_update, "Cálculo cancelado."
+
+    if None in (desde, hasta, puntos, transitorio, observacion) or puntos < 2 or observacion <= 0:
+        return no_update, no_update, True, "0", "Revise el rango y los tiempos."
+
+    if calculo:
+        for lote in calculo["lotes"]:
+            gestor_tareas.cancelar(lote["id"])
+
+    valores = valores_parametro(desde, hasta, int(puntos))
+    t_final = transitorio + observacion
+    calculo = {"parametro": parametro, "valores": valores, "transitorio": transitorio,
+               "t_final": t_final, "inicio": time.time(), "lotes": [], "completados": 0}
+
+    # Solo se integran los valores que no estan en cache, repartidos en lotes para el pool
+    faltantes = [v for v in valores if not cache_resultados.obtener(clave_punto(parametro, v, transitorio, t_final))[0]]
+    tamano = min(max(math.ceil(len(faltantes) / (4 * TRABAJADORES)), 4), 32)
+    for i in range(0, len(faltantes), tamano):
+        lote = faltantes[i:i + tamano]
+        id_lote = gestor_tareas.enviar(
+            clave_canonica("bifurcacion_sip_lote", parametro, lote, transitorio, t_final),
+            atractores_sip, BASE, parametro, lote, Y0, transitorio, t_final,
+        )
+        calculo["lotes"].append({"id": id_lote, "valores": len(lote)})
+    calculo["nuevos"] = len(faltantes)
+
+    figura = figura_bifurcacion(calculo)
+    if not calculo["lotes"]:
+        return figura, None, True, "1", f"{len(valores)} valores, todos desde la cache."
+    return figura, calculo, False, "0", f"Integrando {len(faltantes)} de {len(valores)} valores..."
+
+
+def revisar_lotes(calculo):
+    """Guarda en cache los lotes terminados y redibuja cuando llega alguno."""
+    if not calculo:
+        return no_update, None, True, no_update, no_update
+
+    pendientes, en_curso, llegaron = [], 0.0, 0
+    for lote in calculo["lotes"]:
+        estado = gestor_tareas.estado(lote["id"])
+        if estado["estado"] == "ejecutando":
+            pendientes.append(lote)
+            en_curso += estado["progreso"] * lote["valores"]
+            continue
+        if estado["estado"] == "terminada":
+            for resultado in estado["resultado"]:
+                clave = clave_punto(calculo["parametro"], resultado["valor"], calculo["transitorio"], calculo["t_final"])
+                cache_resultados.guardar(clave, resultado)
+        elif estado["estado"] == "error":
+            print(f"Error en un lote de la bifurcación: {estado['error']}")
+        gestor_tareas.olvidar(lote["id"])
+        llegaron += lote["valores"]
+
+    calculo = {**calculo, "lotes": pendientes, "completados": calculo["completados"] + llegaron}
+    figura = figura_bifurcacion(calculo) if llegaron else no_update
+    hechos = calculo["completados"] + en_curso
+    if pendientes:
+        progreso = hechos / max(calculo["nuevos"], 1)
+        return figura, calculo, False, str(progreso), f"Integrados {hechos:.0f} de {calculo['nuevos']} valores..."
+
+    duracion = time.time() - calculo["inicio"]
+    texto = (f"{len(calculo['valores'])} valores ({calculo['nuevos']} integrados, "
+             f"{len(calculo['valores']) - calculo['nuevos']} desde la cache) en {duracion:.1f} s.")
+    return figura, None, True, "1", texto
+
+
+def figura_bifurcacion(calculo):
+    """Minimo y maximo de cada estado tras el transitorio, y equilibrios estables e inestables.
+
+    Se dibujan los valores que ya estan en cache; los que faltan se agregan al llegar.
+    """
+    parametro = calculo["parametro"]
+    resultados = []
+    for valor in calculo["valores"]:
+        clave = clave_punto(parametro, valor, calculo["transitorio"], calculo["t_final"])
+        encontrado, resultado = cache_resultados.obtener(clave)
+        if encontrado:
+            resultados.append(resultado)
+
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.04,
+                        subplot_titles=[nombre for _, nombre, _ in ESTADOS])
+    for fila, (corto, nombre, color) in enumerate(ESTADOS, start=1):
+        con_atractor = [r for r in resultados if r["minimo"] is not None]
+        for extremo, simbolo in (("minimo", "triangle-down"), ("maximo", "triangle-up")):
+            fig.add_trace(go.Scatter(
+                x=[r["valor"] for r in con_atractor],
+                y=[r[extremo][fila - 1] for r in con_atractor],
+                mode='markers', name=f"{corto} {extremo}", legendgroup=corto, showlegend=False,
+                marker=dict(color=color, size=4, symbol=simbolo),
+                hovertemplate=f"{parametro}: %{{x:.4g}}<br>{corto} {extremo}: %{{y:.4f}}<extra></extra>",
+            ), row=fila, col=1)
+
+        for estable, estilo in ((True, dict(color="black", size=5, symbol="circle")),
+                                (False, dict(color="gray", size=5, symbol="x-thin-open", line=dict(width=1)))):
+            equilibrios = [(r["valor"], e[fila - 1]) for r in resultados for e in r["equilibrios"] if e[3] == estable]
+            fig.add_trace(go.Scatter(
+                x=[x for x, _ in equilibrios], y=[y for _, y in equilibrios],
+                mode='markers', name="Equilibrio estable" if estable else "Equilibrio inestable",
+                legendgroup="estable" if estable else "inestable", showlegend=fila == 1,
+                marker=estilo,
+                hovertemplate=f"{parametro}: %{{x:.4g}}<br>{corto}*: %{{y:.4f}}<extra></extra>",
+            ), row=fila, col=1)
+
+    fig.update_layout(
+        title=f"<b>Bifurcación en {DEFAULT_PARAMS[parametro]['label']}</b>",
+        plot_bgcolor='lightyellow',
+        paper_bgcolor='White',
+        font=dict(family="Arial", size=12, color="black"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.04, xanchor="left", x=0),
+        margin=dict(l=40, r=40, t=100, b=40),
+    )
+    fig.update_xaxes(showgrid=True, gridwidth=1, gridcolor='black')
+    fig.update_xaxes(title_text=DEFAULT_PARAMS[parametro]["label"], row=3, col=1)
+    fig.update_yaxes(showgrid=True, gridwidth=1, gridcolor='black')
+    return fig
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from utils.ajuste import ajustar, proyectar, LIMITES_TASAS
+
+N = 5e6
+
+VERDADES = {
+    'sir': {'beta': 0.3, 'gamma': 0.1, 'I0': 50.0},
+    'seir': {'beta': 0.3, 'sigma': 0.2, 'gamma': 0.1, 'I0': 50.0},
+}
+
+
+def casos_sinteticos(modelo, semilla):
+    """365 dias de casos acumulados del modelo, con ruido de Poisson en los casos diarios."""
+    casos, _, _ = proyectar(modelo, N, 100.0, VERDADES[modelo], 365)
+    nuevos = np.random.default_rng(semilla).poisson(np.diff(casos))
+    return np.concatenate([[100.0], 100.0 + np.cumsum(nuevos)])
+
+
+@pytest.mark.parametrize("semilla", [0, 1])
+@pytest.mark.parametrize("modelo", ['sir', 'seir'])
+def test_recupera_parametros_conocidos(modelo, semilla):
+    ajuste = ajustar(modelo, N, casos_sinteticos(modelo, semilla))
+    for nombre, valor in VERDADES[modelo].items():
+        assert ajuste[nombre] == pytest.approx(valor, rel=0.05), nombre
+    # Cada pasada integra el punto y sus desplazamientos juntos
+    assert ajuste['integraciones'] <= 60
+
+
+def test_sigma_queda_en_incubacion_plausible():
+    """Aun con datos de un SIR (sin latencia), sigma no se escapa del rango de incubacion."""
+    ajuste = ajustar('seir', N, casos_sinteticos('sir', 0))
+    minimo, maximo = LIMITES_TASAS['sigma']
+    assert minimo * (1 - 1e-6) <= ajuste['sigma'] <= maximo * (1 + 1e-6)
@@ -0,0 +1,73 @@
+import logging
+import os
+import pickle
+
+import numpy as np
+
+from utils import cache as modulo_cache
+from utils.cache import CacheResultados, NoGuardar, memoizar, serializar, deserializar
+
+
+def test_serializar_ida_y_vuelta():
+    valor = {
+        "figura": {"data": [{"x": np.arange(5.0), "visible": True}], "titulo": "<b>SIR</b>"},
+        "par": (1, 2.5, None, "texto"),
+        "equilibrios": [(1.0, 2.0, 3.0, np.bool_(True))],
+        "escalar": np.float64(0.5),
+        "matriz": np.eye(3, dtype=np.float32),
+        "nan": float("nan"),
+    }
+    copia = deserializar(serializar(valor))
+    np.testing.assert_array_equal(copia["figura"]["data"][0]["x"], np.arange(5.0))
+    assert copia["figura"]["titulo"] == "<b>SIR</b>"
+    assert copia["par"] == (1, 2.5, None, "texto")
+    assert copia["equilibrios"] == [(1.0, 2.0, 3.0, True)]
+    assert copia["escalar"] == 0.5
+    assert copia["matriz"].dtype == np.float32
+    assert np.isnan(copia["nan"])
+
+
+class Bomba:
+    def __reduce__(self):
+        return (os.system, ("touch bomba_cache",))
+
+
+def test_no_ejecuta_pickle_del_disco(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cache = CacheResultados(tmp_path / "cache")
+    cache.guardar("ab" * 32, {"valor": 1})
+    ruta = next((tmp_path / "cache").glob("*/*.npz"))
+    ruta.write_bytes(pickle.dumps(Bomba()))
+
+    otra = CacheResultados(tmp_path / "cache")
+    assert otra.obtener("ab" * 32) == (False, None)
+    assert not (tmp_path / "bomba_cache").exists()
+
+
+def test_valores_no_serializables_quedan_en_memoria(tmp_path, caplog, monkeypatch):
+    monkeypatch.setattr(modulo_cache, "_avisados", set())
+    cache = CacheResultados(tmp_path)
+    objeto = object()
+    with caplog.at_level(logging.DEBUG, logger="utils.cache"):
+        cache.guardar("cd" * 32, (objeto, "resumen"))
+        cache.guardar("ef" * 32, (object(), "otro"))
+    # Se avisa una vez por tipo de problema; las repeticiones quedan en DEBUG
+    avisos = [r for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(avisos) == 1 and len(caplog.records) == 2
+    assert cache.obtener("cd" * 32) == (True, (objeto, "resumen"))
+    assert not list(tmp_path.glob("*/*.npz"))
+    assert CacheResultados(tmp_path).obtener("cd" * 32) == (False, None)
+
+
+def test_memoizar_no_guarda_respaldos(tmp_path):
+    cache = CacheResultados(tmp_path)
+    llamadas = []
+
+    @memoizar("prueba", cache=cache)
+    def calcular(x):
+        llamadas.append(x)
+        return NoGuardar(-1) if x < 0 else 2 * x
+
+    assert calcular(-3) == -1 and calcular(-3) == -1
+    assert calcular(4) == 8 and calcular(4) == 8
+    assert llamadas == [-3, -3, 4]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+pytest.importorskip("numba")
+
+from utils.jit import RK45Compilado, integrar_rk45
+from utils.modelos import sir, seir, sip, IntegradorPorTramos
+from utils.parametros import DEFAULT_PARAMS
+
+BASE_SIP = {clave: config['value'] for clave, config in DEFAULT_PARAMS.items()}
+
+CASOS = [
+    (lambda jit: sir(1000, 0.3, 0.1, jit=jit), [999.0, 1.0, 0.0], 100),
+    (lambda jit: seir(1000, 0.3, 0.2, 0.1, jit=jit), [999.0, 0.0, 1.0, 0.0], 100),
+    (lambda jit: sip(**BASE_SIP, jit=jit), [12.0, 3.0, 7.0], 1000),
+]
+
+
+@pytest.mark.parametrize("modelo, y0, tiempo", CASOS)
+def test_nucleos_iguales_a_numpy(modelo, y0, tiempo):
+    (rhs_nb, jac_nb), (rhs_np, jac_np) = modelo(True), modelo(False)
+    y = np.asarray(y0) * 1.1 + 0.5
+    np.testing.assert_allclose(rhs_nb(0.0, y), rhs_np(0.0, y), rtol=1e-13)
+    np.testing.assert_allclose(jac_nb(0.0, y), jac_np(0.0, y), rtol=1e-13)
+
+
+@pytest.mark.parametrize("tolerancias", [{}, {'rtol': 1e-10, 'atol': 1e-12}])
+@pytest.mark.parametrize("modelo, y0, tiempo", CASOS)
+def test_rk45_compilado_igual_a_solve_ivp(modelo, y0, tiempo, tolerancias):
+    """Mismo tablero y control de paso: mismos pasos y la misma solucion que scipy."""
+    rhs, _ = modelo(True)
+    t_eval = np.linspace(0, tiempo, 500)
+    y, t, nfev, estado = integrar_rk45(*rhs.nucleo, (0, tiempo), y0, t_eval, **tolerancias)
+    referencia = solve_ivp(modelo(False)[0], (0, tiempo), y0, t_eval=t_eval, method='RK45', **tolerancias)
+    assert estado == 0 and referencia.success
+    assert nfev == referencia.nfev
+    np.testing.assert_allclose(t, referencia.t)
+    np.testing.assert_allclose(y, referencia.y, rtol=1e-8, atol=1e-8)
+
+
+def test_rk45_compilado_por_tramos_y_denso():
+    """Avanzar de a tramos da lo mismo que de una vez, y el interpolante coincide con scipy."""
+    rhs, _ = sip(**BASE_SIP, jit=True)
+    t_eval = np.linspace(0, 500, 400)
+    entero = RK45Compilado(*rhs.nucleo, (0, 500), [12.0, 3.0, 7.0], t_eval)
+    entero.avanzar(10**6)
+    por_tramos = IntegradorPorTramos(sip(**BASE_SIP, jit=True), [12.0, 3.0, 7.0], (0, 500), t_eval, densa=True)
+    while not por_tramos.terminado:
+        por_tramos.avanzar(7)
+    np.testing.assert_array_equal(por_tramos.y, entero.salida)
+
+    referencia = solve_ivp(sip(**BASE_SIP, jit=False)[0], (0, 500), [12.0, 3.0, 7.0], method='RK45', dense_output=True)
+    t = np.linspace(0, 500, 3001)
+    np.testing.assert_allclose(por_tramos.solucion_densa()(t), referencia.sol(t), rtol=1e-8, atol=1e-8)
@@ -0,0 +1,30 @@
+import pytest
+
+from utils import metapoblacion
+from utils.metapoblacion import cargar_parches, conjuntos_parches, firma_parches
+
+
+def test_conjunto_de_ejemplo():
+    assert "ejemplo" in conjuntos_parches()
+    poblaciones, coordenadas, movilidad = cargar_parches("ejemplo")
+    assert poblaciones.size == coordenadas.shape[0] == movilidad.shape[0]
+    assert firma_parches("ejemplo")[0] == "ejemplo"
+
+
+@pytest.mark.parametrize("conjunto", ["/etc", "..", "../..", "ejemplo/../..", "../../utils", "", "."])
+def test_rechaza_rutas_fuera_de_los_conjuntos(conjunto):
+    with pytest.raises(ValueError):
+        cargar_parches(conjunto)
+
+
+def test_rechaza_enlaces_que_salen(tmp_path, monkeypatch):
+    base = tmp_path / "metapoblacion"
+    base.mkdir()
+    afuera = tmp_path / "afuera"
+    afuera.mkdir()
+    for nombre in metapoblacion.ARCHIVOS_PARCHES:
+        (afuera / nombre).write_text("")
+    (base / "enlace").symlink_to(afuera)
+    monkeypatch.setattr(metapoblacion, "DIRECTORIO_PARCHES", base)
+    with pytest.raises(ValueError):
+        firma_parches("enlace")
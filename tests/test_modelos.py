@@ -0,0 +1,55 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+
+from utils.modelos import integrar_lote, sip, seir, pasos_rk4, rk4
+from utils.parametros import DEFAULT_PARAMS
+
+BASE_SIP = {clave: config['value'] for clave, config in DEFAULT_PARAMS.items()}
+
+
+def test_lote_cumple_rtol_por_juego():
+    """Cada juego del lote queda dentro de rtol de su propia solucion de referencia."""
+    rtol = 1e-6
+    alphas = np.linspace(0.1, 0.6, 64)
+    y0 = [12.0, 3.0, 7.0]
+    t_eval = np.linspace(0, 100, 201)
+    lote = integrar_lote("sip", {**BASE_SIP, 'alpha': alphas}, y0, (0, 100), t_eval, rtol=rtol, atol=1e-9)
+
+    for i in range(0, alphas.size, 8):
+        rhs, _ = sip(**{**BASE_SIP, 'alpha': alphas[i]}, jit=False)
+        referencia = solve_ivp(rhs, (0, 100), y0, t_eval=t_eval, method='DOP853', rtol=1e-12, atol=1e-12).y
+        escala = np.abs(referencia).max(axis=1, keepdims=True)
+        error = (np.abs(lote[i] - referencia) / escala).max()
+        assert error < rtol, (alphas[i], error)
+
+
+def test_lote_sin_terminar_queda_en_nan():
+    """Si ni el lote ni el juego individual terminan en max_pasos, el juego queda en NaN."""
+    t_eval = np.linspace(0, 1000, 11)
+    lote = integrar_lote("sip", {**BASE_SIP, 'alpha': [0.2, 0.3]}, [12.0, 3.0, 7.0], (0, 1000), t_eval, max_pasos=3)
+    assert lote.shape == (2, 3, 11)
+    assert np.isnan(lote).all()
+
+
+def test_respaldo_cambia_a_metodo_rigido():
+    """Un juego rigido que el lote no termina se integra solo y pasa a Radau a tiempo."""
+    rigido = {**BASE_SIP, 'alpha': 50.0, 'd': 1e5}
+    t_eval = np.linspace(0, 1e5, 50)
+    lote = integrar_lote("sip", rigido, [12.0, 3.0, 7.0], (0, 1e5), t_eval, max_pasos=3000)
+    assert np.all(np.isfinite(lote))
+    # El depredador se extingue con competencia tan fuerte
+    assert lote[0, 2, -1] < 1e-6
+
+
+def test_rk4_en_los_limites_del_ajuste():
+    """Con las tasas maximas del ajuste el RK4 de paso fijo sigue a la referencia."""
+    N, beta, sigma, gamma = 1e6, 3.0, 0.5, 3.0
+    rhs, jac = seir(N, beta, sigma, gamma, jit=False)
+    paso, pasos = pasos_rk4(30.0, beta + sigma + gamma)
+    y0 = np.array([N - 100, 0.0, 100.0, 0.0])
+
+    radio = max(np.abs(np.linalg.eigvals(jac(0, y))).max() for y in (y0, rk4(rhs, y0, paso, pasos // 2)))
+    assert radio * paso <= 0.4
+
+    referencia = solve_ivp(rhs, (0, 30), y0, method='DOP853', rtol=1e-12, atol=1e-6).y[:, -1]
+    np.testing.assert_allclose(rk4(rhs, y0, paso, pasos), referencia, rtol=1e-6, atol=1e-3)
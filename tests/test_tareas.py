@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from utils import tareas
+
+
+@pytest.mark.skipif(tareas.fcntl is None, reason="sin fcntl no se verifica el proceso unico")
+def test_segundo_proceso_no_puede_reservar(tmp_path):
+    codigo = (
+        "import sys, time\n"
+        "from utils.tareas import reservar_proceso\n"
+        f"reservar_proceso({str(tmp_path)!r})\n"
+        "print('listo', flush=True)\n"
+        "time.sleep(30)\n"
+    )
+    otro = subprocess.Popen([sys.executable, "-c", codigo], stdout=subprocess.PIPE, text=True,
+                            cwd=Path(__file__).resolve().parent.parent)
+    try:
+        assert otro.stdout.readline().strip() == "listo"
+        with pytest.raises(RuntimeError, match=f"pid {otro.pid}"):
+            tareas.reservar_proceso(tmp_path)
+    finally:
+        otro.kill()
+        otro.wait()
+    # Al morir el otro proceso el candado queda libre
+    tareas.reservar_proceso(tmp_path)
+    assert tareas._reserva["pid"] is not None
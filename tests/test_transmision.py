@@ -0,0 +1,22 @@
+from utils import transmision
+
+
+def test_exceso_de_transmisiones_expira_la_menos_usada(monkeypatch):
+    monkeypatch.setattr(transmision, "reservar_proceso", lambda: None)
+    monkeypatch.setattr(transmision, "MAX_TRANSMISIONES", 2)
+    monkeypatch.setattr(transmision, "_transmisiones", transmision.OrderedDict())
+    monkeypatch.setattr(transmision, "_expiradas", transmision.OrderedDict())
+
+    primera = transmision.iniciar_transmision(object())
+    segunda = transmision.iniciar_transmision(object())
+    # Pedir un tramo la vuelve la mas reciente
+    assert transmision.obtener_transmision(primera) is not None
+    tercera = transmision.iniciar_transmision(object())
+
+    assert transmision.estado_transmision(primera) == "activa"
+    assert transmision.estado_transmision(tercera) == "activa"
+    assert transmision.estado_transmision(segunda) == "expirada"
+    assert transmision.siguiente_tramo(segunda) is None
+
+    transmision.descartar_transmision(primera)
+    assert transmision.estado_transmision(primera) == "desconocida"
@@ -0,0 +1,148 @@
+"""Ajuste de SIR y SEIR a los casos acumulados de un pais por minimos cuadrados.
+
+Se estiman beta, gamma (y sigma en SEIR) junto con los infectados activos al inicio
+de la ventana, en escala logaritmica. Los casos reportados del modelo son los que
+salen de S (SIR) o entran a I (SEIR). Cada evaluacion integra con RK4 de paso fijo
+todos los juegos de parametros a la vez como un sistema (n, k): el residuo y las
+columnas del jacobiano por diferencias finitas salen de una sola pasada.
+
+sigma no se identifica bien solo con casos acumulados (se compensa con beta y gamma),
+asi que se limita a periodos de incubacion plausibles.
+"""
+import numpy as np
+from scipy.optimize import least_squares
+
+from utils.modelos import sir, seir, pasos_rk4, rk4
+
+
+PARAMETROS = {'sir': ('beta', 'gamma'), 'seir': ('beta', 'sigma', 'gamma')}
+
+# Limites de las tasas (por dia) que se exploran
+TASA_MINIMA, TASA_MAXIMA = 1e-3, 3.0
+
+# Incubacion (latencia) de 2 a 14 dias
+LIMITES_TASAS = {'sigma': (1 / 14, 1 / 2)}
+
+# Paso relativo en log(parametro) para el jacobiano por diferencias finitas
+PASO_JACOBIANO = 1e-6
+
+
+def _integrar(modelo, N, tasas, I0, casos0, dias):
+    """Casos acumulados e infectados activos en los dias 0..dias-1, de forma (k, dias).
+
+    tasas es un dict de arreglos de largo k, igual que I0; los casos parten de casos0.
+    """
+    I0 = np.asarray(I0, dtype=float)
+    if modelo == 'sir':
+        rhs, _ = sir(N, tasas['beta'], tasas['gamma'], jit=False)
+        y = np.array([np.full_like(I0, N - casos0), I0, np.maximum(casos0 - I0, 0)])
+    else:
+        rhs, _ = seir(N, tasas['beta'], tasas['sigma'], tasas['gamma'], jit=False)
+        # Expuestos en equilibrio con los infectados: sigma E = gamma I
+        E0 = I0 * tasas['gamma'] / tasas['sigma']
+        y = np.array([N - casos0 - E0, E0, I0, np.maximum(casos0 - I0, 0)])
+
+    # Subpasos por dia segun la suma de las tasas (ver PASO_RADIO_RK4), al menos dos
+    paso, subpasos = pasos_rk4(1.0, sum(np.max(v) for v in tasas.values()), paso_maximo=0.5)
+
+    casos = np.empty((I0.size, dias))
+    activos = np.empty((I0.size, dias))
+    casos[:, 0], activos[:, 0] = casos0, I0
+    for dia in range(1, dias):
+        y = rk4(rhs, y, paso, subpasos)
+        # SIR: todo lo que salio de S; SEIR: lo que llego a I
+        casos[:, dia] = N - y[0] if modelo == 'sir' else N - y[0] - y[1]
+        activos[:, dia] = y[-2]
+    return casos, activos
+
+
+class AjusteEpidemico:
+    """Residuos y jacobiano de un ajuste, con cache de la ultima integracion.
+
+    least_squares pide el residuo y luego el jacobiano en el mismo punto. Como el costo
+    de una pasada casi no depende de cuantas columnas lleve, cada punto nuevo se integra
+    una vez junto con sus desplazamientos y el jacobiano sale de la cache.
+    """
+
+    def __init__(self, modelo, N, casos):
+        self.modelo = modelo
+        self.nombres = PARAMETROS[modelo]
+        self.N = float(N)
+        self.casos = np.asarray(casos, dtype=float)
+        # Se ajustan los casos nuevos desde el inicio de la ventana, en escala del total
+        self.escala = max(self.casos[-1] - self.casos[0], 1.0)
+        self._ultimo = (None, None, None)
+        self.pasadas = 0
+
+    def _tasas(self, theta):
+        theta = np.atleast_2d(theta)
+        tasas = {nombre: np.exp(theta[:, i]) for i, nombre in enumerate(self.nombres)}
+        return tasas, np.exp(theta[:, -1])
+
+    def _residuos_lote(self, thetas):
+        tasas, I0 = self._tasas(thetas)
+        casos, _ = _integrar(self.modelo, self.N, tasas, I0, self.casos[0], self.casos.size)
+        self.pasadas += 1
+        return (casos - self.casos) / self.escala
+
+    def _evaluar(self, theta):
+        """Residuo y jacobiano en theta, integrando theta y sus desplazamientos juntos."""
+        x, r, J = self._ultimo
+        if x is None or not np.array_equal(x, theta):
+            thetas = np.vstack([theta, theta + PASO_JACOBIANO * np.eye(theta.size)])
+            lote = self._residuos_lote(thetas)
+            r, J = lote[0], ((lote[1:] - lote[0]) / PASO_JACOBIANO).T
+            self._ultimo = (theta.copy(), r, J)
+        return r, J
+
+    def residuos(self, theta):
+        return self._evaluar(theta)[0]
+
+    def jacobiano(self, theta):
+        return self._evaluar(theta)[1]
+
+    def limites(self):
+        tasas = [LIMITES_TASAS.get(nombre, (TASA_MINIMA, TASA_MAXIMA)) for nombre in self.nombres]
+        bajo = [np.log(minimo) for minimo, _ in tasas] + [0.0]
+        alto = [np.log(maximo) for _, maximo in tasas] + [np.log(max(self.N / 10, 2.0))]
+        return bajo, alto
+
+    def inicio(self):
+        """Punto de partida sin ajuste previo: R0 = 2 y los activos de una semana de casos."""
+        gamma = 0.1
+        semana = self.casos[min(7, self.casos.size - 1)] - self.casos[0]
+        tasas = {'beta': 2 * gamma, 'sigma': 0.2, 'gamma': gamma}
+        I0 = max(semana / (7 * gamma) if semana > 0 else 1.0, 1.0)
+        return np.log([*(tasas[nombre] for nombre in self.nombres), I0])
+
+
+def ajustar(modelo, N, casos, inicio=None):
+    """Ajusta el modelo a los casos acumulados diarios. inicio es un ajuste anterior
+    (dict devuelto por esta funcion) desde el que arrancar el optimizador.
+
+    Devuelve un dict con las tasas, I0, el error relativo y la cantidad de integraciones
+    (pasadas de _integrar, cada una con todos los juegos de parametros).
+    """
+    problema = AjusteEpidemico(modelo, N, casos)
+    bajo, alto = problema.limites()
+    theta0 = problema.inicio()
+    if inicio is not None:
+        theta0 = np.log([*(inicio[nombre] for nombre in problema.nombres), inicio['I0']])
+    theta0 = np.clip(theta0, np.add(bajo, 1e-9), np.subtract(alto, 1e-9))
+
+    resultado = least_squares(problema.residuos, theta0, jac=problema.jacobiano, bounds=(bajo, alto),
+                              x_scale='jac', ftol=1e-6, xtol=1e-6, max_nfev=200)
+    tasas, I0 = problema._tasas(resultado.x)
+    ajuste = {nombre: float(tasas[nombre][0]) for nombre in problema.nombres}
+    ajuste['I0'] = float(I0[0])
+    ajuste['error'] = float(np.sqrt(np.mean(resultado.fun ** 2)))
+    ajuste['integraciones'] = problema.pasadas
+    return ajuste
+
+
+def proyectar(modelo, N, casos0, ajuste, dias):
+    """Casos acumulados e infectados activos del modelo ajustado en los dias 0..dias-1,
+    y el dia del pico de activos."""
+    tasas = {nombre: np.array([ajuste[nombre]]) for nombre in PARAMETROS[modelo]}
+    casos, activos = _integrar(modelo, N, tasas, [ajuste['I0']], casos0, dias)
+    return casos[0], activos[0], int(np.argmax(activos[0]))
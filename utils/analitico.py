@@ -0,0 +1,62 @@
+"""Resultados exactos del SIR sin integrar: R0, tamaño final, pico e inmunidad de rebaño.
+
+Todas las funciones aceptan escalares o arreglos (N, beta, gamma, I0 se combinan por
+broadcasting), asi que sirven para un solo escenario o para mallas enteras de
+parametros. Se supone que al inicio no hay recuperados: S0 = N - I0.
+"""
+import numpy as np
+from scipy.special import lambertw
+
+
+def numero_reproductivo(beta, gamma):
+    """R0 = beta / gamma."""
+    with np.errstate(divide='ignore'):
+        return np.divide(beta, gamma, dtype=float)
+
+
+def tamano_final(N, beta, gamma, I0):
+    """Total de personas que se infectan (N - S al final, contando I0).
+
+    S_inf resuelve S_inf = S0 exp(-R0 (N - S_inf) / N), cuya solucion es
+    S_inf = -(N / R0) W0(-R0 (S0 / N) exp(-R0)) con la rama principal de Lambert W.
+    """
+    N, beta, gamma, I0 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (N, beta, gamma, I0)))
+    R0 = numero_reproductivo(beta, gamma)
+    S0 = N - I0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        S_inf = -(N / R0) * lambertw(-R0 * (S0 / N) * np.exp(-R0)).real
+    # Sin transmision no sale nadie de S
+    S_inf = np.where(R0 > 0, S_inf, S0)
+    return N - S_inf
+
+
+def pico_infectados(N, beta, gamma, I0):
+    """Maximo de I por el invariante I + S - (N / R0) ln S = constante.
+
+    El pico ocurre cuando S = N / R0; si S0 ya esta por debajo, I solo baja y el
+    maximo es I0.
+    """
+    N, beta, gamma, I0 = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (N, beta, gamma, I0)))
+    R0 = numero_reproductivo(beta, gamma)
+    S0 = N - I0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        S_pico = N / R0
+        pico = I0 + S0 - S_pico - S_pico * np.log(S0 / S_pico)
+    return np.where(S0 > S_pico, pico, I0)
+
+
+def umbral_rebano(beta, gamma):
+    """Fraccion inmune que impide el brote: 1 - 1/R0, o 0 si R0 <= 1."""
+    R0 = numero_reproductivo(beta, gamma)
+    with np.errstate(divide='ignore'):
+        return np.where(R0 > 1, 1 - 1 / R0, 0.0)
+
+
+def indicadores_sir(N, beta, gamma, I0):
+    """Los cuatro indicadores juntos, como dict de arreglos (o escalares de NumPy)."""
+    return {
+        "R0": numero_reproductivo(beta, gamma),
+        "final": tamano_final(N, beta, gamma, I0),
+        "pico": pico_infectados(N, beta, gamma, I0),
+        "umbral": umbral_rebano(beta, gamma),
+    }
@@ -0,0 +1,65 @@
+"""Diagrama de bifurcacion de un parametro para el sistema depredador-presa-enfermedad.
+
+Cada valor del parametro es independiente: se integran en lotes, todos los valores
+de un lote como un solo sistema de forma (3, k), y los lotes se reparten en el pool
+de procesos de utils.tareas. Por cada valor se guarda el minimo y el maximo de cada
+estado despues del transitorio y los equilibrios con su estabilidad.
+"""
+import numpy as np
+from scipy.optimize import fsolve
+
+from utils.modelos import sip, integrar_lote
+
+
+def valores_parametro(inicio, fin, puntos):
+    """Malla del parametro redondeada, para que al refinar se repitan exactamente los valores."""
+    return [float(f"{v:.10g}") for v in np.linspace(inicio, fin, puntos)]
+
+
+def equilibrios_sip(parametros, semillas=()):
+    """Equilibrios no negativos [(xS, xI, y, estable), ...] buscados con Newton desde varias semillas."""
+    rhs, jac = sip(**parametros, jit=False)
+    K, r, mu = parametros['K'], parametros['r'], parametros['mu']
+    semillas = [np.zeros(3), np.array([K * max(1 - mu / max(r, 1e-12), 0), 0, 0]),
+                np.array([K / 2, K / 4, 1.0]), *semillas]
+
+    encontrados = []
+    for semilla in semillas:
+        if not np.all(np.isfinite(semilla)):
+            continue
+        x, _, ier, _ = fsolve(lambda y: rhs(0, y), semilla, fprime=lambda y: jac(0, y), full_output=True)
+        escala = 1 + np.abs(x).max()
+        if (ier != 1 or np.any(x < -1e-8 * escala) or np.abs(rhs(0, x)).max() > 1e-8 * escala
+                or any(np.abs(x - e[:3]).max() < 1e-6 * escala for e in encontrados)):
+            continue
+        x = np.maximum(x, 0.0)
+        estable = bool(np.all(np.linalg.eigvals(jac(0, x)).real < 0))
+        encontrados.append((*x, estable))
+    return [(float(xS), float(xI), float(y), estable) for xS, xI, y, estable in encontrados]
+
+
+def atractores_sip(base, parametro, valores, y0, t_transitorio, t_final, muestras=2000, reportar=None):
+    """Atractor de largo plazo para cada valor de `parametro`, con los demas fijos en `base`.
+
+    Devuelve una lista de dicts con valor, minimo y maximo de (xS, xI, y) en
+    [t_transitorio, t_final] (None si la integracion fallo) y equilibrios. Los valores
+    se integran juntos con integrar_lote.
+    """
+    t_eval = np.linspace(t_transitorio, t_final, muestras)
+    lote = integrar_lote("sip", {**base, parametro: valores}, y0, (0, t_final), t_eval, rtol=1e-6, atol=1e-9)
+
+    resultados = []
+    for i, valor in enumerate(valores):
+        parametros = {**base, parametro: valor}
+        y = lote[i]
+        resultado = {"valor": valor, "minimo": None, "maximo": None}
+        semillas = []
+        if np.all(np.isfinite(y)):
+            resultado["minimo"] = y.min(axis=1).tolist()
+            resultado["maximo"] = y.max(axis=1).tolist()
+            semillas = [y[:, -1], y.mean(axis=1)]
+        resultado["equilibrios"] = equilibrios_sip(parametros, semillas)
+        resultados.append(resultado)
+        if reportar is not None:
+            reportar((i + 1) / len(valores))
+    return resultados
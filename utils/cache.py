@@ -0,0 +1,290 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from functools import wraps
+from pathlib import Path
+
+import numpy as np
+
+
+# Subir este numero invalida lo guardado en disco cuando cambian los modelos o las figuras
+VERSION_CACHE = 3
+
+DIRECTORIO_CACHE = Path(os.environ.get(
+    "TECNICAS_CACHE_DIR", Path(__file__).resolve().parent.parent / ".cache"
+))
+
+registro = logging.getLogger(__name__)
+_avisados = set()
+
+
+def _avisar(motivo, error):
+    """WARNING la primera vez que aparece (motivo, tipo de error); despues solo DEBUG."""
+    tipo = (motivo, type(error).__name__)
+    nivel = logging.DEBUG if tipo in _avisados else logging.WARNING
+    _avisados.add(tipo)
+    registro.log(nivel, "%s: %s", motivo, error)
+
+
+def _canonico(valor):
+    """Forma estable de los argumentos: 1 y 1.0 dan la misma clave, los dict se ordenan."""
+    if isinstance(valor, bool) or valor is None or isinstance(valor, str):
+        return valor
+    if isinstance(valor, (int, float, np.integer, np.floating)):
+        return repr(float(valor))
+    if isinstance(valor, np.ndarray):
+        return ["ndarray", str(valor.dtype), list(valor.shape), hashlib.sha256(valor.tobytes()).hexdigest()]
+    if isinstance(valor, dict):
+        return {str(k): _canonico(v) for k, v in sorted(valor.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(valor, (list, tuple)):
+        return [_canonico(v) for v in valor]
+    return repr(valor)
+
+
+def _a_json(valor, arreglos):
+    """Estructura JSON del valor; los arreglos numericos van aparte en `arreglos`."""
+    if isinstance(valor, np.ndarray):
+        if valor.dtype.kind not in "biufcUS":
+            raise TypeError(f"Arreglo de tipo {valor.dtype} no se puede guardar en disco")
+        arreglos.append(valor)
+        return {"__arreglo__": len(arreglos) - 1}
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, tuple):
+        return {"__tupla__": [_a_json(v, arreglos) for v in valor]}
+    if isinstance(valor, list):
+        return [_a_json(v, arreglos) for v in valor]
+    if isinstance(valor, dict):
+        if not all(isinstance(k, str) for k in valor):
+            raise TypeError("Solo se guardan en disco dict con claves de texto")
+        return {k: _a_json(v, arreglos) for k, v in valor.items()}
+    if valor is None or isinstance(valor, (bool, int, float, str)):
+        return valor
+    raise TypeError(f"{type(valor).__name__} no se puede guardar en disco")
+
+
+def _desde_json(valor, arreglos):
+    if isinstance(valor, list):
+        return [_desde_json(v, arreglos) for v in valor]
+    if isinstance(valor, dict):
+        if "__arreglo__" in valor:
+            return arreglos[f"a{valor['__arreglo__']}"]
+        if "__tupla__" in valor:
+            return tuple(_desde_json(v, arreglos) for v in valor["__tupla__"])
+        return {k: _desde_json(v, arreglos) for k, v in valor.items()}
+    return valor
+
+
+def serializar(valor):
+    """Bytes de un .npz con la estructura en JSON y los arreglos sin pickle.
+
+    Acepta dict (claves de texto), list, tuple, escalares, None y arreglos numericos;
+    cualquier otra cosa es TypeError.
+    """
+    arreglos = []
+    estructura = json.dumps(_a_json(valor, arreglos))
+    salida = io.BytesIO()
+    np.savez(salida, estructura=np.array(estructura), **{f"a{i}": a for i, a in enumerate(arreglos)})
+    return salida.getvalue()
+
+
+def deserializar(datos):
+    """Inverso de serializar; np.load con allow_pickle=False no ejecuta codigo del archivo."""
+    with np.load(io.BytesIO(datos), allow_pickle=False) as archivo:
+        arreglos = {nombre: archivo[nombre] for nombre in archivo.files if nombre != "estructura"}
+        return _desde_json(json.loads(str(archivo["estructura"])), arreglos)
+
+
+def _tamano(valor, vistos=None):
+    """Bytes aproximados de un valor en memoria, para el limite de la LRU."""
+    vistos = set() if vistos is None else vistos
+    if id(valor) in vistos:
+        return 0
+    vistos.add(id(valor))
+    if isinstance(valor, np.ndarray):
+        return valor.nbytes
+    if isinstance(valor, (str, bytes)):
+        return len(valor)
+    if isinstance(valor, dict):
+        return sum(_tamano(k, vistos) + _tamano(v, vistos) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sum(_tamano(v, vistos) for v in valor) + 8 * len(valor)
+    if hasattr(valor, "__dict__"):
+        return _tamano(vars(valor), vistos)
+    return 8
+
+
+def clave_canonica(nombre, *args, **kwargs):
+    """Hash sha256 del nombre del modelo y sus entradas en forma canonica."""
+    texto = json.dumps([VERSION_CACHE, nombre, _canonico(args), _canonico(kwargs)], sort_keys=True)
+    return hashlib.sha256(texto.encode()).hexdigest()
+
+
+class CacheResultados:
+    """LRU en memoria limitada por bytes, respaldada por archivos .npz en disco.
+
+    El disco permite reutilizar resultados entre reinicios y entre procesos del
+    servidor: cada entrada se escribe en un archivo temporal y se renombra, asi que
+    otro proceso nunca lee un archivo a medio escribir. Los archivos no usan pickle
+    (ver serializar): quien pueda escribir en el directorio no puede ejecutar codigo
+    en el servidor. Los valores que no se pueden serializar quedan solo en memoria.
+    Con directorio=None solo se usa la memoria.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, max_bytes_memoria=64 * 2**20,
+                 max_bytes_disco=512 * 2**20):
+        self.directorio = Path(directorio) if directorio is not None else None
+        self.max_bytes_memoria = max_bytes_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria = OrderedDict()
+        self._bytes_memoria = 0
+        self._escrituras = 0
+        self._candado = threading.Lock()
+        self.aciertos_memoria = 0
+        self.aciertos_disco = 0
+        self.fallos = 0
+
+    def _ruta(self, clave):
+        return self.directorio / clave[:2] / f"{clave}.npz"
+
+    def _guardar_en_memoria(self, clave, valor, tamano):
+        if tamano > self.max_bytes_memoria:
+            return
+        if clave in self._memoria:
+            self._bytes_memoria -= self._memoria.pop(clave)[1]
+        self._memoria[clave] = (valor, tamano)
+        self._bytes_memoria += tamano
+        while self._bytes_memoria > self.max_bytes_memoria:
+            _, (_, tamano_viejo) = self._memoria.popitem(last=False)
+            self._bytes_memoria -= tamano_viejo
+
+    def obtener(self, clave):
+        """Devuelve (encontrado, valor) buscando primero en memoria y luego en disco."""
+        with self._candado:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                self.aciertos_memoria += 1
+                return True, self._memoria[clave][0]
+            if self.directorio is None:
+                self.fallos += 1
+                return False, None
+
+        try:
+            datos = self._ruta(clave).read_bytes()
+            valor = deserializar(datos)
+        except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+            with self._candado:
+                self.fallos += 1
+            return False, None
+
+        with self._candado:
+            self.aciertos_disco += 1
+            self._guardar_en_memoria(clave, valor, len(datos))
+        return True, valor
+
+    def guardar(self, clave, valor):
+        datos = None
+        if self.directorio is not None:
+            try:
+                datos = serializar(valor)
+            except TypeError as e:
+                _avisar("Resultado solo en memoria", e)
+        with self._candado:
+            self._guardar_en_memoria(clave, valor, len(datos) if datos is not None else _tamano(valor))
+            self._escrituras += 1
+            podar = self._escrituras % 50 == 0
+        if datos is None:
+            return
+
+        try:
+            ruta = self._ruta(clave)
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=ruta.parent, delete=False) as temporal:
+                temporal.write(datos)
+            os.replace(temporal.name, ruta)
+            if podar:
+                self._podar_disco()
+        except OSError as e:
+            _avisar("No se pudo escribir en la cache de disco", e)
+
+    def _podar_disco(self):
+        """Borra los archivos mas antiguos cuando el disco pasa de max_bytes_disco."""
+        archivos = sorted(self.directorio.glob("*/*.npz"), key=lambda ruta: ruta.stat().st_mtime)
+        total = sum(ruta.stat().st_size for ruta in archivos)
+        for ruta in archivos:
+            if total <= self.max_bytes_disco:
+                break
+            total -= ruta.stat().st_size
+            ruta.unlink(missing_ok=True)
+
+    def limpiar(self):
+        with self._candado:
+            self._memoria.clear()
+            self._bytes_memoria = 0
+        if self.directorio is None:
+            return
+        for ruta in self.directorio.glob("*/*.npz"):
+            ruta.unlink(missing_ok=True)
+
+    def estadisticas(self):
+        with self._candado:
+            return {
+                "aciertos_memoria": self.aciertos_memoria,
+                "aciertos_disco": self.aciertos_disco,
+                "fallos": self.fallos,
+                "entradas_memoria": len(self._memoria),
+                "bytes_memoria": self._bytes_memoria,
+            }
+
+
+cache_resultados = CacheResultados()
+
+
+def _a_datos(valor):
+    """Las figuras se guardan como su JSON de Plotly: reconstruir un go.Figure al leer
+    del disco lo vuelve a validar y cuesta tanto como armarlo de nuevo."""
+    if hasattr(valor, "to_plotly_json"):
+        return valor.to_plotly_json()
+    if isinstance(valor, (list, tuple)):
+        return type(valor)(_a_datos(v) for v in valor)
+    return valor
+
+
+class NoGuardar:
+    """Resultado que memoizar devuelve pero no guarda, como los respaldos por error:
+    el siguiente llamado con las mismas entradas vuelve a intentar el calculo."""
+
+    def __init__(self, valor):
+        self.valor = valor
+
+
+def memoizar(nombre, ignorar=0, cache=None):
+    """Decorador: guarda el resultado por (nombre, argumentos).
+
+    ignorar es la cantidad de argumentos iniciales que no forman parte de la clave,
+    como n_clicks en los callbacks de Dash. Las figuras se devuelven como dict, que
+    Dash acepta igual que un go.Figure. Si la funcion devuelve NoGuardar(valor) se
+    devuelve valor sin guardarlo.
+    """
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            almacen = cache or cache_resultados
+            clave = clave_canonica(nombre, *args[ignorar:], **kwargs)
+            encontrado, valor = almacen.obtener(clave)
+            if encontrado:
+                return valor
+            valor = funcion(*args, **kwargs)
+            if isinstance(valor, NoGuardar):
+                return _a_datos(valor.valor)
+            valor = _a_datos(valor)
+            almacen.guardar(clave, valor)
+            return valor
+        return envoltura
+    return decorador
@@ -0,0 +1,171 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.expresiones import funcion_campo
+
+
+def trazas_quiver(X, Y, fx, fy, escala=1.0, color_linea="blue", color_punta="red"):
+    """Construye todo el campo como una traza de segmentos y una traza de puntas de flecha.
+
+    escala solo cambia el largo dibujado; el hover siempre muestra el vector real.
+    """
+    x0 = np.ravel(X)
+    y0 = np.ravel(Y)
+    u = np.ravel(np.broadcast_to(fx, np.shape(X)))
+    v = np.ravel(np.broadcast_to(fy, np.shape(Y)))
+    x1 = x0 + escala * u
+    y1 = y0 + escala * v
+
+    # Cada flecha aporta (inicio, fin, NaN); el NaN corta la linea entre flechas
+    corte = np.full_like(x0, np.nan, dtype=float)
+    xs = np.column_stack([x0, x1, corte]).ravel()
+    ys = np.column_stack([y0, y1, corte]).ravel()
+
+    # Plotly mide el angulo del marcador en grados, en sentido horario desde el eje y
+    angulo = 90 - np.degrees(np.arctan2(v, u))
+
+    # float32 basta para dibujar y reduce a la mitad el JSON enviado al navegador
+    segmentos = go.Scatter(
+        x=xs.astype(np.float32),
+        y=ys.astype(np.float32),
+        mode="lines",
+        line=dict(color=color_linea, width=2),
+        hoverinfo="skip",
+        showlegend=False,
+    )
+
+    puntas = go.Scatter(
+        x=x1.astype(np.float32),
+        y=y1.astype(np.float32),
+        mode="markers",
+        marker=dict(symbol="arrow", size=8, angle=angulo.astype(np.float32), color=color_punta),
+        customdata=np.column_stack([x0, y0, u, v]).astype(np.float32),
+        showlegend=False,
+        hovertemplate="punto: (%{customdata[0]:.1f},%{customdata[1]:.1f}) <br> Vector: (%{customdata[2]:.2f},%{customdata[3]:.2f})<extra></extra>",
+    )
+
+    return segmentos, puntas
+
+
+@lru_cache(maxsize=512)
+def _baldosa(fx_str, fy_str, nivel_x, nivel_y, i, j, m, ancho_base, alto_base):
+    """Evalua el campo en una baldosa fija (niveles, i, j) con m x m flechas centradas en sus celdas."""
+    ancho = ancho_base / 2**nivel_x
+    alto = alto_base / 2**nivel_y
+    centros = (np.arange(m) + 0.5) / m
+    X, Y = np.meshgrid((i + centros) * ancho, (j + centros) * alto)
+    fx, fy = funcion_campo(fx_str, fy_str)(X, Y)
+    return X.ravel(), Y.ravel(), np.ravel(fx), np.ravel(fy)
+
+
+def _nivel(base, largo):
+    return int(np.clip(np.floor(np.log2(base / largo) + 0.5), -4, 40))
+
+
+def muestrear_ventana(fx_str, fy_str, ventana, n, ancho_base, alto_base):
+    """Muestrea el campo solo dentro de la ventana visible (x0, x1, y0, y1).
+
+    Las baldosas forman una cuadricula fija por nivel de zoom de cada eje, asi que al
+    volver a una zona ya vista se reutilizan de la cache. Cada baldosa lleva n x n flechas
+    y la ventana cubre entre 0.7 y 1.4 baldosas por eje, de modo que en pantalla siempre
+    hay del orden de n^2 flechas. Devuelve X, Y, fx, fy y la escala de dibujo para ese zoom.
+    """
+    x0, x1, y0, y1 = ventana
+    nivel_x = _nivel(ancho_base, x1 - x0)
+    nivel_y = _nivel(alto_base, y1 - y0)
+    ancho = ancho_base / 2**nivel_x
+    alto = alto_base / 2**nivel_y
+
+    partes = [
+        _baldosa(fx_str, fy_str, nivel_x, nivel_y, i, j, n, ancho_base, alto_base)
+        for i in range(int(np.floor(x0 / ancho)), int(np.floor(x1 / ancho)) + 1)
+        for j in range(int(np.floor(y0 / alto)), int(np.floor(y1 / alto)) + 1)
+    ]
+    X, Y, fx, fy = (np.concatenate(columna) for columna in zip(*partes))
+
+    dentro = (X >= x0) & (X <= x1) & (Y >= y0) & (Y <= y1)
+    escala = max((x1 - x0) / ancho_base, (y1 - y0) / alto_base)
+    return X[dentro], Y[dentro], fx[dentro], fy[dentro], escala
+
+
+CAPAS_ESCALARES = {
+    "magnitud": {"nombre": "Magnitud", "colores": "Viridis", "centro": None},
+    "divergencia": {"nombre": "Divergencia", "colores": "RdBu_r", "centro": 0},
+    "rotacional": {"nombre": "Rotacional", "colores": "RdBu_r", "centro": 0},
+}
+
+
+@lru_cache(maxsize=32)
+def capas_escalares(fx_str, fy_str, limites, resolucion=300):
+    """Magnitud, divergencia y rotacional del campo en una malla fina, en una sola pasada.
+
+    Las derivadas son diferencias finitas de np.gradient; los resultados se guardan en
+    float32, que es lo que se envia al navegador.
+    """
+    xmin, xmax, ymin, ymax = limites
+    x = np.linspace(xmin, xmax, resolucion)
+    y = np.linspace(ymin, ymax, resolucion)
+    X, Y = np.meshgrid(x, y)
+    F, G = funcion_campo(fx_str, fy_str)(X, Y)
+
+    dF_dy, dF_dx = np.gradient(F, y, x)
+    dG_dy, dG_dx = np.gradient(G, y, x)
+
+    return x.astype(np.float32), y.astype(np.float32), {
+        "magnitud": np.hypot(F, G).astype(np.float32),
+        "divergencia": (dF_dx + dG_dy).astype(np.float32),
+        "rotacional": (dG_dx - dF_dy).astype(np.float32),
+    }
+
+
+def traza_capa(x, y, valores, tipo):
+    """Una sola traza Heatmap para la capa escalar elegida."""
+    capa = CAPAS_ESCALARES[tipo]
+    return go.Heatmap(
+        x=x,
+        y=y,
+        z=valores,
+        colorscale=capa["colores"],
+        zmid=capa["centro"],
+        opacity=0.6,
+        colorbar=dict(title=capa["nombre"], thickness=12),
+        hovertemplate=f"x: %{{x:.2f}}<br>y: %{{y:.2f}}<br>{capa['nombre']}: %{{z:.3f}}<extra></extra>",
+    )
+
+
+# Bytes de JSON por punto de un go.Cone: x, y, z, u, v, w en float32 codificados en base64
+BYTES_POR_CONO = 6 * 4 * 4 / 3
+PRESUPUESTO_CONOS = 2_500_000
+
+
+def resolucion_3d(n, presupuesto=PRESUPUESTO_CONOS):
+    """Limita n para que la malla n^3 de conos no pase del presupuesto de bytes."""
+    n_max = int((presupuesto / BYTES_POR_CONO) ** (1 / 3))
+    return max(2, min(int(n), n_max))
+
+
+def campo_3d(fx_str, fy_str, fz_str, limites, n):
+    """Evalua (dx/dt, dy/dt, dz/dt) en una malla n^3 con una sola pasada vectorizada."""
+    xmin, xmax, ymin, ymax, zmin, zmax = limites
+    X, Y, Z = np.meshgrid(
+        np.linspace(xmin, xmax, n), np.linspace(ymin, ymax, n), np.linspace(zmin, zmax, n),
+        indexing='ij',
+    )
+    U, V, W = funcion_campo(fx_str, fy_str, fz_str, variables=('X', 'Y', 'Z'))(X, Y, Z)
+    return tuple(np.ravel(A).astype(np.float32) for A in (X, Y, Z, U, V, W))
+
+
+def traza_conos(X, Y, Z, U, V, W):
+    """Todo el campo 3D como una sola traza go.Cone."""
+    return go.Cone(
+        x=X, y=Y, z=Z,
+        u=U, v=V, w=W,
+        colorscale="Blues",
+        sizemode="scaled",
+        sizeref=0.6,
+        anchor="tail",
+        colorbar=dict(title="Magnitud", thickness=12),
+        hovertemplate="punto: (%{x:.1f}, %{y:.1f}, %{z:.1f})<br>Vector: (%{u:.2f}, %{v:.2f}, %{w:.2f})<extra></extra>",
+    )
@@ -0,0 +1,112 @@
+"""SIR estocastico con miles de replicas a la vez.
+
+Todas las replicas avanzan juntas como arreglos de NumPy: en cada iteracion se
+sortea el siguiente paso de cada una, en lugar de simularlas una por una. Para
+poblaciones chicas se usa Gillespie (exacto, un evento por iteracion); para las
+grandes, tau-leaping binomial con pasos fijos.
+"""
+import math
+
+import numpy as np
+
+
+# Hasta esta poblacion se simula evento por evento; arriba se usa tau-leaping
+MAX_N_GILLESPIE = 1000
+
+# Probabilidad maxima de infectarse o recuperarse en un paso de tau-leaping
+PROBABILIDAD_PASO = 0.05
+
+
+def sir_estocastico(N, beta, gamma, I0, tiempo, replicas=1000, puntos=201, semilla=0):
+    """Trayectorias de `replicas` corridas del SIR estocastico en `puntos` tiempos.
+
+    Devuelve t y arreglos enteros S, I, R de forma (replicas, puntos). Con la misma
+    semilla el resultado es el mismo, asi que se puede guardar en cache.
+    """
+    N, I0, replicas, puntos = int(N), int(I0), int(replicas), int(puntos)
+    generador = np.random.default_rng(semilla)
+    t = np.linspace(0, tiempo, puntos)
+    if N <= MAX_N_GILLESPIE:
+        S, I = _gillespie(N, beta, gamma, I0, t, replicas, generador)
+    else:
+        S, I = _tau_leaping(N, beta, gamma, I0, t, replicas, generador)
+    return t, S, I, N - S - I
+
+
+def _gillespie(N, beta, gamma, I0, t, replicas, generador):
+    S = np.full(replicas, N - I0, dtype=np.int64)
+    I = np.full(replicas, I0, dtype=np.int64)
+    salida_S = np.empty((replicas, t.size), dtype=np.int64)
+    salida_I = np.empty((replicas, t.size), dtype=np.int64)
+    reloj = np.zeros(replicas)
+    # Indice del proximo punto de la malla que le falta llenar a cada replica
+    siguiente = np.zeros(replicas, dtype=np.int64)
+
+    vivas = np.arange(replicas)
+    while vivas.size:
+        tasa_infeccion = beta * S[vivas] * I[vivas] / N
+        tasa_total = tasa_infeccion + gamma * I[vivas]
+        activas = tasa_total > 0
+        tasa_infeccion, tasa_total = tasa_infeccion[activas], tasa_total[activas]
+        nuevo_reloj = np.full(vivas.size, np.inf)
+        nuevo_reloj[activas] = reloj[vivas[activas]] + generador.exponential(1 / tasa_total)
+
+        # Los puntos de la malla anteriores al evento conservan el estado actual
+        while True:
+            pendientes = siguiente[vivas] < t.size
+            pendientes[pendientes] = t[siguiente[vivas[pendientes]]] <= nuevo_reloj[pendientes]
+            if not pendientes.any():
+                break
+            cuales = vivas[pendientes]
+            salida_S[cuales, siguiente[cuales]] = S[cuales]
+            salida_I[cuales, siguiente[cuales]] = I[cuales]
+            siguiente[cuales] += 1
+
+        vivas = vivas[activas]
+        infeccion = generador.random(vivas.size) * tasa_total < tasa_infeccion
+        S[vivas] -= infeccion
+        I[vivas] += np.where(infeccion, 1, -1)
+        reloj[vivas] = nuevo_reloj[activas]
+        vivas = vivas[reloj[vivas] <= t[-1]]
+    return salida_S, salida_I
+
+
+def _tau_leaping(N, beta, gamma, I0, t, replicas, generador):
+    S = np.full(replicas, N - I0, dtype=np.int64)
+    I = np.full(replicas, I0, dtype=np.int64)
+    salida_S = np.empty((replicas, t.size), dtype=np.int64)
+    salida_I = np.empty((replicas, t.size), dtype=np.int64)
+    salida_S[:, 0], salida_I[:, 0] = S, I
+
+    # Subpasos por intervalo de la malla para que las probabilidades por paso sean chicas
+    intervalo = t[1] - t[0] if t.size > 1 else 0.0
+    subpasos = max(1, math.ceil(intervalo * max(beta, gamma) / PROBABILIDAD_PASO))
+    dt = intervalo / subpasos
+    p_recuperacion = -math.expm1(-gamma * dt)
+
+    for k in range(1, t.size):
+        vivas = np.flatnonzero(I)
+        for _ in range(subpasos):
+            if not vivas.size:
+                break
+            p_infeccion = -np.expm1(-beta * dt * I[vivas] / N)
+            nuevos = generador.binomial(S[vivas], p_infeccion)
+            recuperados = generador.binomial(I[vivas], p_recuperacion)
+            S[vivas] -= nuevos
+            I[vivas] += nuevos - recuperados
+            vivas = vivas[I[vivas] > 0]
+        salida_S[:, k], salida_I[:, k] = S, I
+    return salida_S, salida_I
+
+
+def resumen_replicas(N, beta, gamma, I0, S, I):
+    """Fraccion de replicas que se extinguieron sin brote mayor y la prediccion teorica.
+
+    Una replica cuenta como extinguida si termina sin infectados y con menos de
+    sqrt(N) infectados en total; la prediccion de un proceso de ramificacion es
+    (gamma / beta)^I0 si R0 > 1 y 1 si no.
+    """
+    total = N - S[:, -1]
+    extinguidas = (I[:, -1] == 0) & (total < math.sqrt(N))
+    teorica = (gamma / beta) ** I0 if beta > gamma else 1.0
+    return float(extinguidas.mean()), teorica
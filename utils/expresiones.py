@@ -0,0 +1,131 @@
+import ast
+from functools import lru_cache
+
+import numpy as np
+
+
+FUNCIONES = {
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'arcsin': np.arcsin,
+    'arccos': np.arccos,
+    'arctan': np.arctan,
+    'arctan2': np.arctan2,
+    'sinh': np.sinh,
+    'cosh': np.cosh,
+    'tanh': np.tanh,
+    'exp': np.exp,
+    'log': np.log,
+    'log10': np.log10,
+    'log2': np.log2,
+    'sqrt': np.sqrt,
+    'abs': np.abs,
+    'sign': np.sign,
+    'floor': np.floor,
+    'ceil': np.ceil,
+    'hypot': np.hypot,
+    'minimum': np.minimum,
+    'maximum': np.maximum,
+}
+
+CONSTANTES = {
+    'pi': np.pi,
+    'e': np.e,
+}
+
+OPERADORES = (
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.Mod, ast.FloorDiv,
+    ast.UAdd, ast.USub,
+)
+
+
+class ExpresionInvalida(ValueError):
+    """La expresion usa sintaxis o nombres que no estan permitidos."""
+
+
+class _Normalizador(ast.NodeTransformer):
+    """Valida el arbol contra la lista blanca y lo lleva a una forma canonica."""
+
+    def __init__(self, variables):
+        self.variables = variables
+
+    def generic_visit(self, nodo):
+        if not isinstance(nodo, (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call,
+                                 ast.Name, ast.Constant, ast.Attribute, ast.Load) + OPERADORES):
+            raise ExpresionInvalida(f"sintaxis no permitida: {type(nodo).__name__}")
+        return super().generic_visit(nodo)
+
+    def _sin_prefijo(self, nodo):
+        # np.sin(X) y sin(X) son la misma expresion
+        if isinstance(nodo, ast.Attribute):
+            if not (isinstance(nodo.value, ast.Name) and nodo.value.id == 'np'):
+                raise ExpresionInvalida("solo se permiten atributos de la forma np.<nombre>")
+            return ast.copy_location(ast.Name(id=nodo.attr, ctx=ast.Load()), nodo)
+        return nodo
+
+    def visit_Attribute(self, nodo):
+        return self.visit(self._sin_prefijo(nodo))
+
+    def visit_Name(self, nodo):
+        if nodo.id not in self.variables and nodo.id not in CONSTANTES:
+            raise ExpresionInvalida(f"nombre no permitido: {nodo.id}")
+        return nodo
+
+    def visit_Call(self, nodo):
+        funcion = self._sin_prefijo(nodo.func)
+        if not isinstance(funcion, ast.Name) or funcion.id not in FUNCIONES:
+            raise ExpresionInvalida("solo se pueden llamar funciones de numpy permitidas")
+        if nodo.keywords:
+            raise ExpresionInvalida("las funciones no aceptan argumentos con nombre")
+        nodo.func = funcion
+        nodo.args = [self.visit(arg) for arg in nodo.args]
+        return nodo
+
+    def visit_Constant(self, nodo):
+        if isinstance(nodo.value, bool) or not isinstance(nodo.value, (int, float)):
+            raise ExpresionInvalida(f"constante no permitida: {nodo.value!r}")
+        # Con flotantes, 9**9**9 desborda a inf en vez de calcular un entero enorme
+        return ast.copy_location(ast.Constant(value=float(nodo.value)), nodo)
+
+
+@lru_cache(maxsize=256)
+def _compilar_normalizada(normalizada, variables):
+    return compile(normalizada, '<expresion>', 'eval')
+
+
+@lru_cache(maxsize=256)
+def compilar_expresion(texto, variables=('X', 'Y')):
+    """Valida y compila una expresion; el costo se paga una vez por expresion distinta."""
+    try:
+        arbol = ast.parse(str(texto).strip(), mode='eval')
+    except SyntaxError as error:
+        raise ExpresionInvalida(f"sintaxis invalida: {error.msg}") from None
+
+    arbol = ast.fix_missing_locations(_Normalizador(set(variables)).visit(arbol))
+    return _compilar_normalizada(ast.unparse(arbol), variables)
+
+
+def evaluar_expresion(texto, **valores):
+    """Evalua la expresion de forma vectorizada sobre los arreglos dados (X=..., Y=...)."""
+    variables = tuple(valores)
+    codigo = compilar_expresion(texto, variables)
+    entorno = {**FUNCIONES, **CONSTANTES, **valores}
+    forma = np.shape(next(iter(valores.values()))) if valores else ()
+
+    with np.errstate(all='ignore'):
+        resultado = eval(codigo, {'__builtins__': {}}, entorno)
+
+    return np.broadcast_to(np.asarray(resultado, dtype=float), forma)
+
+
+def funcion_campo(*textos, variables=('X', 'Y')):
+    """Compila varias componentes y devuelve f(*arreglos) -> tupla de componentes evaluadas."""
+    for texto in textos:
+        compilar_expresion(texto, variables)
+
+    def campo(*arreglos):
+        valores = dict(zip(variables, arreglos))
+        return tuple(evaluar_expresion(texto, **valores) for texto in textos)
+
+    return campo
@@ -0,0 +1,62 @@
+"""Actualizaciones parciales de figuras con dash.Patch.
+
+Cada grafica lleva en el layout una figura base con todo el estilo y todas las
+trazas que puede mostrar (vacias). Los callbacks devuelven un Patch con los
+arreglos de las trazas que cambian, su visibilidad y los rangos de los ejes: el
+layout no se vuelve a armar ni a enviar en cada clic.
+"""
+import base64
+
+import numpy as np
+from dash import Patch
+
+
+def _datos(valores):
+    """Arreglo numerico como typed array de Plotly (float32 en base64).
+
+    Un go.Figure ya codifica asi sus arreglos, pero dentro de un Patch Dash los
+    enviaria como listas de JSON; float32 basta para dibujar y ocupa la mitad.
+    """
+    arreglo = np.asarray(valores)
+    if arreglo.dtype.kind not in "fiu" or arreglo.size == 0:
+        return valores
+    datos = np.ascontiguousarray(arreglo, dtype=np.float32).tobytes()
+    return {"dtype": "f4", "bdata": base64.b64encode(datos).decode("ascii")}
+
+
+def parche_trazas(series, inicio=0, ocultar=(), parche=None):
+    """Patch que reemplaza x e y de las trazas inicio, inicio + 1, ... y las muestra;
+    las trazas en `ocultar` se vacian y se esconden (tambien de la leyenda)."""
+    parche = Patch() if parche is None else parche
+    for i, (x, y) in enumerate(series, start=inicio):
+        parche["data"][i]["x"] = _datos(x)
+        parche["data"][i]["y"] = _datos(y)
+        parche["data"][i]["visible"] = True
+    for i in ocultar:
+        parche["data"][i]["x"] = []
+        parche["data"][i]["y"] = []
+        parche["data"][i]["visible"] = False
+    return parche
+
+
+def rangos(parche, x=None, y=None):
+    """Fija los rangos dados; un eje sin rango vuelve a ajustarse a los datos."""
+    for eje, rango in (("xaxis", x), ("yaxis", y)):
+        if rango is None:
+            parche["layout"][eje]["autorange"] = True
+        else:
+            parche["layout"][eje]["range"] = [float(v) for v in rango]
+            parche["layout"][eje]["autorange"] = False
+    return parche
+
+
+def reemplazar_trazas(fig, parche=None):
+    """Patch que cambia la lista completa de trazas, cuadros y botones de animacion por
+    los de `fig`, para graficas cuyo numero de trazas depende del modo; el layout
+    de `fig` no se envia."""
+    parche = Patch() if parche is None else parche
+    figura = fig.to_dict()
+    parche["data"] = figura["data"]
+    parche["frames"] = figura.get("frames", [])
+    parche["layout"]["updatemenus"] = figura["layout"].get("updatemenus", [])
+    return parche
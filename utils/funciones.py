@@ -1,11 +1,103 @@
-def fucion_graficas_ecu_log(P0,K,t_max,r):
-    
-    import numpy as np 
-    import plotly.graph_objects as go
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.figuras import parche_trazas, rangos
+
+
+# Percentiles del abanico: la banda externa, la interna y la mediana
+PERCENTILES_ABANICO = (5, 25, 50, 75, 95)
+
+
+def logistica(P0, K, r, t):
+    """P(t) de la ecuacion logistica para muchos (P0, K, r) a la vez, sin Plotly.
+
+    P0, K y r se combinan por broadcasting (escalares o arreglos) y t es la malla
+    comun: el resultado tiene la forma de los parametros mas un eje final de len(t).
+    """
+    P0, K, r = (v[..., None] for v in np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (P0, K, r))))
+    t = np.asarray(t, dtype=float)
+    # Es P0 K e^{rt} / (K - P0 + P0 e^{rt}) dividido por P0 e^{rt}: no desborda para r t grande.
+    # Las operaciones van sobre el mismo arreglo para no crear temporales del tamaño del lote
+    with np.errstate(divide='ignore', over='ignore', invalid='ignore'):
+        P = np.multiply(-r, t)
+        np.exp(P, out=P)
+        P *= K / P0 - 1
+        P += 1
+        np.divide(K, P, out=P)
+    P[np.broadcast_to(P0 == 0, P.shape)] = 0.0
+    return P
+
+
+def muestrear_parametros(valores, variacion, muestras, semilla=0):
+    """Arreglos de `muestras` valores uniformes en valor * (1 +- variacion) para cada parametro."""
+    generador = np.random.default_rng(semilla)
+    return {nombre: valor * (1 + variacion * generador.uniform(-1, 1, muestras)) for nombre, valor in valores.items()}
+
+
+def percentiles_logistica(P0, K, r, t, percentiles=PERCENTILES_ABANICO):
+    """Percentiles de P(t) sobre todas las combinaciones, de forma (len(percentiles), len(t))."""
+    P = logistica(P0, K, r, t).reshape(-1, np.size(t))
+    return np.percentile(P, percentiles, axis=0)
+
 
+def abanico_logistico(P0, K, r, t_max, variacion, muestras, puntos=200):
+    """(t, bandas) con P0, K y r inciertos en +-variacion, o None si no hay incertidumbre."""
+    if not variacion or not muestras:
+        return None
+    parametros = muestrear_parametros({'P0': P0, 'K': K, 'r': r}, variacion, int(muestras))
+    t = np.linspace(0, t_max, puntos)
+    return t, percentiles_logistica(parametros['P0'], parametros['K'], parametros['r'], t)
+
+
+def series_abanico(t, bandas):
+    """Pares (x, y) en el orden de las trazas de trazas_abanico."""
+    p5, p25, p50, p75, p95 = bandas
+    return [(t, p95), (t, p5), (t, p75), (t, p25), (t, p50)]
+
+
+def trazas_abanico(t, bandas, color):
+    """Bandas 5-95 y 25-75 y la mediana, para bandas de percentiles_logistica.
+
+    Con bandas=None las trazas quedan vacias y ocultas, para la figura base.
+    """
+    series = series_abanico(t, bandas) if bandas is not None else [([], [])] * 5
+    visible = bandas is not None
+    trazas = []
+    for (_, alto), (_, bajo), opacidad, nombre in ((*series[0:2], 0.15, 'Percentiles 5-95'), (*series[2:4], 0.3, 'Percentiles 25-75')):
+        trazas.append(go.Scatter(
+            x=t, y=alto, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip', visible=visible,
+        ))
+        trazas.append(go.Scatter(
+            x=t, y=bajo, mode='lines', line=dict(width=0), fill='tonexty', name=nombre,
+            fillcolor=f'rgba({color}, {opacidad})', hoverinfo='skip', visible=visible,
+        ))
+    trazas.append(go.Scatter(
+        x=t, y=series[4][1], mode='lines', name='Mediana', visible=visible,
+        line=dict(color=f'rgb({color})', width=2, dash='dash'),
+        hovertemplate='t: %{x:.2f}<br>Mediana: %{y:.2f}<extra></extra>'
+    ))
+    return trazas
+
+
+def parche_logistico(P0, K, t_max, r, abanico=None):
+    """Patch para una figura de fucion_graficas_ecu_log (o con sus mismas trazas):
+    solo los datos de la curva, K, el abanico y los rangos de los ejes."""
+    t = np.linspace(0, t_max, 20)
+    series = [(t, logistica(P0, K, r, t)), ([0, t_max], [K, K])]
+    techo = K
+    if abanico is not None:
+        t_abanico, bandas = abanico
+        series += series_abanico(t_abanico, bandas)
+        techo = max(K, float(np.max(bandas)))
+    parche = parche_trazas(series, ocultar=range(len(series), 7))
+    return rangos(parche, x=[0, t_max], y=[0, techo+techo*0.1])
+
+
+def fucion_graficas_ecu_log(P0,K,t_max,r,abanico=None):
+    
     t=np.linspace(0, t_max, 20)
 
-    P=(P0*K*np.exp(r*t))/((K-P0)+P0*np.exp(r*t))
+    P=logistica(P0, K, r, t)
 
     trace_poblacion=go.Scatter(
         x=t,
@@ -37,6 +129,14 @@ def fucion_graficas_ecu_log(P0,K,t_max,r):
     )
 
     fig=go.Figure(data=[trace_poblacion, trace_capacidad])
+
+    # abanico es (t, bandas) de percentiles_logistica para parametros inciertos;
+    # sin abanico sus trazas quedan vacias para que parche_logistico las encuentre
+    techo = K
+    t_abanico, bandas = abanico if abanico is not None else ([], None)
+    fig.add_traces(trazas_abanico(t_abanico, bandas, '34, 139, 34'))
+    if bandas is not None:
+        techo = max(K, float(np.max(bandas)))
     
     fig.update_layout(
     title=dict(
@@ -72,6 +172,6 @@ def fucion_graficas_ecu_log(P0,K,t_max,r):
     showgrid=True, gridwidth=1, gridcolor='black',
     zeroline=True, zerolinewidth=2, zerolinecolor='red',
     showline=True, linecolor='black', linewidth=2, mirror=True,
-    range=[0, K+K*0.1]
+    range=[0, techo+techo*0.1]
     )
     return fig
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""SEIR de metapoblacion: parches y movilidad leidos de CSV locales.
+
+Cada conjunto es un subdirectorio de datos/metapoblacion con dos archivos:
+  parches.csv    parche,poblacion,x,y      (x, y solo se usan para el mapa)
+  movilidad.csv  origen,destino,tasa       (tasa por dia de origen a destino)
+
+Las trayectorias de todos los parches se quedan en el servidor: a la pagina solo
+llegan las curvas agregadas y el pico de infectados de cada parche.
+"""
+import csv
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from utils.modelos import seir_metapoblacion, integrar
+
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+DIRECTORIO_PARCHES = RAIZ / "datos" / "metapoblacion"
+
+CONJUNTO_POR_DEFECTO = "ejemplo"
+
+ARCHIVOS_PARCHES = ("parches.csv", "movilidad.csv")
+
+
+def conjuntos_parches():
+    """Nombres de los subdirectorios de DIRECTORIO_PARCHES que tienen los dos CSV."""
+    if not DIRECTORIO_PARCHES.is_dir():
+        return []
+    return sorted(
+        ruta.name for ruta in DIRECTORIO_PARCHES.iterdir()
+        if all((ruta / nombre).is_file() for nombre in ARCHIVOS_PARCHES)
+    )
+
+
+def _ruta(conjunto):
+    """Directorio del conjunto; el nombre llega del navegador, asi que solo se aceptan
+    subdirectorios directos de DIRECTORIO_PARCHES (sin rutas absolutas, .. ni enlaces
+    que salgan de ahi)."""
+    ruta = (DIRECTORIO_PARCHES / str(conjunto)).resolve()
+    if ruta.parent != DIRECTORIO_PARCHES.resolve() or not ruta.is_relative_to(RAIZ):
+        raise ValueError(f"Conjunto de parches invalido: {conjunto!r}")
+    return ruta
+
+
+def cargar_parches(conjunto=CONJUNTO_POR_DEFECTO):
+    """Poblaciones (P,), coordenadas (P, 2) y matriz dispersa de movilidad (P, P)."""
+    directorio = _ruta(conjunto)
+    with open(directorio / "parches.csv", newline="") as archivo:
+        filas = list(csv.DictReader(archivo))
+    indice = {fila["parche"]: i for i, fila in enumerate(filas)}
+    poblaciones = np.array([float(fila["poblacion"]) for fila in filas])
+    coordenadas = np.array([[float(fila["x"]), float(fila["y"])] for fila in filas])
+
+    origen, destino, tasa = [], [], []
+    with open(directorio / "movilidad.csv", newline="") as archivo:
+        for fila in csv.DictReader(archivo):
+            origen.append(indice[fila["origen"]])
+            destino.append(indice[fila["destino"]])
+            tasa.append(float(fila["tasa"]))
+    P = len(filas)
+    movilidad = sparse.csr_matrix((tasa, (origen, destino)), shape=(P, P))
+    movilidad.setdiag(0)
+    movilidad.eliminate_zeros()
+    return poblaciones, coordenadas, movilidad
+
+
+def firma_parches(conjunto=CONJUNTO_POR_DEFECTO):
+    """Fecha de modificacion de los CSV, para que la cache note cuando cambian."""
+    directorio = _ruta(conjunto)
+    return [directorio.name, *((directorio / nombre).stat().st_mtime_ns for nombre in ARCHIVOS_PARCHES)]
+
+
+def simular_metapoblacion(poblaciones, movilidad, beta, sigma, gamma, I0, E0, t_eval):
+    """Integra el SEIR de todos los parches con la infeccion sembrada en el mas poblado.
+
+    Devuelve los tiempos integrados, (S, E, I, R) agregados en ellos, y el maximo de
+    infectados de cada parche con el dia en que ocurre.
+    """
+    P = poblaciones.size
+    semilla = int(np.argmax(poblaciones))
+    y0 = np.zeros((4, P))
+    y0[0] = poblaciones
+    y0[1, semilla], y0[2, semilla] = E0, I0
+    y0[0, semilla] -= E0 + I0
+
+    # Con movilidad y tasas epidemicas del orden de 1/dia el sistema no es rigido
+    solucion = integrar(seir_metapoblacion(beta, sigma, gamma, movilidad), y0.ravel(),
+                        (t_eval[0], t_eval[-1]), t_eval, metodo='RK45', rtol=1e-6, atol=1e-6)
+    y = solucion.y.reshape(4, P, -1)
+    infectados = y[2]
+    dia_pico = solucion.t[np.argmax(infectados, axis=1)]
+    return solucion.t, y.sum(axis=1), infectados.max(axis=1), dia_pico
@@ -0,0 +1,601 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+from scipy.integrate import solve_ivp, OdeSolution, RK23, RK45, DOP853, LSODA, BDF, Radau
+from scipy.optimize import OptimizeResult
+from scipy import sparse
+
+try:
+    from utils.jit import NUCLEOS, RK45Compilado, integrar_rk45
+except ImportError:
+    NUCLEOS = None
+
+
+# Metodos de solve_ivp que aprovechan el jacobiano analitico
+METODOS_IMPLICITOS = ('LSODA', 'BDF', 'Radau')
+
+METODOS = {'RK23': RK23, 'RK45': RK45, 'DOP853': DOP853, 'LSODA': LSODA, 'BDF': BDF, 'Radau': Radau}
+
+# TECNICAS_JIT=0 desactiva la compilacion aunque numba este instalado
+JIT_POR_DEFECTO = os.environ.get("TECNICAS_JIT", "1") != "0"
+
+
+def jit_disponible():
+    return NUCLEOS is not None
+
+
+def _usar_jit(jit):
+    """jit=None sigue la configuracion; sin numba siempre se usa NumPy."""
+    return jit_disponible() and (JIT_POR_DEFECTO if jit is None else bool(jit))
+
+
+def _compilado(nombre, *parametros):
+    """Par (rhs, jac) que llama a los nucleos de numba con los parametros en un arreglo.
+
+    El rhs lleva el atributo nucleo para que integrar() pueda correr todo el bucle de
+    RK45 compilado en lugar de volver a Python en cada evaluacion.
+    """
+    rhs_nb, jac_nb = NUCLEOS[nombre]
+    p = np.array(parametros, dtype=float)
+
+    def rhs(t, y):
+        return rhs_nb(t, np.asarray(y, dtype=float), p)
+
+    def jac(t, y):
+        return jac_nb(t, np.asarray(y, dtype=float), p)
+
+    rhs.nucleo = (nombre, p)
+    return rhs, jac
+
+
+def sir(N, beta, gamma, jit=None):
+    """RHS y jacobiano del modelo SIR con los parametros ya fijados.
+
+    Ambas funciones tienen la firma f(t, y) de solve_ivp y aceptan y de forma (3,) o
+    (3, k), asi que sirven tambien con vectorized=True o para lotes de estados. Con
+    jit (y numba instalado) se devuelven los nucleos compilados, solo para y de forma (3,).
+    """
+    if _usar_jit(jit):
+        return _compilado("sir", N, beta, gamma)
+    b = beta / N
+
+    def rhs(t, y):
+        S, I, R = y
+        infeccion = b * S * I
+        return np.array([-infeccion, infeccion - gamma * I, gamma * I])
+
+    def jac(t, y):
+        S, I, R = y
+        return np.array([
+            [-b * I, -b * S, 0.0],
+            [b * I, b * S - gamma, 0.0],
+            [0.0, gamma, 0.0],
+        ])
+
+    return rhs, jac
+
+
+# RK4 clasico es estable en el eje real para paso * |lambda| < 2.78; con paso * radio
+# <= 0.4 sobra margen y el error local relativo, cerca de (0.4)^5 / 120 ~ 1e-4 por paso,
+# se va achicando como paso^4. En SIR y SEIR la suma de las tasas acota el radio
+# espectral del jacobiano (Gershgorin, con beta * (S + I) / N <= beta). Con los limites
+# del ajuste (beta y gamma hasta 3, sigma hasta 1/2) la cota es 6.5 y salen 17 pasos por dia.
+PASO_RADIO_RK4 = 0.4
+
+
+def pasos_rk4(duracion, radio, paso_maximo=np.inf):
+    """(paso, pasos): pasos iguales que cubren duracion con paso * radio <= PASO_RADIO_RK4."""
+    paso = min(paso_maximo, PASO_RADIO_RK4 / max(radio, 1e-9))
+    pasos = max(1, int(np.ceil(duracion / paso)))
+    return duracion / pasos, pasos
+
+
+def rk4(rhs, y, paso, pasos=1):
+    """Avanza y con RK4 de paso fijo; rhs(t, y) no debe depender de t."""
+    for _ in range(pasos):
+        k1 = rhs(0, y)
+        k2 = rhs(0, y + 0.5 * paso * k1)
+        k3 = rhs(0, y + 0.5 * paso * k2)
+        k4 = rhs(0, y + paso * k3)
+        y = y + paso / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return y
+
+
+@lru_cache(maxsize=16)
+def barrido_sir(N, I0, tiempo, rango_beta, rango_gamma, puntos):
+    """Integra toda la malla beta x gamma como un solo sistema de forma (3, M).
+
+    Usa RK4 de paso fijo sobre todas las combinaciones a la vez y lleva el maximo de
+    infectados sobre la marcha, sin guardar las trayectorias. Devuelve matrices
+    (puntos, puntos) con filas por gamma y columnas por beta: pico de infectados,
+    dia del pico y tamaño final (N - S al terminar). Queda en cache por argumentos.
+    """
+    betas = np.linspace(*rango_beta, puntos)
+    gammas = np.linspace(*rango_gamma, puntos)
+    B, G = np.meshgrid(betas, gammas)
+    rhs, _ = sir(N, B.ravel(), G.ravel(), jit=False)
+
+    # El tope de 0.25 dias es para ubicar bien el dia del pico
+    paso, pasos = pasos_rk4(tiempo, rango_beta[1] + rango_gamma[1], paso_maximo=0.25)
+
+    y = np.empty((3, B.size))
+    y[0], y[1], y[2] = N - I0, I0, 0.0
+    pico = y[1].copy()
+    dia_pico = np.zeros(B.size)
+
+    for k in range(1, pasos + 1):
+        y = rk4(rhs, y, paso)
+        sube = y[1] > pico
+        pico = np.where(sube, y[1], pico)
+        dia_pico = np.where(sube, k * paso, dia_pico)
+
+    forma = B.shape
+    return betas, gammas, pico.reshape(forma), dia_pico.reshape(forma), (N - y[0]).reshape(forma)
+
+
+def seir(N, beta, sigma, gamma, jit=None):
+    """RHS y jacobiano del modelo SEIR con los parametros ya fijados."""
+    if _usar_jit(jit):
+        return _compilado("seir", N, beta, sigma, gamma)
+    b = beta / N
+
+    def rhs(t, y):
+        S, E, I, R = y
+        infeccion = b * S * I
+        return np.array([-infeccion, infeccion - sigma * E, sigma * E - gamma * I, gamma * I])
+
+    def jac(t, y):
+        S, E, I, R = y
+        return np.array([
+            [-b * I, 0.0, -b * S, 0.0],
+            [b * I, -sigma, b * S, 0.0],
+            [0.0, sigma, -gamma, 0.0],
+            [0.0, 0.0, gamma, 0.0],
+        ])
+
+    return rhs, jac
+
+
+def seir_metapoblacion(beta, sigma, gamma, movilidad):
+    """RHS y jacobiano de un SEIR con P parches acoplados por movilidad.
+
+    movilidad es una matriz dispersa (P, P) con la tasa por dia a la que la gente del
+    parche i se mueve al j. El estado es y = [S, E, I, R] aplanado, de largo 4P, y cada
+    compartimento se mueve con el mismo operador L = M^T - diag(salidas): el costo por
+    evaluacion es un producto disperso, lineal en la cantidad de conexiones. El
+    jacobiano es disperso, para BDF y Radau.
+    """
+    movilidad = sparse.csr_matrix(movilidad, dtype=float)
+    P = movilidad.shape[0]
+    L = (movilidad.T - sparse.diags(np.asarray(movilidad.sum(axis=1)).ravel())).tocsr()
+    bloque_L = sparse.block_diag([L] * 4, format='csr')
+
+    def rhs(t, y):
+        S, E, I, R = np.reshape(y, (4, P))
+        N = np.maximum(S + E + I + R, 1e-12)
+        infeccion = beta * S * I / N
+        local = np.concatenate([-infeccion, infeccion - sigma * E, sigma * E - gamma * I, gamma * I])
+        return local + bloque_L @ y
+
+    def jac(t, y):
+        S, E, I, R = np.reshape(y, (4, P))
+        N = np.maximum(S + E + I + R, 1e-12)
+        # Derivadas de beta S I / N respecto de cada compartimento del mismo parche
+        comun = beta * S * I / N**2
+        d_inf = [beta * I / N - comun, -comun, beta * S / N - comun, -comun]
+        D = sparse.diags
+        fila_inf = [D(d) for d in d_inf]
+        cero = D(np.zeros(P))
+        J = sparse.bmat([
+            [-fila_inf[0], -fila_inf[1], -fila_inf[2], -fila_inf[3]],
+            [fila_inf[0], fila_inf[1] - sigma * sparse.eye(P), fila_inf[2], fila_inf[3]],
+            [cero, sigma * sparse.eye(P), -gamma * sparse.eye(P), cero],
+            [cero, cero, gamma * sparse.eye(P), cero],
+        ], format='csr')
+        return J + bloque_L
+
+    return rhs, jac
+
+
+def sip(r, K, alpha, g, a1, m, mu, rho, a2, n, w1, w2, c, d, jit=None):
+    """RHS y jacobiano del sistema depredador-presa-enfermedad (xS, xI, y).
+
+    Los 14 parametros se fijan una sola vez; cada evaluacion solo hace aritmetica.
+    """
+    if _usar_jit(jit):
+        return _compilado("sip", r, K, alpha, g, a1, m, mu, rho, a2, n, w1, w2, c, d)
+    A1 = a1 * (1 - m)
+    A2 = a2 * (1 - n)
+    perdida_I = mu + g + rho
+
+    def rhs(t, y):
+        xS, xI, y_pred = y
+        dxS_dt = r * xS * (1 - (xS + xI) / K) - alpha * xS * xI + g * xI - A1 * xS * y_pred - mu * xS
+        dxI_dt = alpha * xS * xI - perdida_I * xI - A2 * xI * y_pred
+        dy_dt = w1 * A1 * xS * y_pred + w2 * A2 * xI * y_pred - c * y_pred - d * y_pred**2
+        return np.array([dxS_dt, dxI_dt, dy_dt])
+
+    def jac(t, y):
+        xS, xI, y_pred = y
+        return np.array([
+            [r * (1 - (2 * xS + xI) / K) - alpha * xI - A1 * y_pred - mu,
+             -r * xS / K - alpha * xS + g,
+             -A1 * xS],
+            [alpha * xI,
+             alpha * xS - perdida_I - A2 * y_pred,
+             -A2 * xI],
+            [w1 * A1 * y_pred,
+             w2 * A2 * y_pred,
+             w1 * A1 * xS + w2 * A2 * xI - c - 2 * d * y_pred],
+        ])
+
+    return rhs, jac
+
+
+def _compilable(nucleo, metodo, opciones):
+    """El RK45 compilado solo entiende rtol y atol escalares."""
+    return (nucleo is not None and metodo == 'RK45' and set(opciones) <= {'rtol', 'atol'}
+            and all(np.ndim(v) == 0 for v in opciones.values()))
+
+
+def integrar(modelo, y0, t_span, t_eval=None, metodo='RK45', **opciones):
+    """solve_ivp sobre un par (rhs, jac); el jacobiano solo se pasa a los metodos implicitos.
+
+    Si el modelo es compilado, el metodo es RK45 y hay t_eval, el bucle completo corre
+    en numba con el mismo tablero y control de paso que solve_ivp.
+    """
+    rhs, jac = modelo
+    nucleo = getattr(rhs, 'nucleo', None)
+    if _compilable(nucleo, metodo, opciones) and t_eval is not None:
+        y, t, nfev, estado = integrar_rk45(*nucleo, t_span, y0, t_eval, **opciones)
+        return OptimizeResult(
+            t=t, y=y, nfev=nfev, njev=0, nlu=0, status=estado, success=estado >= 0,
+            message="Se alcanzo el final del intervalo." if estado >= 0 else "Fallo la integracion.",
+        )
+    if metodo in METODOS_IMPLICITOS:
+        opciones['jac'] = jac
+    return solve_ivp(rhs, t_span, y0, t_eval=t_eval, method=metodo, **opciones)
+
+
+class SolucionDensa:
+    """Interpolante de una corrida de Runge-Kutta, evaluable en cualquier t del intervalo.
+
+    Guarda por paso aceptado su inicio t, su largo h, el estado y y los coeficientes Q
+    de la salida densa: y(t + theta h) = y + h Q (theta, theta^2, ...). Se evalua de
+    forma vectorizada, sin volver a integrar.
+    """
+
+    def __init__(self, t, h, y, Q):
+        self.t, self.h, self.y, self.Q = t, h, y, Q
+        self.t_min, self.t_max = t[0], t[-1] + h[-1]
+
+    def __call__(self, t):
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        paso = np.clip(np.searchsorted(self.t, t, side='right') - 1, 0, self.t.size - 1)
+        theta = (t - self.t[paso]) / self.h[paso]
+        potencias = theta[:, None] ** np.arange(1, self.Q.shape[2] + 1)
+        return (self.y[paso] + self.h[paso, None] * np.einsum('mnk,mk->mn', self.Q[paso], potencias)).T
+
+
+class SolucionPorPartes:
+    """Une los interpolantes de los metodos usados uno despues de otro (ver metodo='auto')."""
+
+    def __init__(self, partes):
+        self.partes = partes
+        self.t_min, self.t_max = partes[0].t_min, partes[-1].t_max
+        self._bordes = np.array([parte.t_max for parte in partes[:-1]])
+
+    def __call__(self, t):
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        cual = np.searchsorted(self._bordes, t, side='right')
+        salida = None
+        for i, parte in enumerate(self.partes):
+            elegidos = np.flatnonzero(cual == i)
+            if elegidos.size:
+                valores = parte(t[elegidos])
+                if salida is None:
+                    salida = np.empty((valores.shape[0], t.size))
+                salida[:, elegidos] = valores
+        return salida
+
+
+# Con metodo='auto' se empieza con RK45 y se pasa a METODO_RIGIDO cuando h por el radio
+# espectral del jacobiano supera LIMITE_RIGIDEZ en REVISIONES_RIGIDEZ revisiones seguidas:
+# ahi el paso lo limita la estabilidad de RK45 (su region llega a ~3.3) y no la precision.
+METODO_RIGIDO = 'Radau'
+LIMITE_RIGIDEZ = 2.5
+REVISIONES_RIGIDEZ = 3
+
+MENSAJES = {
+    'final': "Se alcanzo el final del intervalo.",
+    'extincion': "Todas las poblaciones cayeron bajo el umbral de extincion.",
+    'equilibrio': "La solucion llego a un equilibrio.",
+    'fallo': "Fallo la integracion.",
+}
+
+
+class IntegradorPorTramos:
+    """Integra hasta t_span[1] de a tramos, conservando el estado del metodo entre ellos.
+
+    El resultado en t_eval es el mismo que el de integrar() en una sola llamada: se
+    usan los mismos pasos y la misma salida densa. Sirve para reportar progreso,
+    cancelar o mostrar la solucion mientras se calcula. Con densa=True se conserva
+    ademas el interpolante completo (ver solucion_densa).
+
+    metodo='auto' revisa la rigidez despues de cada tramo y cambia a un metodo
+    implicito con el jacobiano analitico cuando hace falta. La integracion se corta
+    antes si todas las componentes quedan bajo `extincion` o si las derivadas se
+    mantienen bajo `equilibrio` (relativo a 1 + |y|) durante `ventana_equilibrio`;
+    ambos eventos se revisan sobre los puntos de t_eval.
+    """
+
+    def __init__(self, modelo, y0, t_span, t_eval, metodo='RK45', densa=False,
+                 extincion=None, equilibrio=None, ventana_equilibrio=1.0, **opciones):
+        self.modelo = modelo
+        self.t_eval = np.asarray(t_eval, dtype=float)
+        self.t_inicial, self.t_final = float(t_span[0]), float(t_span[1])
+        self.densa = densa
+        self.opciones = opciones
+        self.automatico = metodo == 'auto'
+        self.extincion, self.equilibrio = extincion, equilibrio
+        self.ventana_equilibrio = ventana_equilibrio
+        self.motivo = None
+        self.cambios = []
+        self.y = np.empty((len(y0), self.t_eval.size))
+        self._listos = 0
+        self._fin = None
+        self._partes = []
+        self._rigidez = 0
+        self._revisados = 0
+        self._movimiento = self.t_inicial
+        self._iniciar('RK45' if self.automatico else metodo, self.t_inicial, y0)
+
+    def _iniciar(self, metodo, t0, y0):
+        rhs, jac = self.modelo
+        opciones = dict(self.opciones)
+        self.metodo = metodo
+        self.cambios.append((float(t0), metodo))
+        nucleo = getattr(rhs, 'nucleo', None)
+        if _compilable(nucleo, metodo, opciones) and t0 == self.t_inicial:
+            self._compilado = RK45Compilado(*nucleo, (t0, self.t_final), y0, self.t_eval,
+                                            densa=self.densa, **opciones)
+            self.y = self._compilado.salida
+            return
+
+        self._compilado = None
+        self._metodo_rk = metodo in ('RK23', 'RK45')
+        self._pasos = []
+        if metodo in METODOS_IMPLICITOS:
+            opciones['jac'] = jac
+        self._metodo = METODOS[metodo](rhs, t0, np.asarray(y0, dtype=float), self.t_final, **opciones)
+
+    @property
+    def t(self):
+        if self._fin is not None:
+            return self.t_eval[self._fin - 1]
+        return self._compilado.t if self._compilado else self._metodo.t
+
+    @property
+    def listos(self):
+        """Cantidad de puntos de t_eval ya calculados."""
+        if self._fin is not None:
+            return self._fin
+        return self._compilado.j if self._compilado else self._listos
+
+    @property
+    def terminado(self):
+        return self.motivo is not None
+
+    @property
+    def exito(self):
+        return self.motivo is not None and self.motivo != 'fallo'
+
+    @property
+    def progreso(self):
+        """Fraccion del intervalo de tiempo ya integrada."""
+        return (self.t - self.t_inicial) / max(self.t_final - self.t_inicial, 1e-300)
+
+    def avanzar(self, pasos):
+        """Da hasta `pasos` pasos del metodo; devuelve cuantos t_eval nuevos quedaron listos."""
+        if self.terminado:
+            return 0
+        inicio = self.listos
+        if self._compilado:
+            self._compilado.avanzar(pasos)
+            estado = self._compilado.estado
+        else:
+            self._avanzar_metodo(pasos)
+            estado = {'running': 1, 'finished': 0}.get(self._metodo.status, -1)
+
+        self._revisar_eventos()
+        if self.motivo is None and estado != 1:
+            self.motivo = 'final' if estado == 0 else 'fallo'
+        elif self.motivo is None and self.automatico and self.metodo not in METODOS_IMPLICITOS:
+            self._revisar_rigidez()
+        return self.listos - inicio
+
+    def _avanzar_metodo(self, pasos):
+        for _ in range(pasos):
+            if self._metodo.status != 'running':
+                break
+            self._metodo.step()
+            if self._metodo.status == 'failed':
+                break
+            interpolante = self._metodo.dense_output()
+            if self.densa:
+                self._pasos.append(interpolante)
+            nuevos = np.searchsorted(self.t_eval, self._metodo.t, side='right')
+            if nuevos > self._listos:
+                self.y[:, self._listos:nuevos] = interpolante(self.t_eval[self._listos:nuevos])
+                self._listos = nuevos
+
+    def _revisar_rigidez(self):
+        if self._compilado:
+            t, y, h = self._compilado.t, self._compilado.y, self._compilado.h
+        else:
+            t, y, h = self._metodo.t, self._metodo.y, self._metodo.step_size
+        jacobiano = self.modelo[1](t, y)
+        if h is None or not np.all(np.isfinite(jacobiano)):
+            return
+        radio = np.max(np.abs(np.linalg.eigvals(jacobiano)))
+        self._rigidez = self._rigidez + 1 if h * radio > LIMITE_RIGIDEZ else 0
+        if self._rigidez >= REVISIONES_RIGIDEZ:
+            self._cambiar(METODO_RIGIDO, t, np.array(y))
+
+    def _cambiar(self, metodo, t, y):
+        """Sigue desde (t, y) con otro metodo, conservando lo calculado y su interpolante."""
+        if self.densa:
+            parte = self._densa_actual()
+            if parte is not None:
+                self._partes.append(parte)
+        if self._compilado:
+            self._listos = self._compilado.j
+        self._rigidez = 0
+        self._iniciar(metodo, t, y)
+
+    def _revisar_eventos(self):
+        if self.extincion is None and self.equilibrio is None:
+            return
+        desde, hasta = self._revisados, self.listos
+        if hasta <= desde:
+            return
+        self._revisados = hasta
+
+        candidatos = []
+        if self.extincion is not None:
+            extintos = np.flatnonzero(np.all(self.y[:, desde:hasta] < self.extincion, axis=0))
+            if extintos.size:
+                candidatos.append((desde + extintos[0], 'extincion'))
+        if self.equilibrio is not None:
+            quieto = self._buscar_equilibrio(desde, hasta)
+            if quieto is not None:
+                candidatos.append((quieto, 'equilibrio'))
+        if candidatos:
+            indice, self.motivo = min(candidatos)
+            self._fin = indice + 1
+
+    def _buscar_equilibrio(self, desde, hasta):
+        """Primer indice en que las derivadas llevan ventana_equilibrio bajo la tolerancia."""
+        inicio = max(desde, 1)
+        if hasta <= inicio:
+            return None
+        t = self.t_eval[inicio - 1:hasta]
+        y = self.y[:, inicio - 1:hasta]
+        derivada = np.max(np.abs(np.diff(y, axis=1)) / np.diff(t), axis=0)
+        quieto = derivada <= self.equilibrio * (1 + np.max(np.abs(y[:, 1:]), axis=0))
+
+        # Ultimo instante en que la solucion todavia se movia, para cada punto
+        movimiento = np.maximum.accumulate(np.where(quieto, -np.inf, t[1:]))
+        movimiento = np.maximum(movimiento, self._movimiento)
+        self._movimiento = movimiento[-1]
+        estable = np.flatnonzero(quieto & (t[1:] - movimiento >= self.ventana_equilibrio))
+        return inicio + estable[0] if estable.size else None
+
+    def _densa_actual(self):
+        if self._compilado:
+            return SolucionDensa(*self._compilado.registro()) if self._compilado.k else None
+        if self._metodo_rk and self._pasos:
+            # Los RK de scipy usan la misma forma y + h Q p que el RK45 compilado
+            return SolucionDensa(
+                np.array([paso.t_old for paso in self._pasos]),
+                np.array([paso.h for paso in self._pasos]),
+                np.array([paso.y_old for paso in self._pasos]),
+                np.array([paso.Q for paso in self._pasos]),
+            )
+        if self._pasos:
+            tiempos = [self._pasos[0].t_old] + [paso.t for paso in self._pasos]
+            if np.all(np.diff(tiempos) > 0):
+                return OdeSolution(tiempos, self._pasos)
+        return None
+
+    def solucion_densa(self):
+        """Interpolante de lo integrado hasta ahora; None si no se pidio densa=True."""
+        if not self.densa:
+            return None
+        partes = [parte for parte in self._partes + [self._densa_actual()] if parte is not None]
+        if len(partes) > 1:
+            return SolucionPorPartes(partes)
+        return partes[0] if partes else None
+
+    def resultado(self):
+        """Lo calculado hasta ahora, con los mismos campos que devuelve solve_ivp.
+
+        Agrega el metodo final, los cambios de metodo [(t, metodo), ...] y el motivo
+        del corte ('final', 'extincion', 'equilibrio', 'fallo' o None si sigue).
+        """
+        return OptimizeResult(
+            t=self.t_eval[:self.listos], y=self.y[:, :self.listos], sol=self.solucion_densa(),
+            success=self.exito,
+            status={'final': 0, 'extincion': 1, 'equilibrio': 1}.get(self.motivo, -1),
+            message=MENSAJES.get(self.motivo, "La integracion no termino."),
+            metodo=self.metodo, cambios=self.cambios, motivo=self.motivo,
+        )
+
+
+MODELOS = {'sir': sir, 'seir': seir, 'sip': sip}
+
+
+def simular_por_tramos(nombre, parametros, y0, t_span, t_eval, metodo='RK45', jit=None,
+                       reportar=None, pasos_por_tramo=200, densa=False, **opciones):
+    """Integra el modelo `nombre` llamando a reportar(progreso) despues de cada tramo.
+
+    Recibe solo datos serializables, asi que puede correr en otro proceso.
+    """
+    modelo = MODELOS[nombre](**parametros, jit=jit)
+    integrador = IntegradorPorTramos(modelo, y0, t_span, t_eval, metodo=metodo, densa=densa, **opciones)
+    while not integrador.terminado:
+        integrador.avanzar(pasos_por_tramo)
+        if reportar is not None:
+            reportar(integrador.progreso)
+    return integrador.resultado()
+
+
+# Pasos de RK45 que se le dan a un lote antes de integrar sus juegos uno por uno
+MAX_PASOS_LOTE = 20_000
+
+# Tramo con que avanza cada juego del respaldo: metodo='auto' revisa la rigidez al final
+# de cada tramo y necesita REVISIONES_RIGIDEZ seguidas para pasar a METODO_RIGIDO
+PASOS_TRAMO_LOTE = 200
+
+
+def integrar_lote(nombre, parametros, y0, t_span, t_eval, max_pasos=MAX_PASOS_LOTE, rtol=1e-3, atol=1e-6,
+                  **opciones):
+    """Integra k juegos de parametros del modelo `nombre` como un solo sistema (n, k).
+
+    parametros tiene escalares o arreglos de largo k. El lote avanza con RK45 sobre
+    las funciones NumPy, que ya aceptan parametros vectorizados; si no termina en
+    max_pasos (por ejemplo porque algun juego es rigido) se sigue juego por juego con
+    metodo='auto', de a PASOS_TRAMO_LOTE pasos y con max_pasos como tope. Devuelve y de forma
+    (k, n, len(t_eval)), con NaN en los juegos que fallan o no terminan.
+    """
+    parametros = {clave: np.asarray(valor, dtype=float) for clave, valor in parametros.items()}
+    k = max(valor.size for valor in parametros.values())
+    y0 = np.asarray(y0, dtype=float)
+    rhs, _ = MODELOS[nombre](**parametros, jit=False)
+
+    def rhs_lote(t, z):
+        return rhs(t, z.reshape(y0.size, k)).reshape(-1)
+
+    # RK45 mide el error con la norma RMS de todo el vector: el error de un juego
+    # se diluye entre los k, asi que las tolerancias se dividen por sqrt(k) para que
+    # cada juego cumpla rtol y atol por separado
+    escala = np.sqrt(k)
+    lote = IntegradorPorTramos((rhs_lote, None), np.repeat(y0, k), t_span, t_eval, metodo='RK45',
+                               rtol=rtol / escala, atol=atol / escala, **opciones)
+    lote.avanzar(max_pasos)
+    if lote.exito and np.all(np.isfinite(lote.y)):
+        return lote.y.reshape(y0.size, k, -1).transpose(1, 0, 2)
+
+    salida = np.full((k, y0.size, len(t_eval)), np.nan)
+    for i in range(k):
+        juego = {clave: float(valor.reshape(-1)[i if valor.size > 1 else 0]) for clave, valor in parametros.items()}
+        integrador = IntegradorPorTramos(MODELOS[nombre](**juego, jit=False), y0, t_span, t_eval, metodo='auto',
+                                         rtol=rtol, atol=atol, **opciones)
+        pasos = 0
+        while not integrador.terminado and pasos < max_pasos:
+            integrador.avanzar(min(PASOS_TRAMO_LOTE, max_pasos - pasos))
+            pasos += PASOS_TRAMO_LOTE
+        if integrador.exito:
+            salida[i] = integrador.y
+    return salida
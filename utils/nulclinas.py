@@ -0,0 +1,193 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+
+from utils.expresiones import funcion_campo
+
+
+def _interpolar(f0, f1):
+    """Fraccion del borde donde f cambia de signo; NaN si no hay cruce."""
+    with np.errstate(all='ignore'):
+        t = f0 / (f0 - f1)
+    return np.where((f0 > 0) != (f1 > 0), t, np.nan)
+
+
+def contorno_cero(F, x, y):
+    """Marching squares vectorizado para el nivel F = 0.
+
+    F tiene forma (len(y), len(x)). Devuelve las coordenadas de todos los segmentos
+    en dos arreglos separados por NaN, listos para una sola traza de lineas.
+    """
+    a, b = F[:-1, :-1], F[:-1, 1:]
+    d, c = F[1:, :-1], F[1:, 1:]
+    x0, x1 = x[:-1], x[1:]
+    y0, y1 = y[:-1, None], y[1:, None]
+
+    # Bordes de cada celda: abajo (a-b), derecha (b-c), arriba (d-c), izquierda (a-d)
+    t = np.stack([_interpolar(a, b), _interpolar(b, c), _interpolar(d, c), _interpolar(a, d)])
+    ex = np.stack([x0 + t[0] * (x1 - x0), np.broadcast_to(x1, a.shape),
+                   x0 + t[2] * (x1 - x0), np.broadcast_to(x0, a.shape)])
+    ey = np.stack([np.broadcast_to(y0, a.shape), y0 + t[1] * (y1 - y0),
+                   np.broadcast_to(y1, a.shape), y0 + t[3] * (y1 - y0)])
+    cruza = np.isfinite(t)
+    cantidad = cruza.sum(axis=0)
+
+    # Celdas con dos cruces: un segmento entre ellos
+    dos = cantidad == 2
+    orden = np.argsort(~cruza[:, dos], axis=0, kind='stable')[:2]
+    px = np.take_along_axis(ex[:, dos], orden, axis=0)
+    py = np.take_along_axis(ey[:, dos], orden, axis=0)
+
+    # Celdas ambiguas con cuatro cruces: el valor del centro decide como se emparejan
+    cuatro = cantidad == 4
+    centro = (a + b + c + d)[cuatro] / 4
+    une_ac = (centro > 0) == (a[cuatro] > 0)
+    pares = np.where(une_ac, np.array([[0], [1]]), np.array([[0], [3]]))
+    otros = np.where(une_ac, np.array([[2], [3]]), np.array([[1], [2]]))
+    ex4, ey4 = ex[:, cuatro], ey[:, cuatro]
+    px = np.concatenate([px, np.take_along_axis(ex4, pares, 0), np.take_along_axis(ex4, otros, 0)], axis=1)
+    py = np.concatenate([py, np.take_along_axis(ey4, pares, 0), np.take_along_axis(ey4, otros, 0)], axis=1)
+
+    corte = np.full((1, px.shape[1]), np.nan)
+    return np.vstack([px, corte]).T.ravel(), np.vstack([py, corte]).T.ravel()
+
+
+def _jacobiano(campo, x, y):
+    """Jacobiano por diferencias centrales, evaluado para todos los puntos a la vez."""
+    hx = 1e-6 * np.maximum(1.0, np.abs(x))
+    hy = 1e-6 * np.maximum(1.0, np.abs(y))
+    fx_mas, fy_mas = campo(x + hx, y)
+    fx_menos, fy_menos = campo(x - hx, y)
+    gx_mas, gy_mas = campo(x, y + hy)
+    gx_menos, gy_menos = campo(x, y - hy)
+    return (
+        (fx_mas - fx_menos) / (2 * hx), (gx_mas - gx_menos) / (2 * hy),
+        (fy_mas - fy_menos) / (2 * hx), (gy_mas - gy_menos) / (2 * hy),
+    )
+
+
+def refinar_newton(campo, x, y, iteraciones=30, tol=1e-10):
+    """Newton vectorizado sobre todos los candidatos a equilibrio."""
+    x = np.array(x, dtype=float)
+    y = np.array(y, dtype=float)
+    for _ in range(iteraciones):
+        f, g = campo(x, y)
+        j11, j12, j21, j22 = _jacobiano(campo, x, y)
+        det = j11 * j22 - j12 * j21
+        with np.errstate(all='ignore'):
+            dx = (j22 * f - j12 * g) / det
+            dy = (j11 * g - j21 * f) / det
+        x, y = x - dx, y - dy
+        if np.all(~np.isfinite(dx) | (np.abs(dx) + np.abs(dy) < tol)):
+            break
+    return x, y
+
+
+def clasificar(j11, j12, j21, j22, tol=1e-8):
+    """Tipo de equilibrio a partir de la traza y el determinante del jacobiano."""
+    traza = j11 + j22
+    det = j11 * j22 - j12 * j21
+    discriminante = traza**2 - 4 * det
+    estabilidad = "estable" if traza < 0 else "inestable"
+
+    if abs(det) < tol:
+        return "degenerado"
+    if det < 0:
+        return "silla"
+    # Con autovalores repetidos el discriminante es 0 salvo por redondeo
+    if discriminante >= -1e-6 * traza**2:
+        return f"nodo {estabilidad}"
+    if abs(traza) < 1e-6 * max(1.0, np.sqrt(det)):
+        return "centro"
+    return f"foco {estabilidad}"
+
+
+@lru_cache(maxsize=64)
+def analizar_campo(fx_str, fy_str, limites, resolucion=500, max_candidatos=2000):
+    """Nulclinas, equilibrios y su tipo sobre una malla fina de resolucion x resolucion.
+
+    El resultado se guarda por (expresiones, limites, resolucion). Devuelve los contornos
+    de dx/dt = 0 y dy/dt = 0 y una lista de equilibrios con su tipo y autovalores.
+    """
+    xmin, xmax, ymin, ymax = limites
+    x = np.linspace(xmin, xmax, resolucion)
+    y = np.linspace(ymin, ymax, resolucion)
+    X, Y = np.meshgrid(x, y)
+    campo = funcion_campo(fx_str, fy_str)
+    F, G = campo(X, Y)
+
+    nulclina_x = contorno_cero(F, x, y)
+    nulclina_y = contorno_cero(G, x, y)
+
+    # Candidatos: celdas donde F y G cambian de signo a la vez
+    def cambia(M):
+        signos = np.stack([M[:-1, :-1], M[:-1, 1:], M[1:, :-1], M[1:, 1:]]) > 0
+        return signos.any(axis=0) & ~signos.all(axis=0)
+
+    fila, columna = np.nonzero(cambia(F) & cambia(G))
+    if fila.size > max_candidatos:
+        elegidos = np.linspace(0, fila.size - 1, max_candidatos).astype(int)
+        fila, columna = fila[elegidos], columna[elegidos]
+    cx = (x[columna] + x[columna + 1]) / 2
+    cy = (y[fila] + y[fila + 1]) / 2
+
+    ex, ey = refinar_newton(campo, cx, cy)
+    f, g = campo(ex, ey)
+    escala = max(1.0, np.nanmax(np.abs(F)), np.nanmax(np.abs(G)))
+    validos = (np.isfinite(ex) & np.isfinite(ey) & (np.hypot(f, g) < 1e-8 * escala)
+               & (ex >= xmin) & (ex <= xmax) & (ey >= ymin) & (ey <= ymax))
+    ex, ey = ex[validos], ey[validos]
+
+    # Varios candidatos convergen al mismo punto: se agrupan en una celda de la malla
+    paso = min((xmax - xmin), (ymax - ymin)) / resolucion
+    _, unicos = np.unique(np.round(np.column_stack([ex, ey]) / paso), axis=0, return_index=True)
+    ex, ey = ex[np.sort(unicos)], ey[np.sort(unicos)]
+
+    j11, j12, j21, j22 = _jacobiano(campo, ex, ey)
+    equilibrios = []
+    for k in range(ex.size):
+        J = np.array([[j11[k], j12[k]], [j21[k], j22[k]]])
+        equilibrios.append({
+            "x": float(ex[k]),
+            "y": float(ey[k]),
+            "tipo": clasificar(*J.ravel()),
+            "autovalores": np.linalg.eigvals(J),
+        })
+
+    return nulclina_x, nulclina_y, equilibrios
+
+
+def trazas_nulclinas(nulclina_x, nulclina_y, equilibrios):
+    """Trazas de las dos nulclinas y de los equilibrios etiquetados."""
+    trazas = [
+        go.Scatter(
+            x=nulclina_x[0].astype(np.float32), y=nulclina_x[1].astype(np.float32),
+            mode="lines", name="Nulclina dx/dt = 0",
+            line=dict(color="orange", width=2), hoverinfo="skip",
+        ),
+        go.Scatter(
+            x=nulclina_y[0].astype(np.float32), y=nulclina_y[1].astype(np.float32),
+            mode="lines", name="Nulclina dy/dt = 0",
+            line=dict(color="green", width=2), hoverinfo="skip",
+        ),
+    ]
+
+    if equilibrios:
+        autovalores = [
+            ", ".join(f"{autovalor.real:.3g}{autovalor.imag:+.3g}i" for autovalor in eq["autovalores"])
+            for eq in equilibrios
+        ]
+        trazas.append(go.Scatter(
+            x=[eq["x"] for eq in equilibrios],
+            y=[eq["y"] for eq in equilibrios],
+            mode="markers+text",
+            name="Equilibrios",
+            text=[eq["tipo"] for eq in equilibrios],
+            textposition="top center",
+            marker=dict(size=10, color="black", symbol="x"),
+            customdata=autovalores,
+            hovertemplate="(%{x:.3f}, %{y:.3f})<br>%{text}<br>λ: %{customdata}<extra></extra>",
+        ))
+
+    return trazas
@@ -0,0 +1,25 @@
+"""Parametros del sistema depredador-presa-enfermedad, compartidos por las paginas que lo usan."""
+
+DEFAULT_PARAMS = {
+    "r": {"label": "Crecimiento intrínseco (r)", "value": 0.10, "step": 0.01},
+    "K": {"label": "Capacidad de carga (K)", "value": 60.0, "step": 1.0},
+    "alpha": {"label": "Tasa de infección (α)", "value": 0.30, "step": 0.01},
+    "g": {"label": "Tasa de recuperación (g)", "value": 0.07, "step": 0.005},
+    "a1": {"label": "Tasa de encuentro (S) (a₁)", "value": 0.20, "step": 0.01},
+    "m": {"label": "Refugio (S) (m)", "value": 0.60, "step": 0.01},
+    "mu": {"label": "Mortalidad natural (μ)", "value": 0.01, "step": 0.001},
+    "rho": {"label": "Mortalidad extra por enf. (ρ)", "value": 0.10, "step": 0.01},
+    "a2": {"label": "Tasa de encuentro (I) (a₂)", "value": 0.30, "step": 0.01},
+    "n": {"label": "Refugio (I) (n)", "value": 0.40, "step": 0.01},
+    "w1": {"label": "Efic. depredación (S)  (w₁)", "value": 0.45, "step": 0.01},
+    "w2": {"label": "Efic. depredación (I)  (w₂)", "value": 0.40, "step": 0.01},
+    "c": {"label": "Mortalidad Depredador (c)", "value": 0.035, "step": 0.001},
+    "d": {"label": "Competencia Depredador (d)", "value": 0.01, "step": 0.001},
+}
+
+INITIAL_CONDITIONS = {
+    "xS0": {"label": "Presas Susceptibles Iniciales (xS₀)", "value": 12.0, "step": 0.1},
+    "xI0": {"label": "Presas Infectadas Iniciales (xI₀)", "value": 3.0, "step": 0.1},
+    "y0": {"label": "Depredadores Iniciales (y₀)", "value": 7.0, "step": 0.1},
+    "tiempo": {"label": "Tiempo de simulación", "value": 1000, "step": 10},
+}
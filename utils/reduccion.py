@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+
+# Puntos por serie que se envian al navegador; TECNICAS_PUNTOS_PANTALLA lo cambia
+PUNTOS_PANTALLA = int(os.environ.get("TECNICAS_PUNTOS_PANTALLA", 1000))
+
+
+def lttb(x, y, puntos=PUNTOS_PANTALLA):
+    """Indices que conserva Largest-Triangle-Three-Buckets.
+
+    Parte la serie en puntos - 2 grupos y de cada uno elige el punto que forma el
+    triangulo mas grande con el elegido antes y con el promedio del grupo siguiente,
+    asi que los picos y valles sobreviven aunque se descarte casi todo lo demas.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = x.size
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+
+    # Grupos [bordes[i], bordes[i + 1]) sobre los puntos interiores 1 .. n-2
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(int)
+    cantidad = np.diff(bordes)
+    promedio_x = np.append(np.add.reduceat(x[:n - 1], bordes[:-1]) / cantidad, x[-1])
+    promedio_y = np.append(np.add.reduceat(y[:n - 1], bordes[:-1]) / cantidad, y[-1])
+
+    elegidos = np.empty(puntos, dtype=int)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    a = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        cx, cy = promedio_x[i + 1], promedio_y[i + 1]
+        area = np.abs((x[a] - cx) * (y[inicio:fin] - y[a]) - (x[a] - x[inicio:fin]) * (cy - y[a]))
+        a = inicio + int(np.nanargmax(area)) if np.isfinite(area).any() else inicio
+        elegidos[i + 1] = a
+    return elegidos
+
+
+def reducir(x, *series, puntos=PUNTOS_PANTALLA):
+    """Lista de pares (x, y) reducidos con LTTB, uno por serie.
+
+    Cada serie elige sus propios indices, asi que los picos de una no dependen de las otras.
+    """
+    x = np.asarray(x)
+    eje = np.arange(x.size) if x.dtype.kind not in "fiu" else x
+    reducidas = []
+    for y in series:
+        y = np.asarray(y)
+        indices = lttb(eje, y, puntos)
+        reducidas.append((x[indices], y[indices]))
+    return reducidas
+
+
+def resolucion_temporal(tiempo_max, por_unidad=10, minimo=200, maximo=200_000):
+    """Cantidad de puntos de t_eval: la precision la pone el integrador y LTTB reduce despues."""
+    return int(min(max(minimo, por_unidad * tiempo_max), maximo))
+
+
+def presupuesto_tramo(tramo, total, puntos=PUNTOS_PANTALLA):
+    """Parte del presupuesto de pantalla que le toca a un tramo de `tramo` de `total` puntos."""
+    return max(3, int(np.ceil(puntos * tramo / total)))
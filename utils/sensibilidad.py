@@ -0,0 +1,111 @@
+"""Analisis de sensibilidad global del sistema depredador-presa-enfermedad.
+
+Los parametros se muestrean en un hipercubo alrededor de sus valores por defecto
+(+-variacion relativa). Sobol usa el diseño de Saltelli (matrices A, B y A con la
+columna i de B) con los estimadores de Saltelli 2010 para el indice de primer
+orden y de Jansen para el total; Morris usa trayectorias de un factor a la vez.
+Las evaluaciones se agrupan en lotes de integrar_lote y se reparten en el pool.
+"""
+import numpy as np
+from scipy.stats import qmc
+
+from utils.modelos import integrar_lote
+
+
+SALIDAS = ("xS final", "xI final", "y final", "Amplitud de y")
+
+# Juegos de parametros por sistema vectorizado. Con 64 cada evaluacion cuesta ~5 ms
+# y con 512 menos de 1 ms: el costo de Python por paso se reparte entre mas juegos
+TAMANO_LOTE = 512
+
+# Parametros que son proporciones y no pueden salir de [0, 1]
+PROPORCIONES = ("m", "n")
+
+
+def limites(base, variacion):
+    """Limites inferior y superior de cada parametro, en el orden de base."""
+    valores = np.array(list(base.values()), dtype=float)
+    bajo, alto = valores * (1 - variacion), valores * (1 + variacion)
+    for i, nombre in enumerate(base):
+        if nombre in PROPORCIONES:
+            bajo[i], alto[i] = max(bajo[i], 0.0), min(alto[i], 1.0)
+    return bajo, alto
+
+
+def diseno_sobol(k, muestras, semilla=0):
+    """Filas en [0, 1]^k: A, B y los k bloques A_B^i, cada uno de `muestras` filas."""
+    base = qmc.Sobol(2 * k, seed=semilla).random(muestras)
+    A, B = base[:, :k], base[:, k:]
+    bloques = [A, B]
+    for i in range(k):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        bloques.append(AB)
+    return np.vstack(bloques)
+
+
+def diseno_morris(k, trayectorias, niveles=4, semilla=0):
+    """Filas en [0, 1]^k: trayectorias de k + 1 puntos que mueven un factor por vez en +delta."""
+    generador = np.random.default_rng(semilla)
+    delta = niveles / (2 * (niveles - 1))
+    # Solo arranques desde los que sumar delta queda dentro de [0, 1]
+    arranques = np.arange(niveles // 2) / (niveles - 1)
+    filas = []
+    for _ in range(trayectorias):
+        x = generador.choice(arranques, size=k)
+        filas.append(x.copy())
+        for i in generador.permutation(k):
+            x[i] += delta
+            filas.append(x.copy())
+    return np.array(filas)
+
+
+def evaluar_sip(filas, nombres, y0, t_final, fraccion_ventana=0.25, reportar=None):
+    """Salidas resumen (SALIDAS) para cada fila de parametros; NaN si la integracion falla.
+
+    La amplitud de y es maximo menos minimo en el ultimo `fraccion_ventana` del tiempo.
+    """
+    filas = np.asarray(filas, dtype=float)
+    t_eval = np.linspace((1 - fraccion_ventana) * t_final, t_final, 400)
+    salidas = np.empty((len(filas), len(SALIDAS)))
+    for inicio in range(0, len(filas), TAMANO_LOTE):
+        lote = filas[inicio:inicio + TAMANO_LOTE]
+        parametros = dict(zip(nombres, lote.T))
+        y = integrar_lote("sip", parametros, y0, (0, t_final), t_eval, rtol=1e-6, atol=1e-9)
+        salidas[inicio:inicio + len(lote), :3] = y[:, :, -1]
+        salidas[inicio:inicio + len(lote), 3] = y[:, 2].max(axis=1) - y[:, 2].min(axis=1)
+        if reportar is not None:
+            reportar(min(inicio + TAMANO_LOTE, len(filas)) / len(filas))
+    return salidas
+
+
+def indices_sobol(salidas, k, muestras):
+    """(S1, ST) de forma (k, salidas); las evaluaciones con NaN se descartan por indice."""
+    f_A, f_B = salidas[:muestras], salidas[muestras:2 * muestras]
+    primer_orden = np.full((k, salidas.shape[1]), np.nan)
+    total = np.full((k, salidas.shape[1]), np.nan)
+    for i in range(k):
+        f_AB = salidas[(2 + i) * muestras:(3 + i) * muestras]
+        for j in range(salidas.shape[1]):
+            validas = np.isfinite(f_A[:, j]) & np.isfinite(f_B[:, j]) & np.isfinite(f_AB[:, j])
+            a, b, ab = f_A[validas, j], f_B[validas, j], f_AB[validas, j]
+            varianza = np.var(np.concatenate([a, b]))
+            if validas.sum() < 2 or varianza == 0:
+                continue
+            primer_orden[i, j] = np.mean(b * (ab - a)) / varianza
+            total[i, j] = 0.5 * np.mean((a - ab) ** 2) / varianza
+    return primer_orden, total
+
+
+def efectos_morris(filas, salidas, k, niveles=4):
+    """(mu*, sigma) de los efectos elementales, de forma (k, salidas), en unidades de la salida."""
+    delta = niveles / (2 * (niveles - 1))
+    efectos = [[] for _ in range(k)]
+    for inicio in range(0, len(filas), k + 1):
+        x = filas[inicio:inicio + k + 1]
+        f = salidas[inicio:inicio + k + 1]
+        for paso in range(k):
+            factor = int(np.argmax(np.abs(x[paso + 1] - x[paso])))
+            efectos[factor].append((f[paso + 1] - f[paso]) / delta)
+    efectos = np.array(efectos)
+    return np.nanmean(np.abs(efectos), axis=1), np.nanstd(efectos, axis=1)
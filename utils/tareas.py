@@ -0,0 +1,174 @@
+"""Simulaciones largas en un pool de procesos, con progreso y cancelacion.
+
+Los callbacks de Dash solo envian la tarea y consultan su estado, asi que los
+trabajadores web quedan libres mientras se integra. El progreso y los pedidos de
+cancelacion viajan por diccionarios de un multiprocessing.Manager.
+
+Las tareas (y las transmisiones de utils.transmision) viven en la memoria del proceso
+que atiende las peticiones: el servidor debe correr en un solo proceso, con los hilos
+que haga falta (python app.py, o gunicorn -w 1 --threads N). reservar_proceso lo
+exige: el primer proceso que crea estado toma un candado en el directorio de la cache
+y cualquier otro proceso del servidor falla con un mensaje claro en lugar de perder
+tareas en silencio.
+"""
+import multiprocessing as mp
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from utils.cache import DIRECTORIO_CACHE
+
+
+TRABAJADORES = int(os.environ.get("TECNICAS_TRABAJADORES", min(4, os.cpu_count() or 1)))
+
+_reserva = {"pid": None, "archivo": None}
+_candado_reserva = threading.Lock()
+
+
+def reservar_proceso(directorio=DIRECTORIO_CACHE):
+    """Toma (una vez por proceso) el candado del servidor en `directorio`.
+
+    Lanza RuntimeError si otro proceso vivo ya lo tiene. Sin fcntl (Windows) no se
+    verifica nada.
+    """
+    with _candado_reserva:
+        if fcntl is None or _reserva["pid"] == os.getpid():
+            return
+        ruta = Path(directorio) / "servidor.lock"
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        archivo = open(ruta, "a+")
+        try:
+            fcntl.flock(archivo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            archivo.seek(0)
+            dueno = archivo.read().strip() or "?"
+            archivo.close()
+            raise RuntimeError(
+                f"Otro proceso del servidor (pid {dueno}) ya tiene las tareas y transmisiones en memoria. "
+                "Ejecute la aplicacion en un solo proceso (python app.py o gunicorn -w 1 --threads N)."
+            ) from None
+        archivo.seek(0)
+        archivo.truncate()
+        archivo.write(str(os.getpid()))
+        archivo.flush()
+        # El archivo queda abierto (y el candado tomado) mientras viva el proceso
+        _reserva.update(pid=os.getpid(), archivo=archivo)
+
+
+class TareaCancelada(Exception):
+    pass
+
+
+class _Reporte:
+    """Callable que recibe la tarea: publica el progreso y corta si se pidio cancelar.
+
+    Consulta el Manager como mucho cada `intervalo` segundos para no frenar la integracion.
+    """
+
+    def __init__(self, id_tarea, progreso, cancelar, intervalo=0.1):
+        self.id_tarea = id_tarea
+        self.progreso = progreso
+        self.cancelar = cancelar
+        self.intervalo = intervalo
+        self._ultimo = 0.0
+
+    def __call__(self, fraccion):
+        ahora = time.monotonic()
+        if ahora - self._ultimo < self.intervalo and fraccion < 1:
+            return
+        self._ultimo = ahora
+        self.progreso[self.id_tarea] = float(fraccion)
+        if self.id_tarea in self.cancelar:
+            raise TareaCancelada()
+
+
+def _ejecutar(funcion, args, kwargs, reporte):
+    return funcion(*args, reportar=reporte, **kwargs)
+
+
+class GestorTareas:
+    """Pool de procesos compartido; una tarea por clave de entradas mientras este viva."""
+
+    def __init__(self, trabajadores=TRABAJADORES):
+        self.trabajadores = trabajadores
+        self._pool = None
+        self._manager = None
+        self._futuros = {}
+        self._por_clave = {}
+        self._candado = threading.Lock()
+
+    def _iniciar(self):
+        reservar_proceso()
+        # spawn evita heredar los hilos del servidor web en los procesos hijos
+        contexto = mp.get_context("spawn")
+        self._manager = contexto.Manager()
+        self._progreso = self._manager.dict()
+        self._cancelar = self._manager.dict()
+        self._pool = ProcessPoolExecutor(self.trabajadores, mp_context=contexto)
+
+    def enviar(self, clave, funcion, *args, **kwargs):
+        """Envia funcion(*args, reportar=..., **kwargs) y devuelve el id de la tarea.
+
+        Si ya hay una tarea viva con la misma clave se reutiliza en lugar de duplicarla.
+        """
+        with self._candado:
+            if self._pool is None:
+                self._iniciar()
+            id_tarea = self._por_clave.get(clave)
+            if (id_tarea in self._futuros and not self._futuros[id_tarea].done()
+                    and id_tarea not in self._cancelar):
+                return id_tarea
+
+            id_tarea = uuid.uuid4().hex
+            self._progreso[id_tarea] = 0.0
+            reporte = _Reporte(id_tarea, self._progreso, self._cancelar)
+            self._futuros[id_tarea] = self._pool.submit(_ejecutar, funcion, args, kwargs, reporte)
+            self._por_clave[clave] = id_tarea
+            return id_tarea
+
+    def estado(self, id_tarea):
+        """Dict con estado ('ejecutando', 'terminada', 'cancelada', 'error' o 'desconocida'),
+        progreso entre 0 y 1 y, si termino, resultado o error."""
+        with self._candado:
+            futuro = self._futuros.get(id_tarea)
+        if futuro is None:
+            return {"estado": "desconocida", "progreso": 0.0}
+
+        progreso = self._progreso.get(id_tarea, 0.0)
+        if id_tarea in self._cancelar and not (futuro.done() and futuro.exception() is None):
+            return {"estado": "cancelada", "progreso": progreso}
+        if not futuro.done():
+            return {"estado": "ejecutando", "progreso": progreso}
+        if futuro.exception() is not None:
+            return {"estado": "error", "progreso": progreso, "error": futuro.exception()}
+        return {"estado": "terminada", "progreso": 1.0, "resultado": futuro.result()}
+
+    def cancelar(self, id_tarea):
+        """Pide a la tarea que se detenga en su proximo reporte (o la quita de la cola)."""
+        with self._candado:
+            futuro = self._futuros.get(id_tarea)
+            if futuro is None:
+                return
+            self._cancelar[id_tarea] = True
+            futuro.cancel()
+        futuro.add_done_callback(lambda _: self.olvidar(id_tarea))
+
+    def olvidar(self, id_tarea):
+        """Libera el resultado y las entradas compartidas de una tarea ya consultada."""
+        with self._candado:
+            self._futuros.pop(id_tarea, None)
+            self._por_clave = {c: i for c, i in self._por_clave.items() if i != id_tarea}
+            if self._manager is not None:
+                self._progreso.pop(id_tarea, None)
+                self._cancelar.pop(id_tarea, None)
+
+
+gestor_tareas = GestorTareas()
@@ -0,0 +1,102 @@
+"""Integracion por tramos para ir dibujando la solucion con extendData.
+
+Cada transmision guarda un IntegradorPorTramos en memoria del proceso del servidor;
+cada llamada a siguiente_tramo() avanza un tramo y devuelve solo los puntos nuevos.
+El numero de pasos por tramo se ajusta para que cada actualizacion tarde cerca de
+OBJETIVO_LATENCIA segundos.
+
+Como las transmisiones viven en memoria, el servidor debe correr en un solo proceso
+(ver utils.tareas.reservar_proceso). Si hay mas de MAX_TRANSMISIONES abiertas se
+descarta la que lleva mas tiempo sin pedir tramos y su id queda marcado como
+'expirada' para que la pagina lo diga en lugar de darla por terminada.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from utils.tareas import reservar_proceso
+
+
+OBJETIVO_LATENCIA = 0.05
+MAX_TRANSMISIONES = 64
+# Ids descartados por exceso que se recuerdan para informar a la pagina
+MAX_EXPIRADAS = 1024
+
+
+class Transmision:
+    def __init__(self, integrador, objetivo=OBJETIVO_LATENCIA, pasos=20):
+        self.integrador = integrador
+        self.objetivo = objetivo
+        self.pasos = pasos
+        self.entregados = 0
+        self._candado = threading.Lock()
+
+    def siguiente(self):
+        """Avanza un tramo; devuelve (t, y, terminado) con los puntos que no se habian entregado."""
+        with self._candado:
+            return self._siguiente()
+
+    def _siguiente(self):
+        inicio = time.perf_counter()
+        self.integrador.avanzar(self.pasos)
+        duracion = time.perf_counter() - inicio
+
+        # Se apunta al 80 % del objetivo y se limita el cambio para no oscilar
+        factor = 0.8 * self.objetivo / max(duracion, 1e-6)
+        self.pasos = int(min(max(self.pasos * min(max(factor, 0.25), 4.0), 1), 1_000_000))
+
+        listos = self.integrador.listos
+        t = self.integrador.t_eval[self.entregados:listos]
+        y = self.integrador.y[:, self.entregados:listos]
+        self.entregados = listos
+        return t, y, self.integrador.terminado
+
+
+_transmisiones = OrderedDict()
+_expiradas = OrderedDict()
+_candado = threading.Lock()
+
+
+def iniciar_transmision(integrador, objetivo=OBJETIVO_LATENCIA):
+    """Registra el integrador y devuelve su id; si hay demasiadas, expira la menos usada."""
+    reservar_proceso()
+    id_transmision = uuid.uuid4().hex
+    with _candado:
+        _transmisiones[id_transmision] = Transmision(integrador, objetivo)
+        while len(_transmisiones) > MAX_TRANSMISIONES:
+            vieja, _ = _transmisiones.popitem(last=False)
+            _expiradas[vieja] = True
+        while len(_expiradas) > MAX_EXPIRADAS:
+            _expiradas.popitem(last=False)
+    return id_transmision
+
+
+def obtener_transmision(id_transmision):
+    with _candado:
+        transmision = _transmisiones.get(id_transmision)
+        if transmision is not None:
+            _transmisiones.move_to_end(id_transmision)
+        return transmision
+
+
+def estado_transmision(id_transmision):
+    """'activa', 'expirada' (descartada por exceso de transmisiones) o 'desconocida'."""
+    with _candado:
+        if id_transmision in _transmisiones:
+            return "activa"
+        return "expirada" if id_transmision in _expiradas else "desconocida"
+
+
+def siguiente_tramo(id_transmision):
+    """(t, y, terminado) del siguiente tramo, o None si la transmision ya no existe
+    (estado_transmision dice si expiro)."""
+    transmision = obtener_transmision(id_transmision)
+    if transmision is None:
+        return None
+    return transmision.siguiente()
+
+
+def descartar_transmision(id_transmision):
+    with _candado:
+        _transmisiones.pop(id_transmision, None)
@@ -0,0 +1,150 @@
+import numpy as np
+import plotly.graph_objects as go
+
+
+def sembrar(limites, cantidad, semilla=0):
+    """Puntos de partida uniformes dentro de la caja (xmin, xmax, ymin, ymax)."""
+    xmin, xmax, ymin, ymax = limites
+    rng = np.random.default_rng(semilla)
+    return rng.uniform(xmin, xmax, cantidad), rng.uniform(ymin, ymax, cantidad)
+
+
+def integrar_trayectorias(campo, x0, y0, limites, pasos=100, paso=None, sentido=1.0):
+    """Integra todas las semillas a la vez con RK4 de paso fijo sobre el campo normalizado.
+
+    Se sigue la direccion del campo (parametro de longitud de arco), asi la curva es la
+    misma orbita del sistema pero el avance por paso no depende de la magnitud.
+    Devuelve arreglos (pasos+1, semillas); una trayectoria que sale de la caja o llega
+    a un equilibrio se detiene y el resto de su columna queda en NaN.
+    """
+    xmin, xmax, ymin, ymax = limites
+    if paso is None:
+        paso = 0.02 * max(xmax - xmin, ymax - ymin)
+
+    x = np.array(x0, dtype=float)
+    y = np.array(y0, dtype=float)
+    xs = np.full((pasos + 1, x.size), np.nan)
+    ys = np.full((pasos + 1, x.size), np.nan)
+    xs[0], ys[0] = x, y
+    activos = np.arange(x.size)
+
+    def direccion(x, y):
+        u, v = campo(x, y)
+        norma = np.hypot(u, v)
+        with np.errstate(all='ignore'):
+            return sentido * u / norma, sentido * v / norma, norma
+
+    k = 0
+    for k in range(1, pasos + 1):
+        k1x, k1y, norma = direccion(x, y)
+        k2x, k2y, _ = direccion(x + 0.5 * paso * k1x, y + 0.5 * paso * k1y)
+        k3x, k3y, _ = direccion(x + 0.5 * paso * k2x, y + 0.5 * paso * k2y)
+        k4x, k4y, _ = direccion(x + paso * k3x, y + paso * k3y)
+        x = x + paso / 6 * (k1x + 2 * k2x + 2 * k3x + k4x)
+        y = y + paso / 6 * (k1y + 2 * k2y + 2 * k3y + k4y)
+
+        validos = np.isfinite(x) & np.isfinite(y) & (norma > 1e-12)
+        xs[k, activos[validos]] = x[validos]
+        ys[k, activos[validos]] = y[validos]
+
+        # Solo se sigue integrando lo que quedo dentro de la caja
+        sigue = validos & (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        activos, x, y = activos[sigue], x[sigue], y[sigue]
+        if activos.size == 0:
+            break
+
+    return xs[:k + 1], ys[:k + 1]
+
+
+def traza_trayectorias(xs, ys, color="darkviolet"):
+    """Une todas las trayectorias en una sola traza de lineas separadas por NaN."""
+    corte = np.full((1, xs.shape[1]), np.nan)
+    x = np.vstack([xs, corte]).T.ravel()
+    y = np.vstack([ys, corte]).T.ravel()
+
+    # Quitar los NaN repetidos que dejan las trayectorias que terminaron antes
+    nan = np.isnan(x)
+    conservar = ~(nan & np.concatenate([[True], nan[:-1]]))
+
+    return go.Scatter(
+        x=x[conservar].astype(np.float32),
+        y=y[conservar].astype(np.float32),
+        mode="lines",
+        line=dict(color=color, width=1),
+        opacity=0.7,
+        hoverinfo="skip",
+        showlegend=False,
+    )
+
+
+def advectar_particulas(campo, limites, cantidad, cuadros, subpasos=4, semilla=0):
+    """Posiciones de todas las particulas en todos los cuadros, calculadas en un solo lote.
+
+    Se integra el sistema en su tiempo real con RK4. El paso se elige para que una
+    particula tipica avance ~1% de la caja por cuadro; las que salen de la caja o se
+    vuelven no finitas reaparecen en un punto aleatorio. Devuelve (cuadros, cantidad) float32.
+    """
+    xmin, xmax, ymin, ymax = limites
+    x, y = sembrar(limites, cantidad, semilla)
+    rng = np.random.default_rng(semilla + 1)
+
+    u, v = campo(x, y)
+    rapidez = np.nanpercentile(np.hypot(u, v), 90)
+    if not np.isfinite(rapidez) or rapidez == 0:
+        rapidez = 1.0
+    dt = 0.01 * max(xmax - xmin, ymax - ymin) / (rapidez * subpasos)
+
+    xs = np.empty((cuadros, cantidad), dtype=np.float32)
+    ys = np.empty((cuadros, cantidad), dtype=np.float32)
+    for k in range(cuadros):
+        xs[k], ys[k] = x, y
+        with np.errstate(all='ignore'):
+            for _ in range(subpasos):
+                k1x, k1y = campo(x, y)
+                k2x, k2y = campo(x + 0.5 * dt * k1x, y + 0.5 * dt * k1y)
+                k3x, k3y = campo(x + 0.5 * dt * k2x, y + 0.5 * dt * k2y)
+                k4x, k4y = campo(x + dt * k3x, y + dt * k3y)
+                x = x + dt / 6 * (k1x + 2 * k2x + 2 * k3x + k4x)
+                y = y + dt / 6 * (k1y + 2 * k2y + 2 * k3y + k4y)
+
+        fuera = ~(np.isfinite(x) & np.isfinite(y) & (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax))
+        x[fuera] = rng.uniform(xmin, xmax, fuera.sum())
+        y[fuera] = rng.uniform(ymin, ymax, fuera.sum())
+
+    return xs, ys
+
+
+def traza_particulas(x, y, color="darkviolet"):
+    return go.Scatter(
+        x=x,
+        y=y,
+        mode="markers",
+        marker=dict(size=3, color=color, opacity=0.7),
+        hoverinfo="skip",
+        showlegend=False,
+    )
+
+
+def cuadros_animacion(xs, ys, indice_traza):
+    """Un go.Frame por cuadro; cada uno reemplaza solo la traza de particulas."""
+    return [
+        go.Frame(data=[go.Scatter(x=xs[k], y=ys[k])], traces=[indice_traza], name=str(k))
+        for k in range(xs.shape[0])
+    ]
+
+
+def controles_animacion(duracion=50):
+    """Botones de reproducir/pausar para la animacion."""
+    return [dict(
+        type="buttons",
+        direction="left",
+        x=0, y=-0.12, xanchor="left", yanchor="top",
+        buttons=[
+            dict(label="▶ Reproducir", method="animate",
+                 args=[None, dict(frame=dict(duration=duracion, redraw=False),
+                                  transition=dict(duration=0), fromcurrent=True, mode="immediate")]),
+            dict(label="⏸ Pausar", method="animate",
+                 args=[[None], dict(frame=dict(duration=0, redraw=False),
+                                    transition=dict(duration=0), mode="immediate")]),
+        ],
+    )]